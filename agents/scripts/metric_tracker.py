@@ -16,8 +16,12 @@ Version: 7.0
 Date: 2026-02-15
 """
 
+import copy
 import json
+import logging
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -30,6 +34,9 @@ CONFIG_DIR = BASE_DIR / "config"
 CIRCUIT_BREAKER_FILE = CONFIG_DIR / "circuit-breaker.json"
 BACKUP_DIR = BASE_DIR / "backups"
 
+# Nessun handler qui: la configurazione spetta al processo che importa il modulo
+logger = logging.getLogger("metric_tracker")
+
 
 @dataclass
 class TaskRecord:
@@ -60,6 +67,10 @@ class MetricTracker:
         """
         self.config_file = config_file or CIRCUIT_BREAKER_FILE
         self._data: Dict[str, Any] = {}
+        self._batch_depth = 0
+        self._batch_dirty = False
+        # Tenuto da batch(): i lettori di altri thread non vedono stati a metà
+        self._lock = threading.RLock()
         self._load()
 
     def _load(self) -> None:
@@ -69,7 +80,7 @@ class MetricTracker:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     self._data = json.load(f)
             except json.JSONDecodeError as e:
-                print(f"[ERROR] Invalid JSON in {self.config_file}: {e}")
+                logger.error("Invalid JSON in %s, starting from defaults: %s", self.config_file, e)
                 self._init_default_structure()
         else:
             self._init_default_structure()
@@ -160,6 +171,11 @@ class MetricTracker:
         Args:
             backup: Se True, crea un backup prima di salvare
         """
+        # Dentro batch() il salvataggio è rimandato alla fine del blocco
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
+
         # Aggiorna timestamp
         self._data["updated"] = datetime.now().isoformat()
 
@@ -177,6 +193,27 @@ class MetricTracker:
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
         with open(self.config_file, 'w', encoding='utf-8') as f:
             json.dump(self._data, f, indent=2, ensure_ascii=False)
+        logger.debug("Saved %s (%d agents)", self.config_file, self._data["metrics"]["total_agents"])
+
+    @contextmanager
+    def batch(self):
+        """
+        Raggruppa più registrazioni in un unico salvataggio su disco.
+
+        Uso:
+            with tracker.batch():
+                tracker.record_task_start("core/coder.md", "T1")
+                tracker.record_task_complete("core/coder.md", start)
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._batch_dirty:
+                    self._batch_dirty = False
+                    self.save(backup=False)
 
     def _create_backup(self) -> None:
         """Crea un backup del file corrente."""
@@ -188,6 +225,7 @@ class MetricTracker:
         # Copia il file
         import shutil
         shutil.copy2(self.config_file, backup_file)
+        logger.debug("Backup written to %s", backup_file)
 
         # Mantiene solo gli ultimi 10 backup
         self._cleanup_old_backups()
@@ -258,6 +296,7 @@ class MetricTracker:
                     "opus": {"total": 0, "last": None, "count": 0}
                 }
             }
+            logger.info("Registered agent %s (%s)", agent_name, agent_file)
 
             self.save(backup=False)
 
@@ -336,6 +375,7 @@ class MetricTracker:
             "tokens_used": 0,
             "duration_seconds": 0
         })
+        logger.debug("Task %s started on %s (%s)", task_id, agent_file, model)
 
         self.save(backup=False)
         return timestamp
@@ -401,6 +441,7 @@ class MetricTracker:
             "tokens_used": tokens_used,
             "duration_seconds": duration
         })
+        logger.debug("Task %s completed on %s in %.1fs (%d tokens)", task_id, agent_file, duration, tokens_used)
 
         self.save(backup=False)
         return duration
@@ -442,6 +483,8 @@ class MetricTracker:
 
             # Aggiorna status se necessario
             if agent["failures"] >= self._data.get("config", {}).get("failure_threshold", 5):
+                if agent.get("status") != "unhealthy":
+                    logger.warning("Circuit open for %s after %d failures", agent_file, agent["failures"])
                 agent["status"] = "unhealthy"
                 # Aggiorna circuit breaks global
                 self._data["metrics"]["circuit_breaks"] = \
@@ -467,6 +510,7 @@ class MetricTracker:
             "duration_seconds": duration,
             "error_message": error_message
         })
+        logger.debug("Task %s failed on %s after %.1fs: %s", task_id, agent_file, duration, error_message)
 
         self.save(backup=False)
         return duration
@@ -515,6 +559,7 @@ class MetricTracker:
             "duration_seconds": duration,
             "error_message": reason
         })
+        logger.debug("Task %s cancelled on %s after %.1fs", task_id, agent_file, duration)
 
         self.save(backup=False)
         return duration
@@ -566,6 +611,29 @@ class MetricTracker:
             "token_usage": agent.get("token_usage", {})
         }
 
+    def snapshot_agents(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Copia delle metriche di tutti gli agenti (come get_agent_metrics),
+        sicura da leggere mentre un altro thread registra dentro batch().
+
+        Returns:
+            Dict agente -> metriche
+        """
+        with self._lock:
+            return {
+                agent_file: copy.deepcopy(self.get_agent_metrics(agent_file))
+                for agent_file in self.list_agents()
+            }
+
+    def list_agents(self) -> List[str]:
+        """
+        Elenco dei file agente registrati.
+
+        Returns:
+            Lista di path degli agenti
+        """
+        return list(self._data.get("agents", {}))
+
     def get_system_metrics(self) -> Dict[str, Any]:
         """
         Recupera le metriche di sistema.
@@ -783,6 +851,7 @@ class MetricTracker:
             agent["last_failure"] = None
             agent["blacklisted_until"] = None
             agent["status"] = "healthy"
+            logger.info("Failures of %s reset, circuit closed", agent_file)
             self.save(backup=False)
 
 
@@ -14,5 +14,3 @@ __author__ = "LeoDg"
 __all__ = ["main"]
 
 from .server import main
-
-__all__.__all__ = ["main"]
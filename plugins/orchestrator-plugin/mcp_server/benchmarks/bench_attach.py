@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Session attach latency benchmark.
+
+Measures how long a new editor session waits for its initialize
+response: starting a full server per session (server.py over stdio)
+versus the orchestrator-mcp shim attaching to a warm daemon. The shim
+is also timed in-process (connect + initialize round trip, without
+interpreter start-up) to show the cost of the shim itself.
+
+Usage:
+    python benchmarks/bench_attach.py
+    python benchmarks/bench_attach.py --sessions 20
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(SERVER_DIR))
+
+# Keep benchmark sessions out of the real data directory
+WORK_DIR = tempfile.mkdtemp(prefix="bench-attach-")
+os.environ.setdefault("ORCHESTRATOR_DATA_DIR", os.path.join(WORK_DIR, "data"))
+os.environ.setdefault("ORCHESTRATOR_CIRCUIT_BREAKER", "0")
+os.environ["ORCHESTRATOR_DAEMON_SOCKET"] = os.path.join(WORK_DIR, "daemon.sock")
+
+import shim  # noqa: E402
+
+INITIALIZE = json.dumps({
+    "jsonrpc": "2.0", "id": 1, "method": "initialize",
+    "params": {"protocolVersion": "2025-06-18", "capabilities": {},
+               "clientInfo": {"name": "bench", "version": "1"}},
+}).encode("utf-8") + b"\n"
+
+
+def time_process(argv) -> float:
+    """Milliseconds from spawning ``argv`` to its initialize response"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        argv, cwd=SERVER_DIR, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    proc.stdin.write(INITIALIZE)
+    proc.stdin.flush()
+    proc.stdout.readline()
+    elapsed = (time.perf_counter() - start) * 1000
+    proc.stdin.close()
+    proc.wait(10)
+    return elapsed
+
+
+def time_attach(path: str) -> float:
+    """Milliseconds for connect + initialize against the daemon, in-process"""
+    start = time.perf_counter()
+    sock = shim.connect(path)
+    sock.sendall(INITIALIZE)
+    received = b""
+    while not received.endswith(b"\n"):
+        received += sock.recv(65536)
+    elapsed = (time.perf_counter() - start) * 1000
+    sock.shutdown(socket.SHUT_WR)
+    sock.close()
+    return elapsed
+
+
+def report(label, samples) -> None:
+    print(f"{label:<34} median {statistics.median(samples):8.1f} ms   "
+          f"max {max(samples):8.1f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=10, help="sessions per mode")
+    args = parser.parse_args()
+
+    path = shim.default_socket_path()
+    cold = [time_process([sys.executable, "server.py"]) for _ in range(args.sessions)]
+    first = time_process([sys.executable, "shim.py"])  # starts the daemon
+    warm = [time_process([sys.executable, "shim.py"]) for _ in range(args.sessions)]
+    attach = [time_attach(path) for _ in range(args.sessions)]
+
+    print(f"{args.sessions} sessions per mode")
+    report("server per session (stdio)", cold)
+    report("shim, first session (daemon start)", [first])
+    report("shim, warm daemon", warm)
+    report("shim attach only (in-process)", attach)
+
+    daemon = subprocess.run(["pgrep", "-f", path], capture_output=True, text=True)
+    for pid in daemon.stdout.split():
+        os.kill(int(pid), 15)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
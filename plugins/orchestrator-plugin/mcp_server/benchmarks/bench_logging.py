@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Logging overhead benchmark.
+
+Measures tool call latency at INFO and at DEBUG (where every call logs its
+timing), with two logging setups: the old synchronous stderr handler and
+the queue pipeline of log_pipeline.py. stderr is replaced by a stream whose
+writes take ``--write-delay-ms``, like a terminal or pipe that is slow to
+drain; the log lines themselves are discarded.
+
+Usage:
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --calls 5000 --write-delay-ms 1
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Keep benchmark sessions out of the real data directory
+os.environ.setdefault("ORCHESTRATOR_DATA_DIR", tempfile.mkdtemp(prefix="bench-logging-"))
+os.environ.setdefault("ORCHESTRATOR_CIRCUIT_BREAKER", "0")
+
+import server  # noqa: E402
+from log_pipeline import STDERR_FORMAT, configure_logging, stop_logging  # noqa: E402
+
+CALLS = [
+    ("orchestrator_list", {"limit": 5}),
+    ("orchestrator_agents", {"filter": "gui"}),
+]
+
+
+class SlowStream(io.TextIOBase):
+    """Discards what is written, taking ``delay`` seconds per write"""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def use_sync_logging(level: str, stream: SlowStream) -> None:
+    """The previous setup: logging.basicConfig writing to stderr in the caller's thread"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(STDERR_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def use_queue_logging(level: str, stream: SlowStream) -> None:
+    stderr, sys.stderr = sys.stderr, stream
+    try:
+        configure_logging(level)
+    finally:
+        sys.stderr = stderr
+
+
+async def measure(calls: int):
+    latencies = []
+    for i in range(calls):
+        name, arguments = CALLS[i % len(CALLS)]
+        start = time.perf_counter()
+        await server.handle_call_tool(name, arguments)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+async def run(calls: int, delay_ms: float) -> int:
+    stream = SlowStream(delay_ms / 1000.0)
+    for i in range(50):
+        server.engine.generate_execution_plan(f"API REST con database #{i}")
+    await measure(200)  # warm up
+
+    print(f"{calls} tool calls, log writes take {delay_ms} ms")
+    print(f"{'setup':8} {'level':6} {'p50 us':>9} {'p99 us':>9} {'mean us':>9}")
+    for setup, configure in (("sync", use_sync_logging), ("queue", use_queue_logging)):
+        for level in ("INFO", "DEBUG"):
+            configure(level, stream)
+            latencies = await measure(calls)
+            stop_logging()
+            print(f"{setup:8} {level:6} {percentile(latencies, 0.5):9.1f} "
+                  f"{percentile(latencies, 0.99):9.1f} {sum(latencies) / len(latencies):9.1f}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--write-delay-ms", type=float, default=0.2, help="time taken by each log write")
+    args = parser.parse_args()
+    try:
+        return asyncio.run(run(args.calls, args.write_delay_ms))
+    finally:
+        server.tool_executor.shutdown(wait=True)
+        server.engine.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
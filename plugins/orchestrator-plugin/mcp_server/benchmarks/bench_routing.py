@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Routing tables load benchmark.
+
+Compares building the routing tables from the config files (JSON parsing,
+merge, agent registry, validation) with loading the precompiled snapshot,
+unchanged and after a touch of a source file (hashed, not compiled).
+Reports medians over ``--runs``.
+
+Usage:
+    python benchmarks/bench_routing.py
+    python benchmarks/bench_routing.py --runs 2000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Keep the snapshot out of the real data directory
+os.environ.setdefault("ORCHESTRATOR_DATA_DIR", tempfile.mkdtemp(prefix="bench-routing-"))
+os.environ.setdefault("ORCHESTRATOR_CIRCUIT_BREAKER", "0")
+
+import server  # noqa: E402
+from routing_snapshot import RoutingSnapshot  # noqa: E402
+
+
+def median_ms(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(times)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args()
+
+    server.logger.disabled = True  # compile logs every merge
+    server.ensure_keyword_mappings()
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-routing-"), "routing.snapshot")
+    snapshot = RoutingSnapshot(path, server.routing_sources(), server._BASELINE_DIGEST)
+    snapshot.load(server.compile_routing_tables)
+
+    def rehash():
+        snapshot.write(dict(snapshot.read(), signature=()))
+        snapshot.load(server.compile_routing_tables)
+
+    compiled = median_ms(server.compile_routing_tables, args.runs)
+    loaded = median_ms(lambda: snapshot.load(server.compile_routing_tables), args.runs)
+    rehashed = median_ms(rehash, args.runs)
+    print(f"{len(server.KEYWORD_TO_EXPERT_MAPPING)} keywords, medians over {args.runs} runs")
+    print(f"compile from config: {compiled:8.3f} ms")
+    print(f"snapshot load:       {loaded:8.3f} ms")
+    print(f"touched, rehashed:   {rehashed:8.3f} ms  (includes one extra snapshot write)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
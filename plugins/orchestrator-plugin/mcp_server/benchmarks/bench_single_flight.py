@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Single-flight coalescing benchmark.
+
+Simulates bursty multi-agent load: in each burst, N agents call the same
+read-only tools (orchestrator_status, orchestrator_list,
+orchestrator_search) with the same arguments at the same moment.
+Throughput is measured with the server's middleware pipeline, and again
+with the single-flight middleware removed.
+
+Usage:
+    python benchmarks/bench_single_flight.py
+    python benchmarks/bench_single_flight.py --agents 64 --bursts 50 --sessions 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Keep benchmark sessions out of the real data directory
+os.environ.setdefault("ORCHESTRATOR_DATA_DIR", tempfile.mkdtemp(prefix="bench-flight-"))
+os.environ.setdefault("ORCHESTRATOR_CIRCUIT_BREAKER", "0")
+
+import server  # noqa: E402
+from tool_registry import SingleFlightMiddleware, ToolRegistry  # noqa: E402
+
+CALLS = [
+    ("orchestrator_status", {}),
+    ("orchestrator_list", {"limit": 50}),
+    ("orchestrator_search", {"query": "database api", "limit": 20}),
+]
+
+
+def without_single_flight() -> ToolRegistry:
+    registry = ToolRegistry(
+        middleware=[m for m in server.tool_registry.middleware
+                    if not isinstance(m, SingleFlightMiddleware)],
+        executor=server.tool_executor
+    )
+    for handler in server.tool_registry.handlers.values():
+        registry.register(handler)
+    return registry
+
+
+async def burst_load(registry: ToolRegistry, agents: int, bursts: int) -> float:
+    """Calls per second over ``bursts`` bursts of ``agents`` identical calls per tool"""
+    start = time.perf_counter()
+    for _ in range(bursts):
+        await asyncio.gather(*[
+            registry.call(name, arguments) for name, arguments in CALLS for _ in range(agents)
+        ])
+    return bursts * agents * len(CALLS) / (time.perf_counter() - start)
+
+
+async def run(agents: int, bursts: int, sessions: int) -> int:
+    requests = ["API REST con database", "GUI PyQt5 con database SQLite", "security audit JWT"]
+    for i in range(sessions):
+        server.engine.generate_execution_plan(f"{requests[i % len(requests)]} #{i}")
+    server.engine.flush()
+
+    plain = without_single_flight()
+    # Warm up caches and the search index
+    await burst_load(plain, 1, 1)
+
+    single_flight = server.tool_single_flight
+    before = (single_flight.executions, single_flight.coalesced)
+    baseline = await burst_load(plain, agents, bursts)
+    coalesced = await burst_load(server.tool_registry, agents, bursts)
+    executions = single_flight.executions - before[0]
+    shared = single_flight.coalesced - before[1]
+
+    print(f"{sessions} sessions, {bursts} bursts of {agents} agents x {len(CALLS)} tools")
+    print(f"without single-flight: {baseline:10.0f} calls/s")
+    print(f"with single-flight:    {coalesced:10.0f} calls/s  ({coalesced / baseline:.1f}x)")
+    print(f"executions: {executions}, coalesced calls: {shared}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--agents", type=int, default=32, help="identical calls per burst and tool")
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=2000, help="sessions in the store")
+    args = parser.parse_args()
+    try:
+        return asyncio.run(run(args.agents, args.bursts, args.sessions))
+    finally:
+        server.tool_executor.shutdown(wait=True)
+        server.engine.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
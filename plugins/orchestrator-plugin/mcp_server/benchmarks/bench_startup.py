@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark with a regression budget.
+
+Imports server.py in fresh interpreters under ``python -X importtime``,
+against a data directory holding ``--sessions`` sessions, and reports, as
+medians over ``--runs``:
+
+- own: import time spent in this plugin's modules (self time of server.py
+  and its sibling modules), i.e. the part this repository controls;
+- total: cumulative import time of ``server``, MCP SDK included;
+- wall: interpreter start to the end of the import.
+
+Exits with status 1 when ``own`` exceeds ``--budget-ms``, so it can run in CI.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --sessions 5000 --budget-ms 30
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+SERVER_DIR = Path(__file__).parent.parent
+OWN_MODULES = {path.stem for path in SERVER_DIR.glob("*.py")} | {"process_manager", "metric_tracker"}
+
+
+def parse_importtime(stderr: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Self and cumulative microseconds per module from -X importtime output"""
+    own, cumulative = {}, {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        own[name] = own.get(name, 0) + int(self_us)
+        cumulative[name] = int(cumulative_us)
+    return own, cumulative
+
+
+def server_env(data_dir: str) -> Dict[str, str]:
+    env = dict(
+        os.environ,
+        ORCHESTRATOR_DATA_DIR=data_dir,
+        ORCHESTRATOR_CIRCUIT_BREAKER="0",
+        PYTHONPATH=str(SERVER_DIR),
+    )
+    # Measure imports from bytecode caches, as in a normal installation
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def populate(data_dir: str, sessions: int) -> None:
+    script = (
+        "import server\n"
+        f"for i in range({sessions}):\n"
+        "    server.engine.generate_execution_plan(f'API REST con database #{i}')\n"
+        "server.engine.close()\n"
+    )
+    subprocess.run([sys.executable, "-c", script], env=server_env(data_dir), capture_output=True, check=True)
+
+
+def measure_once(data_dir: str) -> Tuple[float, float, float]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        env=server_env(data_dir), capture_output=True, text=True, check=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000.0
+    self_us, cumulative_us = parse_importtime(result.stderr)
+    own_ms = sum(us for name, us in self_us.items() if name in OWN_MODULES) / 1000.0
+    return own_ms, cumulative_us["server"] / 1000.0, wall_ms
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--sessions", type=int, default=2000, help="sessions in the data directory")
+    parser.add_argument("--budget-ms", type=float, default=30.0, help="max median import time of own modules")
+    args = parser.parse_args()
+
+    data_dir = os.path.join(tempfile.mkdtemp(prefix="bench-startup-"), "data")
+    populate(data_dir, args.sessions)
+    measure_once(data_dir)  # write the bytecode caches
+    runs = [measure_once(data_dir) for _ in range(args.runs)]
+    own, total, wall = (statistics.median(values) for values in zip(*runs))
+    print(f"{args.runs} cold imports of server.py, {args.sessions} sessions (medians)")
+    print(f"own modules: {own:8.1f} ms  (budget {args.budget_ms:.1f} ms)")
+    print(f"total:       {total:8.1f} ms")
+    print(f"wall:        {wall:8.1f} ms")
+    if own > args.budget_ms:
+        print(f"FAIL: own import time over budget by {own - args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
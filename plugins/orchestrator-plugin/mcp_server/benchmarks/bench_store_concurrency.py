@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Concurrent session store write benchmark.
+
+Simulates several orchestrator-mcp server processes (one per editor
+window) writing sessions into the same data directory at once, then
+checks from a fresh process that the merged view contains every session.
+
+Usage:
+    python benchmarks/bench_store_concurrency.py
+    python benchmarks/bench_store_concurrency.py --backend sqlite --processes 8 --sessions 2000
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from session_store import create_session_store  # noqa: E402
+
+
+def open_store(backend: str, data_dir: str):
+    return create_session_store(
+        backend,
+        log_path=os.path.join(data_dir, "sessions.jsonl"),
+        index_path=os.path.join(data_dir, "sessions.idx"),
+        sqlite_path=os.path.join(data_dir, "sessions.db"),
+    )
+
+
+def make_record(worker: int, n: int) -> dict:
+    session_id = f"w{worker:02d}-{n:06d}"
+    started_at = datetime(2026, 1, 1) + timedelta(seconds=n, microseconds=worker)
+    return {
+        "session_id": session_id,
+        "user_request": f"Implementa una GUI PyQt5 con database SQLite ({session_id})",
+        "status": "pending",
+        "started_at": started_at.isoformat(),
+        "completed_at": None,
+        "tasks_count": 3,
+        "domains": ["GUI", "Database"],
+        "plan": {
+            "session_id": session_id,
+            "tasks": [
+                {"id": f"T{i}", "agent_expert_file": "experts/gui-super-expert.md",
+                 "model": "sonnet", "priority": "ALTA"}
+                for i in range(1, 4)
+            ],
+            "complexity": "media",
+            "domains": ["GUI", "Database"],
+        },
+        "results": [],
+        "task_docs": [],
+    }
+
+
+def worker_main(backend, data_dir, worker, sessions, batch, start_event, results):
+    store = open_store(backend, data_dir)
+    start_event.wait()
+    t0 = time.perf_counter()
+    for n in range(0, sessions, batch):
+        store.put_many(make_record(worker, i) for i in range(n, min(n + batch, sessions)))
+    elapsed = time.perf_counter() - t0
+    store.close()
+    results.put(elapsed)
+
+
+def run(backend: str, processes: int, sessions: int, batch: int) -> int:
+    data_dir = tempfile.mkdtemp(prefix=f"bench-store-{backend}-")
+    open_store(backend, data_dir).close()  # create files/schema up front
+
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=worker_main,
+            args=(backend, data_dir, w, sessions, batch, start_event, results),
+        )
+        for w in range(processes)
+    ]
+    for p in workers:
+        p.start()
+
+    t0 = time.perf_counter()
+    start_event.set()
+    for p in workers:
+        p.join()
+    wall = time.perf_counter() - t0
+    per_worker = [results.get() for _ in workers]
+
+    store = open_store(backend, data_dir)
+    merged = store.count()
+    latest = store.list_summaries(1)
+    store.close()
+
+    total = processes * sessions
+    print(f"backend={backend} processes={processes} sessions/process={sessions} batch={batch}")
+    print(f"  wall time        : {wall:.3f} s")
+    print(f"  throughput       : {total / wall:,.0f} sessions/s "
+          f"({total / wall / batch:,.0f} writes/s)")
+    print(f"  slowest worker   : {max(per_worker):.3f} s")
+    print(f"  merged view      : {merged} / {total} sessions "
+          f"(latest: {latest[0]['session_id'] if latest else '-'})")
+
+    return 0 if merged == total else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", choices=["json", "sqlite", "all"], default="all")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=500, help="sessions per process")
+    parser.add_argument("--batch", type=int, default=1, help="sessions per write")
+    args = parser.parse_args()
+
+    backends = ["json", "sqlite"] if args.backend == "all" else [args.backend]
+    status = 0
+    for backend in backends:
+        status |= run(backend, args.processes, args.sessions, args.batch)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
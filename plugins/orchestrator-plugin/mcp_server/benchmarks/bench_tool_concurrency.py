@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tool call responsiveness benchmark.
+
+Starts one slow orchestrator_preview call (plan generation over a very
+large request) and, while it runs, keeps issuing small calls
+(orchestrator_list, orchestrator_agents). Measures the latency of the
+small calls twice: with the slow call run inline on the event loop (the
+pre-registry behaviour) and offloaded to the tool worker pool. Probe
+latency is counted from the moment the probe was due.
+
+Usage:
+    python benchmarks/bench_tool_concurrency.py
+    python benchmarks/bench_tool_concurrency.py --request-kb 4096 --interval-ms 2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Keep benchmark sessions out of the real data directory
+os.environ.setdefault("ORCHESTRATOR_DATA_DIR", tempfile.mkdtemp(prefix="bench-tools-"))
+os.environ.setdefault("ORCHESTRATOR_CIRCUIT_BREAKER", "0")
+
+import server  # noqa: E402
+
+PROBES = [
+    ("orchestrator_list", {"limit": 5}),
+    ("orchestrator_agents", {"filter": "gui"}),
+]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def probe_until(done: asyncio.Event, interval: float):
+    """
+    Latency of each probe counted from the moment it was due, so time spent
+    waiting for a blocked event loop to wake up is included.
+    """
+    latencies = []
+    n = 0
+    while not done.is_set():
+        due = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        name, arguments = PROBES[n % len(PROBES)]
+        await server.tool_registry.call(name, arguments)
+        latencies.append((time.perf_counter() - due) * 1000.0)
+        n += 1
+    return latencies
+
+
+async def measure(mode: str, request: str, interval: float):
+    arguments = {"request": request}
+    done = asyncio.Event()
+
+    async def slow_call():
+        await asyncio.sleep(interval)  # let the probes start first
+        t0 = time.perf_counter()
+        if mode == "inline":
+            server.PreviewTool().run(arguments)
+        else:
+            await server.tool_registry.call("orchestrator_preview", arguments)
+        elapsed = time.perf_counter() - t0
+        done.set()
+        return elapsed
+
+    slow, latencies = await asyncio.gather(slow_call(), probe_until(done, interval))
+    return slow, latencies
+
+
+async def run(request_kb: int, interval_ms: float) -> int:
+    sentence = "Crea una GUI PyQt5 con database SQLite e API REST sicure. "
+    request = sentence * (request_kb * 1024 // len(sentence) + 1)
+    interval = interval_ms / 1000.0
+
+    # Warm up caches and the worker pool
+    await server.tool_registry.call("orchestrator_preview", {"request": sentence})
+
+    print(f"request={len(request) / 1024:,.0f} KB probe interval={interval_ms} ms "
+          f"workers={server.TOOL_WORKERS}")
+    results = {}
+    for mode in ("inline", "offloaded"):
+        slow, latencies = await measure(mode, request, interval)
+        results[mode] = latencies
+        print(f"  {mode:<9} slow call {slow * 1000:8.1f} ms | probes {len(latencies):4d} | "
+              f"p50 {percentile(latencies, 0.5):7.2f} ms | "
+              f"p99 {percentile(latencies, 0.99):7.2f} ms | "
+              f"max {max(latencies, default=0.0):7.2f} ms")
+
+    server.tool_executor.shutdown(wait=True)
+    server.engine.close()
+    # Offloading must keep the worst probe well below the inline stall
+    return 0 if max(results["offloaded"], default=0.0) < max(results["inline"], default=0.0) else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--request-kb", type=int, default=2048, help="size of the slow request")
+    parser.add_argument("--interval-ms", type=float, default=5.0, help="pause between probes")
+    args = parser.parse_args()
+    return asyncio.run(run(args.request_kb, args.interval_ms))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
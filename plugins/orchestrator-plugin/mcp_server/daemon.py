@@ -0,0 +1,211 @@
+"""
+SHARED DAEMON
+=============
+
+Background server behind the ``orchestrator-mcp`` stdio shim.
+
+The daemon listens on an owner-only Unix socket and serves each
+connection as an independent MCP session over the stdio framing
+(newline-delimited JSON-RPC), so a shim just copies bytes. All sessions
+share this process: imports, the routing index, caches and the session
+store are loaded once.
+
+A lock file next to the socket makes sure only one daemon serves a
+socket path when several shims start one at the same time. The daemon
+refuses sessions beyond ``max_clients`` and exits once it has had no
+client for ``idle_exit`` seconds (0 = never).
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+from typing import Any, Optional
+
+logger = logging.getLogger("orchestrator-mcp")
+
+# Largest single MCP message accepted from a client
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+class DaemonAlreadyRunningError(RuntimeError):
+    """Another daemon holds the lock for this socket path"""
+
+
+class DaemonServer:
+    """Serves MCP sessions on a Unix socket for stdio shims"""
+
+    def __init__(
+        self,
+        mcp_server: Any,
+        socket_path: str,
+        max_clients: int = 32,
+        idle_exit: float = 900.0,
+    ) -> None:
+        self.mcp_server = mcp_server
+        self.socket_path = socket_path
+        self.max_clients = max_clients
+        self.idle_exit = idle_exit
+        self.clients = 0
+        self.sessions_served = 0
+        self.refused = 0
+        self.started = False
+        self._stop: Optional[asyncio.Event] = None
+        self._activity: Optional[asyncio.Event] = None
+        self._lock_fd: Optional[int] = None
+
+    def _acquire_lock(self) -> None:
+        import fcntl
+
+        fd = os.open(self.socket_path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            raise DaemonAlreadyRunningError(f"A daemon is already serving {self.socket_path}")
+        self._lock_fd = fd
+
+    def _release_lock(self) -> None:
+        # The lock file itself stays: unlinking it would race with a starting daemon
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def serve(self) -> None:
+        """Serve until idle for ``idle_exit`` seconds, ``stop`` or SIGTERM"""
+        from http_transport import bind_unix_socket
+
+        self._acquire_lock()
+        self._stop = asyncio.Event()
+        self._activity = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        listener = None
+        try:
+            sock = bind_unix_socket(self.socket_path)
+            listener = await asyncio.start_unix_server(
+                self._handle, sock=sock, limit=MAX_MESSAGE_BYTES
+            )
+            try:
+                loop.add_signal_handler(signal.SIGTERM, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # not the main thread
+            self.started = True
+            logger.info("MCP daemon listening on %s (pid %s)", self.socket_path, os.getpid())
+            await self._wait_until_done()
+        finally:
+            self.started = False
+            if listener is not None:
+                listener.close()
+            try:
+                loop.remove_signal_handler(signal.SIGTERM)
+            except (NotImplementedError, RuntimeError):
+                pass
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._release_lock()
+            logger.info("MCP daemon stopped after %s sessions", self.sessions_served)
+
+    async def _wait_until_done(self) -> None:
+        while not self._stop.is_set():
+            self._activity.clear()
+            timeout = self.idle_exit if self.idle_exit > 0 and self.clients == 0 else None
+            waiters = [asyncio.ensure_future(self._stop.wait()),
+                       asyncio.ensure_future(self._activity.wait())]
+            done, pending = await asyncio.wait(
+                waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for waiter in pending:
+                waiter.cancel()
+            if not done:
+                logger.info("No clients for %.0fs, daemon exiting", self.idle_exit)
+                return
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.clients >= self.max_clients:
+            self.refused += 1
+            await self._refuse(reader, writer)
+            return
+        self.clients += 1
+        self._activity.set()
+        try:
+            await self._serve_session(reader, writer)
+        except Exception:
+            logger.exception("Daemon client session failed")
+        finally:
+            self.clients -= 1
+            self.sessions_served += 1
+            self._activity.set()
+            writer.close()
+
+    async def _refuse(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the client's first request with an error instead of hanging up silently"""
+        try:
+            line = await asyncio.wait_for(reader.readline(), 5)
+            request_id = json.loads(line).get("id")
+            error = {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {"code": -32000, "message": f"Server busy: {self.max_clients} clients connected"},
+            }
+            writer.write((json.dumps(error) + "\n").encode("utf-8"))
+            await writer.drain()
+        except Exception:
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_session(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """One MCP session; same framing as mcp.server.stdio"""
+        import anyio
+        from mcp import types
+        from mcp.shared.message import SessionMessage
+
+        read_writer, read_stream = anyio.create_memory_object_stream(0)
+        write_stream, write_reader = anyio.create_memory_object_stream(0)
+
+        async def socket_reader() -> None:
+            # EOF (or a broken connection) ends the session like EOF on stdin
+            async with read_writer:
+                while True:
+                    try:
+                        line = await reader.readline()
+                    except (ConnectionError, ValueError) as e:
+                        logger.debug("Daemon client read failed: %s", e)
+                        break
+                    if not line:
+                        break
+                    try:
+                        message = types.JSONRPCMessage.model_validate_json(line)
+                    except Exception as exc:
+                        await read_writer.send(exc)
+                        continue
+                    await read_writer.send(SessionMessage(message))
+
+        async def socket_writer() -> None:
+            try:
+                async with write_reader:
+                    async for session_message in write_reader:
+                        data = session_message.message.model_dump_json(by_alias=True, exclude_none=True)
+                        writer.write(data.encode("utf-8") + b"\n")
+                        await writer.drain()
+            except (ConnectionError, anyio.ClosedResourceError):
+                # Client went away: abandon the session
+                tg.cancel_scope.cancel()
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(socket_reader)
+            tg.start_soon(socket_writer)
+            await self.mcp_server.run(
+                read_stream, write_stream, self.mcp_server.create_initialization_options()
+            )
+            tg.cancel_scope.cancel()
@@ -0,0 +1,163 @@
+"""
+LOCAL HTTP TRANSPORT
+====================
+
+Optional streamable HTTP transport (responses and server notifications
+stream as SSE) so that one warm server process serves every MCP client on
+the machine: imports, mapping loads, caches and the session store are
+paid for once instead of once per editor window.
+
+The transport only listens locally - on a loopback address or on a Unix
+socket reachable by the current user only - and bounds its resources:
+at most ``max_clients`` client sessions (and CONNECTIONS_PER_CLIENT
+times as many HTTP connections) are served at once, and sessions with
+no request for ``idle_timeout`` seconds are closed.
+
+Clients connect to ``http://127.0.0.1:<port>/mcp``.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import contextlib
+import logging
+import os
+import socket
+from typing import Any, List, Optional
+
+logger = logging.getLogger("orchestrator-mcp")
+
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+MCP_PATH = "/mcp"
+# A client holds a standing SSE stream plus its in-flight POST requests
+CONNECTIONS_PER_CLIENT = 4
+
+
+def bind_unix_socket(path: str) -> socket.socket:
+    """
+    Bind an owner-only Unix socket at ``path``, replacing the stale socket
+    file of a dead server (RuntimeError if a live server still answers).
+    """
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            raise RuntimeError(f"Another server is already listening on {path}")
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(path)  # stale socket of a dead server
+        finally:
+            probe.close()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Created owner-only: other local users must not reach the server
+    old_umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(old_umask)
+    return sock
+
+
+class LocalHttpTransport:
+    """Streamable HTTP MCP endpoint bound to localhost or a Unix socket"""
+
+    def __init__(
+        self,
+        mcp_server: Any,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        socket_path: Optional[str] = None,
+        max_clients: int = 32,
+        idle_timeout: float = 1800.0,
+    ) -> None:
+        if socket_path is None and host not in LOOPBACK_HOSTS:
+            raise ValueError(
+                f"HTTP transport only listens locally; '{host}' is not a loopback "
+                f"address (use {', '.join(LOOPBACK_HOSTS)} or a Unix socket)"
+            )
+        self.mcp_server = mcp_server
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self._http: Any = None
+
+    @property
+    def started(self) -> bool:
+        return bool(self._http is not None and self._http.started)
+
+    @property
+    def address(self) -> str:
+        if self.socket_path:
+            return f"unix:{self.socket_path}"
+        return f"http://{self.host}:{self.port}{MCP_PATH}"
+
+    def build_app(self) -> Any:
+        """ASGI app serving the MCP endpoint (the session manager runs in its lifespan)"""
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from mcp.server.transport_security import TransportSecuritySettings
+        from starlette.applications import Starlette
+        from starlette.routing import Route
+
+        names = [f"[{h}]" if ":" in h else h for h in LOOPBACK_HOSTS]
+        manager = StreamableHTTPSessionManager(
+            app=self.mcp_server,
+            session_idle_timeout=self.idle_timeout,
+            max_sessions=self.max_clients,
+            # Browsers must not reach the server through DNS rebinding
+            security_settings=TransportSecuritySettings(
+                enable_dns_rebinding_protection=True,
+                allowed_hosts=[h for name in names for h in (name, f"{name}:*")],
+                allowed_origins=[f"http://{name}:*" for name in names],
+            ),
+        )
+
+        class Endpoint:
+            async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+                await manager.handle_request(scope, receive, send)
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app: Any):
+            async with manager.run():
+                logger.info("MCP HTTP transport listening on %s", self.address)
+                yield
+
+        return Starlette(routes=[Route(MCP_PATH, endpoint=Endpoint())], lifespan=lifespan)
+
+    def _bind(self) -> List[socket.socket]:
+        if not self.socket_path:
+            family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self.port))
+            self.port = sock.getsockname()[1]
+            return [sock]
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Unix sockets are not supported on this platform; use --host/--port")
+        return [bind_unix_socket(self.socket_path)]
+
+    async def serve(self) -> None:
+        """Serve until ``stop`` is called (or the process is interrupted)"""
+        import uvicorn
+
+        sockets = self._bind()
+        self._http = uvicorn.Server(uvicorn.Config(
+            self.build_app(),
+            # Beyond this, new connections get "503 Service Unavailable"
+            limit_concurrency=self.max_clients * CONNECTIONS_PER_CLIENT,
+            lifespan="on",
+            log_level="warning",
+            access_log=False,
+        ))
+        try:
+            await self._http.serve(sockets=sockets)
+        finally:
+            for sock in sockets:
+                sock.close()
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def stop(self) -> None:
+        if self._http is not None:
+            self._http.should_exit = True
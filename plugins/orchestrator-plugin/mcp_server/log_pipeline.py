@@ -0,0 +1,180 @@
+"""
+LOG PIPELINE
+============
+
+Non-blocking logging for the server process.
+
+Loggers only enqueue records: a ``QueueHandler`` on the root logger puts
+them on an in-memory queue and a ``QueueListener`` thread does all the
+I/O - stderr (stdout carries the MCP frames) and, optionally, a rotating
+JSON-lines file. A tool call never waits on a slow terminal or disk.
+
+Messages use lazy ``%`` formatting (``logger.info("x %s", value)``), so a
+record below the active level costs one level check. ``RepeatFilter``
+rate-limits identical messages (same logger, level and format string):
+past ``burst`` occurrences in a ``window`` the rest are dropped before
+they are queued, and the next one that gets through carries the count.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+STDERR_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Merges the message and renders the traceback in the calling thread
+    (the arguments may change once the call returns); timestamps, layout
+    and JSON are left to the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACKS.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_TRACEBACKS = logging.Formatter()
+
+
+class RepeatFilter(logging.Filter):
+    """Lets through at most ``burst`` records per message and ``window`` seconds"""
+
+    def __init__(self, window: float = 60.0, burst: int = 10) -> None:
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.suppressed_total = 0
+        # (logger, level, format string) -> [window start, emitted, suppressed]
+        self._seen: Dict[Tuple[str, int, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            state = self._seen.get(key)
+            if state is None or now - state[0] >= self.window:
+                suppressed = int(state[2]) if state else 0
+                self._seen[key] = [now, 1, 0]
+                if len(self._seen) > 4096:
+                    self._expire(now)
+            elif state[1] < self.burst:
+                state[1] += 1
+                return True
+            else:
+                state[2] += 1
+                self.suppressed_total += 1
+                return False
+        if suppressed:
+            _annotate(record, suppressed)
+        return True
+
+    def _expire(self, now: float) -> None:
+        for key in [k for k, state in self._seen.items() if now - state[0] >= self.window]:
+            del self._seen[key]
+
+
+def _annotate(record: logging.LogRecord, suppressed: int) -> None:
+    """Append the number of dropped repeats to the record's message"""
+    note = f" (repeated {suppressed} more times)"
+    if isinstance(record.args, tuple) and record.args:
+        record.msg = f"{record.msg}{note.replace('%', '%%')}"
+    elif not record.args:
+        record.msg = f"{record.msg}{note}"
+    record.suppressed = suppressed
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(
+    level: str = "INFO",
+    json_file: Optional[str] = None,
+    max_bytes: int = 10 * 1024 * 1024,
+    backups: int = 5,
+    repeat_window: float = 60.0,
+    repeat_burst: int = 10,
+) -> logging.handlers.QueueListener:
+    """
+    Route every log record through a queue to a listener thread.
+
+    Replaces the root logger's handlers; calling it again reconfigures.
+    ``stop_logging()`` drains the queue at shutdown.
+    """
+    global _listener, _handler
+    stop_logging()
+
+    stderr = logging.StreamHandler(sys.stderr)
+    stderr.setFormatter(logging.Formatter(STDERR_FORMAT))
+    sinks: List[logging.Handler] = [stderr]
+    if json_file:
+        sink = logging.handlers.RotatingFileHandler(
+            json_file, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+        )
+        sink.setFormatter(JsonLinesFormatter())
+        sinks.append(sink)
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _handler = _QueueHandler(records)
+    _handler.addFilter(RepeatFilter(repeat_window, repeat_burst))
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_handler)
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(records, *sinks)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener, _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        for sink in _listener.handlers:
+            sink.close()
+        _listener = None
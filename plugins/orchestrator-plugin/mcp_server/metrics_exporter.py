@@ -0,0 +1,227 @@
+"""
+METRICS EXPORTER
+================
+
+OpenMetrics (Prometheus) text exposition of the server's metrics.
+
+The exporter either rewrites a file every ``interval`` seconds (for the
+node_exporter textfile collector or a sidecar) or answers scrapes on a
+localhost port. Metric families are produced by a ``collect`` callable,
+so this module knows nothing about the orchestrator itself.
+
+Label cardinality is bounded: a LabelLimiter keeps the first
+``max_values`` distinct values of each label and reports every later one
+as "other". Kept values are never dropped, so series stay stable across
+scrapes.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("orchestrator-mcp")
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+OTHER = "other"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class LabelLimiter:
+    """Caps the distinct values of each label name (thread-safe)"""
+
+    def __init__(self, max_values: int = 50) -> None:
+        self.max_values = max_values
+        self.overflowed: Dict[str, int] = {}
+        self._seen: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, label: str, value: str) -> str:
+        with self._lock:
+            seen = self._seen.setdefault(label, set())
+            if value in seen:
+                return value
+            if len(seen) < self.max_values:
+                seen.add(value)
+                return value
+            self.overflowed[label] = self.overflowed.get(label, 0) + 1
+            return OTHER
+
+
+class CountHistogram:
+    """Fixed-bucket histogram of counts (e.g. tasks per plan); lock-protected"""
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket: above the last bound
+        self.count = 0
+        self.sum = 0
+        self._lock = threading.Lock()
+
+    def record(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """Consistent ``(bucket counts, count, sum)``"""
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+
+class MetricFamily:
+    """One metric family and its samples, in OpenMetrics naming"""
+
+    def __init__(self, name: str, kind: str, help_text: str, unit: str = "") -> None:
+        self.name = name
+        self.kind = kind  # counter, gauge, histogram, summary, info
+        self.help = help_text
+        self.unit = unit
+        self.samples: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def add(self, value: float, labels: Optional[Dict[str, str]] = None, suffix: str = "") -> None:
+        """Add a sample; samples landing on the same (suffix, labels) are summed"""
+        if not suffix and self.kind == "counter":
+            suffix = "_total"
+        key = (suffix, tuple(sorted((labels or {}).items())))
+        self.samples[key] = self.samples.get(key, 0) + value
+
+    def add_histogram(
+        self,
+        bounds: Sequence[float],
+        counts: Sequence[int],
+        total: float,
+        labels: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Histogram from per-bucket counts (last count: above the last bound)"""
+        labels = labels or {}
+        cumulative = 0
+        for bound, count in zip(list(bounds) + [math.inf], counts):
+            cumulative += count
+            self.add(cumulative, dict(labels, le=_number(float(bound))), "_bucket")
+        self.add(cumulative, labels, "_count")
+        self.add(total, labels, "_sum")
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} {self.kind}"]
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        lines.append(f"# HELP {self.name} {_escape(self.help)}")
+        for (suffix, labels), value in self.samples.items():
+            if labels:
+                rendered = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+                lines.append(f"{self.name}{suffix}{{{rendered}}} {_number(value)}")
+            else:
+                lines.append(f"{self.name}{suffix} {_number(value)}")
+        return lines
+
+
+def render_openmetrics(families: Sequence[MetricFamily]) -> str:
+    lines: List[str] = []
+    for family in families:
+        lines.extend(family.render())
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_atomically(path: str, text: str) -> None:
+    """Scrapers never see a half-written file"""
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".metrics-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class MetricsExporter:
+    """Publishes ``collect()`` to a file every ``interval`` seconds and/or on a localhost port"""
+
+    def __init__(
+        self,
+        collect: Callable[[], Sequence[MetricFamily]],
+        path: Optional[str] = None,
+        port: int = 0,
+        host: str = "127.0.0.1",
+        interval: float = 15.0,
+    ) -> None:
+        self.collect = collect
+        self.path = path
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self.scrapes = 0
+        self.writes = 0
+        self.bound_port: Optional[int] = None
+
+    def render(self) -> str:
+        return render_openmetrics(self.collect())
+
+    def write(self) -> None:
+        write_atomically(self.path, self.render())
+        self.writes += 1
+
+    async def serve(self) -> None:
+        """Run until cancelled"""
+        listener = None
+        try:
+            if self.port:
+                listener = await asyncio.start_server(self._handle, self.host, self.port)
+                self.bound_port = listener.sockets[0].getsockname()[1]
+                logger.info("Metrics exporter listening on http://%s:%s/metrics", self.host, self.bound_port)
+            while True:
+                if self.path:
+                    try:
+                        await asyncio.to_thread(self.write)
+                    except Exception as e:
+                        logger.warning("Could not write metrics to %s: %s", self.path, e)
+                await asyncio.sleep(self.interval)
+        finally:
+            if listener is not None:
+                listener.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            method, target = request.split(b" ", 2)[:2]
+            if method != b"GET" or target.split(b"?")[0] not in (b"/metrics", b"/"):
+                status, content_type, body = "404 Not Found", "text/plain", b"Not found\n"
+            else:
+                text = await asyncio.to_thread(self.render)
+                status, content_type, body = "200 OK", CONTENT_TYPE, text.encode("utf-8")
+                self.scrapes += 1
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
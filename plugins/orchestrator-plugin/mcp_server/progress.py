@@ -0,0 +1,149 @@
+"""
+PROGRESS NOTIFICATIONS
+======================
+
+Throttled MCP progress notifications for long-running tool calls.
+
+Code running inside a tool call - on the event loop or on a worker
+thread - calls ``report_progress(progress, total, message)``; outside a
+call, or when the client sent no progress token, it is a no-op.
+``ProgressMiddleware`` installs a ``ProgressReporter`` per call, which
+sends at most ``max_rate`` notifications per second: updates arriving
+faster are coalesced and the latest one wins. The final state is always
+delivered before the tool's response.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger("orchestrator-mcp")
+
+# send(progress, total, message) -> delivers one notification
+ProgressSender = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+Update = Tuple[float, Optional[float], Optional[str]]
+
+_current_reporter: "contextvars.ContextVar[Optional[ProgressReporter]]" = contextvars.ContextVar(
+    "orchestrator_progress", default=None
+)
+
+
+def report_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+    """Report progress of the current tool call (thread-safe, never blocks)"""
+    reporter = _current_reporter.get()
+    if reporter is not None:
+        reporter.report(progress, total, message)
+
+
+class ProgressReporter:
+    """
+    Rate-limited progress channel of one tool call.
+
+    ``report`` may be called from any thread; notifications are sent from
+    the event loop, one at a time and in order.
+    """
+
+    def __init__(
+        self,
+        send: ProgressSender,
+        loop: asyncio.AbstractEventLoop,
+        min_interval: float = 0.1,
+    ) -> None:
+        self._send = send
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self.min_interval = min_interval
+        self.sent = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._pending: Optional[Update] = None
+        self._scheduled = False
+        self._closed = False
+        self._last_sent = float("-inf")
+        self._send_lock = asyncio.Lock()
+        self._deliveries: Set[asyncio.Task] = set()
+
+    def report(self, progress: float, total: Optional[float] = None, message: Optional[str] = None) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (progress, total, message)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        if threading.get_ident() == self._loop_thread:
+            self._schedule()
+        else:
+            self._loop.call_soon_threadsafe(self._schedule)
+
+    def _schedule(self) -> None:
+        delay = self._last_sent + self.min_interval - time.monotonic()
+        if delay > 0:
+            self._loop.call_later(delay, self._emit)
+        else:
+            self._emit()
+
+    def _emit(self) -> None:
+        with self._lock:
+            update, self._pending = self._pending, None
+            self._scheduled = False
+        if update is not None:
+            self._deliver(update)
+
+    def _deliver(self, update: Update) -> None:
+        self._last_sent = time.monotonic()
+        task = self._loop.create_task(self._send_one(update))
+        self._deliveries.add(task)
+        task.add_done_callback(self._deliveries.discard)
+
+    async def _send_one(self, update: Update) -> None:
+        # asyncio.Lock is FIFO: notifications go out in report order
+        async with self._send_lock:
+            try:
+                await self._send(*update)
+                self.sent += 1
+            except Exception as e:
+                logger.debug("Progress notification dropped: %s", e)
+
+    async def aclose(self) -> None:
+        """Send the last pending update (bypassing the throttle) and wait for delivery"""
+        with self._lock:
+            self._closed = True
+            update, self._pending = self._pending, None
+        if update is not None:
+            self._deliver(update)
+        if self._deliveries:
+            await asyncio.gather(*list(self._deliveries))
+
+
+class ProgressMiddleware:
+    """
+    Tool middleware giving each call a ProgressReporter.
+
+    ``open_channel()`` returns the sender for the current request, or None
+    when the client did not ask for progress (no ``progressToken``).
+    """
+
+    def __init__(self, open_channel: Callable[[], Optional[ProgressSender]], max_rate: float = 10.0) -> None:
+        self.open_channel = open_channel
+        self.max_rate = max_rate
+
+    async def __call__(self, handler: Any, arguments: Dict[str, Any], call_next: Any) -> Any:
+        send = self.open_channel() if self.max_rate > 0 else None
+        if send is None:
+            return await call_next(handler, arguments)
+        reporter = ProgressReporter(send, asyncio.get_running_loop(), 1.0 / self.max_rate)
+        token = _current_reporter.set(reporter)
+        try:
+            return await call_next(handler, arguments)
+        finally:
+            _current_reporter.reset(token)
+            await reporter.aclose()
@@ -0,0 +1,218 @@
+"""
+RESOURCE CATALOG
+================
+
+Precomputed, version-stamped payloads for the ``orchestrator://`` MCP
+resources.
+
+Each resource declares a builder and a cheap ``source_version`` key (a
+generation counter, file stat signatures, ...). Payloads are serialized
+once and cached with a content hash (etag); they are rebuilt only when
+the source key changes, and a rebuild that changes the content bumps the
+payload version and queues an update for subscribed clients.
+
+Live resources (telemetry) have no source key: they are built on every
+read and take no part in change tracking, so polling never rebuilds them
+and subscribers get no updates for them.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger("orchestrator-mcp")
+
+
+def file_signature(*paths: str) -> Tuple[Tuple[int, int], ...]:
+    """Change detector for config files: (mtime_ns, size) per path, (0, 0) if missing"""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((0, 0))
+    return tuple(signature)
+
+
+@dataclass(frozen=True)
+class ResourcePayload:
+    """Serialized resource content and its version stamp"""
+    uri: str
+    text: str
+    etag: str       # content hash
+    version: int    # bumped each time the content changes
+    mime_type: str = "application/json"
+
+
+@dataclass
+class ResourceSpec:
+    uri: str
+    name: str
+    description: str
+    build: Callable[[], Any]
+    source_version: Optional[Callable[[], Hashable]] = None
+
+    @property
+    def live(self) -> bool:
+        """Built on every read, never tracked for changes"""
+        return self.source_version is None
+
+
+class ResourceCatalog:
+    """
+    Registry of resources and their cached payloads (thread-safe).
+
+    ``get`` serves the cached payload while the source key is unchanged.
+    URIs whose content changed are collected until ``drain_changes``.
+    """
+
+    def __init__(self) -> None:
+        self.specs: Dict[str, ResourceSpec] = {}
+        self.builds = 0
+        self._payloads: Dict[str, ResourcePayload] = {}
+        self._sources: Dict[str, Hashable] = {}
+        self._changed: List[str] = []
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+
+    def register(
+        self,
+        uri: str,
+        name: str,
+        description: str,
+        build: Callable[[], Any],
+        source_version: Optional[Callable[[], Hashable]] = None,
+    ) -> None:
+        """Register a resource; without ``source_version`` it is live"""
+        if uri in self.specs:
+            raise ValueError(f"Resource '{uri}' already registered")
+        self.specs[uri] = ResourceSpec(uri, name, description, build, source_version)
+        self._build_locks[uri] = threading.Lock()
+
+    def get(self, uri: str) -> ResourcePayload:
+        """Current payload of ``uri`` (KeyError for unknown resources)"""
+        spec = self.specs[uri]
+        if spec.live:
+            return self._build_live(spec)
+        self.refresh(uri)
+        return self._payloads[spec.uri]
+
+    def _build_live(self, spec: ResourceSpec) -> ResourcePayload:
+        """Fresh payload of a live resource; the version counts content changes between reads"""
+        text = json.dumps(spec.build(), indent=2)
+        etag = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        with self._lock:
+            self.builds += 1
+            previous = self._payloads.get(spec.uri)
+            if previous is not None and previous.etag == etag:
+                return previous
+            payload = ResourcePayload(spec.uri, text, etag, previous.version + 1 if previous else 1)
+            self._payloads[spec.uri] = payload
+        return payload
+
+    def refresh(self, uri: str) -> bool:
+        """Rebuild ``uri`` if its source changed; True if the content changed (never for live ones)"""
+        spec = self.specs[uri]
+        if spec.live:
+            return False
+        source = spec.source_version()
+        if uri in self._payloads and self._sources.get(uri) == source:
+            return False
+        with self._build_locks[uri]:
+            # Another thread may have rebuilt it while we waited
+            if uri in self._payloads and self._sources.get(uri) == source:
+                return False
+            text = json.dumps(spec.build(), indent=2)
+            etag = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+            with self._lock:
+                self.builds += 1
+                self._sources[uri] = source
+                previous = self._payloads.get(uri)
+                if previous is not None and previous.etag == etag:
+                    return False
+                self._payloads[uri] = ResourcePayload(
+                    uri, text, etag, previous.version + 1 if previous else 1
+                )
+                if previous is not None and uri not in self._changed:
+                    self._changed.append(uri)
+        if previous is not None:
+            logger.info("Resource %s changed (version %s, etag %s)", uri, previous.version + 1, etag)
+        return previous is not None
+
+    def refresh_all(self) -> List[str]:
+        """Check every resource; returns the URIs whose content changed"""
+        return [uri for uri in self.specs if self.refresh(uri)]
+
+    def drain_changes(self) -> List[str]:
+        """URIs changed since the last call (rebuilt by reads or by refresh_all)"""
+        with self._lock:
+            changed, self._changed = self._changed, []
+        return changed
+
+
+class ResourceSubscriptions:
+    """Client sessions subscribed to resource updates (held weakly)"""
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, "weakref.WeakSet[Any]"] = {}
+
+    def subscribe(self, uri: str, session: Any) -> None:
+        self._subscribers.setdefault(uri, weakref.WeakSet()).add(session)
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        subscribers = self._subscribers.get(uri)
+        if subscribers is not None:
+            subscribers.discard(session)
+
+    def count(self, uri: Optional[str] = None) -> int:
+        if uri is not None:
+            return len(self._subscribers.get(uri, ()))
+        return sum(len(s) for s in self._subscribers.values())
+
+    async def notify(self, uri: str) -> int:
+        """Send resources/updated to every subscriber of ``uri``; returns how many got it"""
+        from pydantic import AnyUrl
+
+        sent = 0
+        for session in list(self._subscribers.get(uri, ())):
+            try:
+                await session.send_resource_updated(AnyUrl(uri))
+                sent += 1
+            except Exception as e:
+                # Closed connection: forget the subscriber
+                logger.debug("Dropping subscriber of %s: %s", uri, e)
+                self.unsubscribe(uri, session)
+        return sent
+
+
+async def watch_resources(
+    catalog: ResourceCatalog,
+    subscriptions: ResourceSubscriptions,
+    interval: float,
+    before_refresh: Optional[Callable[[], Any]] = None,
+) -> None:
+    """
+    Background loop: every ``interval`` seconds re-check the sources (off the
+    event loop) and notify subscribers of resources whose content changed.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if before_refresh is not None:
+                await asyncio.to_thread(before_refresh)
+            if subscriptions.count():
+                await asyncio.to_thread(catalog.refresh_all)
+            for uri in catalog.drain_changes():
+                await subscriptions.notify(uri)
+        except Exception:
+            logger.exception("Resource refresh failed")
@@ -0,0 +1,217 @@
+"""
+SESSION RETENTION
+=================
+
+Retention policies for sessions and the incremental garbage collector
+that enforces them.
+
+Each terminal status (completed, failed, cancelled) has its own policy
+bounding age, count and stored bytes. Pending and in-progress sessions
+are only collected once stale: every analyze/preview/execute call
+creates one, and most are never reported on. The collector works in small time slices - one page
+of the store per unit of work - so it can run next to tool calls without
+holding store locks for long.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("orchestrator-mcp.retention")
+
+
+@dataclass
+class RetentionPolicy:
+    """Limits for one session status; None means unlimited"""
+    max_age_days: Optional[float] = None
+    max_count: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+
+# Failed sessions are kept longest: their "what not to do" docs and
+# durations feed estimation and anti-pattern tracking
+DEFAULT_RETENTION: Dict[str, RetentionPolicy] = {
+    "completed": RetentionPolicy(max_age_days=180, max_count=20000, max_bytes=256 * 1024 * 1024),
+    "failed": RetentionPolicy(max_age_days=365, max_count=20000, max_bytes=128 * 1024 * 1024),
+    "cancelled": RetentionPolicy(max_age_days=30, max_count=2000, max_bytes=32 * 1024 * 1024),
+    # Abandoned plans: started long ago and never finished
+    "pending": RetentionPolicy(max_age_days=7, max_count=5000),
+    "in_progress": RetentionPolicy(max_age_days=30),
+}
+
+
+def load_retention_policies(raw: Optional[str]) -> Dict[str, RetentionPolicy]:
+    """
+    Build the per-status policies from a JSON override such as
+    ``{"cancelled": {"max_age_days": 7}, "completed": {"max_bytes": null}}``.
+    Unspecified statuses and limits keep their defaults; null removes a limit.
+    """
+    policies = {
+        status: RetentionPolicy(**vars(policy)) for status, policy in DEFAULT_RETENTION.items()
+    }
+    if not raw:
+        return policies
+
+    overrides = json.loads(raw)
+    known = {f.name for f in fields(RetentionPolicy)}
+    for status, limits in overrides.items():
+        if status not in policies:
+            raise ValueError(f"No retention for status '{status}' (use {', '.join(policies)})")
+        unknown = set(limits) - known
+        if unknown:
+            raise ValueError(f"Unknown retention limits: {', '.join(sorted(unknown))}")
+        for name, value in limits.items():
+            setattr(policies[status], name, value)
+    return policies
+
+
+class SessionGarbageCollector:
+    """
+    Enforces retention policies against a SessionStore, one slice at a time.
+
+    A cycle visits every policy in two passes over the store's storage
+    order (oldest first): a measuring pass summing count and bytes, then a
+    sweeping pass deleting the oldest sessions until every limit holds.
+    Because storage order is creation order, the sweep stops at the first
+    session that violates no limit. The cycle ends with store compaction.
+
+    ``is_protected(session_id)`` vetoes deletions (e.g. sessions with
+    unsaved changes); ``on_deleted(ids)`` lets callers drop cached copies.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        policies: Dict[str, RetentionPolicy],
+        is_protected: Callable[[str], bool] = lambda session_id: False,
+        on_deleted: Callable[[List[str]], None] = lambda session_ids: None,
+        page_size: int = 200,
+    ) -> None:
+        self.store = store
+        self.policies = policies
+        self.is_protected = is_protected
+        self.on_deleted = on_deleted
+        self.page_size = page_size
+        self.deleted_total = 0
+        self.cycles = 0
+        self._phases: List[Callable[[], bool]] = []
+        self._state: Dict[str, Any] = {}
+        self._budget = 0.01
+        self._step_lock = threading.Lock()
+
+    # -- scheduling -------------------------------------------------------
+
+    def start_cycle(self) -> None:
+        """Queue a full collection cycle (no-op while one is running)."""
+        if self._phases:
+            return
+        for status, policy in self.policies.items():
+            if policy.max_age_days is None and policy.max_count is None \
+                    and policy.max_bytes is None:
+                continue
+            self._phases.append(self._measure_phase(status))
+            self._phases.append(self._sweep_phase(status, policy))
+        self._phases.append(self._compact_phase())
+
+    def step(self, budget: float = 0.01) -> bool:
+        """
+        Run queued work for about ``budget`` seconds.
+        Returns True while the current cycle has work left.
+        """
+        with self._step_lock:
+            self._budget = budget
+            deadline = time.monotonic() + budget
+            while self._phases:
+                if self._phases[0]():
+                    self._phases.pop(0)
+                    if not self._phases:
+                        self.cycles += 1
+                if time.monotonic() >= deadline:
+                    break
+            return bool(self._phases)
+
+    def stop(self) -> None:
+        """Abandon the current cycle, waiting for a running slice to end."""
+        with self._step_lock:
+            self._phases = []
+
+    def collect(self) -> None:
+        """Run a whole cycle synchronously (tests, maintenance scripts)."""
+        self.start_cycle()
+        while self.step(1.0):
+            pass
+
+    async def run(self, interval: float, slice_seconds: float, pause: float = 0.05) -> None:
+        """Background loop: a cycle every ``interval`` seconds, sliced off the event loop."""
+        while True:
+            self.start_cycle()
+            try:
+                while await asyncio.to_thread(self.step, slice_seconds):
+                    await asyncio.sleep(pause)
+            except Exception:
+                logger.exception("Session garbage collection failed")
+                self._phases = []
+            await asyncio.sleep(interval)
+
+    # -- phases (each call does one unit of work, returns True when done) --
+
+    def _measure_phase(self, status: str) -> Callable[[], bool]:
+        totals = {"count": 0, "bytes": 0, "after": None}
+        self._state[status] = totals
+
+        def measure() -> bool:
+            page, totals["after"] = self.store.oldest(status, self.page_size * 5, totals["after"])
+            totals["count"] += len(page)
+            totals["bytes"] += sum(entry["size"] for entry in page)
+            return totals["after"] is None
+
+        return measure
+
+    def _sweep_phase(self, status: str, policy: RetentionPolicy) -> Callable[[], bool]:
+        cursor = {"after": None}
+
+        def sweep() -> bool:
+            totals = self._state[status]
+            cutoff = None
+            if policy.max_age_days is not None:
+                cutoff = (datetime.now() - timedelta(days=policy.max_age_days)).isoformat()
+
+            page, next_after = self.store.oldest(status, self.page_size, cursor["after"])
+            doomed = []
+            done = next_after is None
+            for entry in page:
+                over_count = policy.max_count is not None and totals["count"] > policy.max_count
+                over_bytes = policy.max_bytes is not None and totals["bytes"] > policy.max_bytes
+                expired = cutoff is not None and entry["started_at"] < cutoff
+                if not (over_count or over_bytes or expired):
+                    done = True
+                    break
+                if self.is_protected(entry["session_id"]):
+                    continue
+                doomed.append(entry["session_id"])
+                totals["count"] -= 1
+                totals["bytes"] -= entry["size"]
+            cursor["after"] = next_after
+
+            if doomed:
+                self.store.delete_many(doomed)
+                self.deleted_total += len(doomed)
+                self.on_deleted(doomed)
+                logger.info("Retention: removed %s %s sessions", len(doomed), status)
+            return done
+
+        return sweep
+
+    def _compact_phase(self) -> Callable[[], bool]:
+        def compact() -> bool:
+            return not self.store.compact_step(self._budget)
+
+        return compact
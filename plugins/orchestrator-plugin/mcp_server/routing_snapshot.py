@@ -0,0 +1,195 @@
+"""
+ROUTING SNAPSHOT
+================
+
+Precompiled routing tables (keyword -> expert, expert -> model, priority
+and specialization), cached on disk with ``marshal``.
+
+The tables are compiled from the hardcoded baseline, keyword-mappings.json
+and agent-registry.json. The snapshot is keyed by a content hash of those
+sources and also records their stat signatures, so loading it is:
+
+- signatures unchanged: one ``marshal.loads``, no JSON parsing;
+- signatures changed, content unchanged (a touch, a checkout): the sources
+  are hashed and the snapshot is reused with the new signatures;
+- content changed, or no usable snapshot: the tables are compiled again
+  and the snapshot rewritten atomically.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import hashlib
+import logging
+import marshal
+import os
+import time
+from typing import Any, Callable, Collection, Dict, List, Optional, Sequence
+
+from resources import file_signature
+
+logger = logging.getLogger("orchestrator-mcp")
+
+# Bump when the layout of the snapshot or of its tables changes
+SNAPSHOT_FORMAT = 1
+
+TABLES = ("keywords", "models", "priorities", "specializations")
+EXPERT_DIRS = ("core/", "experts/")
+
+
+# =============================================================================
+# KEYS
+# =============================================================================
+
+def content_key(sources: Sequence[str], baseline: str = "") -> str:
+    """Hash of the snapshot format, the baseline digest and the bytes of every source"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(b"%d\0%s\0" % (SNAPSHOT_FORMAT, baseline.encode()))
+    for path in sources:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            digest.update(b"\0missing\0")
+            continue
+        digest.update(b"%d\0" % len(data))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def baseline_digest(tables: Dict[str, Dict[str, str]]) -> str:
+    """Digest of the hardcoded tables, so editing them invalidates the snapshot"""
+    data = marshal.dumps([(name, sorted(tables[name].items())) for name in TABLES])
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# =============================================================================
+# COMPILE HELPERS
+# =============================================================================
+
+def apply_agent_registry(tables: Dict[str, Dict[str, str]], registry: Dict[str, Any]) -> int:
+    """
+    Fill gaps in the model and specialization tables from agent-registry.json.
+    Registry entries never override the mappings; returns the entries used.
+    """
+    used = 0
+    for section in ("core", "experts"):
+        for entry in registry.get(section) or []:
+            if not isinstance(entry, dict) or not isinstance(entry.get("file"), str):
+                continue
+            expert_file = entry["file"]
+            added = False
+            if entry.get("specialization") and expert_file not in tables["specializations"]:
+                tables["specializations"][expert_file] = str(entry["specialization"])
+                added = True
+            if entry.get("defaultModel") and expert_file not in tables["models"]:
+                tables["models"][expert_file] = str(entry["defaultModel"])
+                added = True
+            used += added
+    return used
+
+
+def validate_routing_tables(
+    tables: Dict[str, Dict[str, str]],
+    models: Collection[str],
+    priorities: Collection[str]
+) -> List[str]:
+    """Drop entries the router could not use; returns one message per entry dropped"""
+    problems = []
+
+    def valid_expert(expert_file: Any) -> bool:
+        return (isinstance(expert_file, str) and expert_file.endswith(".md")
+                and expert_file.startswith(EXPERT_DIRS) and ".." not in expert_file)
+
+    for keyword, expert_file in list(tables["keywords"].items()):
+        if not keyword or not valid_expert(expert_file):
+            problems.append(f"keyword {keyword!r}: invalid expert file {expert_file!r}")
+            del tables["keywords"][keyword]
+    for table, allowed in (("models", models), ("priorities", priorities)):
+        for expert_file, value in list(tables[table].items()):
+            if not valid_expert(expert_file) or value not in allowed:
+                problems.append(f"{table} {expert_file!r}: invalid value {value!r}")
+                del tables[table][expert_file]
+    for expert_file in list(tables["specializations"]):
+        if not valid_expert(expert_file):
+            problems.append(f"specializations {expert_file!r}: invalid expert file")
+            del tables["specializations"][expert_file]
+    return problems
+
+
+# =============================================================================
+# SNAPSHOT
+# =============================================================================
+
+class RoutingSnapshot:
+    """On-disk cache of the compiled routing tables for a set of source files"""
+
+    def __init__(self, path: str, sources: Sequence[str], baseline: str = "") -> None:
+        self.path = path
+        self.sources = tuple(sources)
+        self.baseline = baseline
+        # How the last load() got its tables: "snapshot", "rehashed" or "compiled"
+        self.last_origin: Optional[str] = None
+        self.last_load_ms = 0.0
+        self.compiles = 0
+
+    def signature(self) -> tuple:
+        return file_signature(*self.sources)
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """The stored snapshot, or None if missing, unreadable or of another format"""
+        try:
+            with open(self.path, "rb") as f:
+                snapshot = marshal.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable routing snapshot %s: %s", self.path, e)
+            return None
+        if (not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT
+                or not isinstance(snapshot.get("tables"), dict)):
+            return None
+        return snapshot
+
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        """Replace the snapshot atomically; failures are logged, not raised"""
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".routing-", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(marshal.dumps(snapshot))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning("Could not write routing snapshot %s: %s", self.path, e)
+
+    def load(self, compile_tables: Callable[[], Dict[str, Dict[str, str]]]) -> Dict[str, Dict[str, str]]:
+        """The routing tables, compiled again only if a source changed"""
+        start = time.perf_counter()
+        # Stat before reading, so a change made while compiling is seen next time
+        signature = self.signature()
+        snapshot = self.read()
+        if (snapshot is not None and snapshot.get("signature") == signature
+                and snapshot.get("baseline") == self.baseline):
+            origin = "snapshot"
+        else:
+            key = content_key(self.sources, self.baseline)
+            if snapshot is not None and snapshot.get("key") == key:
+                origin = "rehashed"
+            else:
+                origin = "compiled"
+                snapshot = {"format": SNAPSHOT_FORMAT, "key": key, "tables": compile_tables()}
+                self.compiles += 1
+            snapshot["signature"] = signature
+            snapshot["baseline"] = self.baseline
+            self.write(snapshot)
+        self.last_origin = origin
+        self.last_load_ms = (time.perf_counter() - start) * 1000.0
+        logger.debug("Routing tables from %s in %.3f ms", origin, self.last_load_ms)
+        return snapshot["tables"]
@@ -0,0 +1,225 @@
+"""
+SESSION SEARCH INDEX
+====================
+
+Incrementally maintained inverted index over orchestration sessions with
+BM25 ranking, metadata filters and stateless cursor pagination.
+
+Indexed text per session: the user request, detected domains, the expert
+names of every task and all task documentation (what was done, what not
+to do, files changed).
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import base64
+import hashlib
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Letters (including accented Italian ones) and digits
+_TOKEN_RE = re.compile(r"[0-9a-zà-öø-ÿ]+")
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Parts of expert paths shared by (nearly) every session: directories, the
+# extension, and the documenter every plan ends with (RULE #5). Indexed,
+# they would only add postings that every query on them has to walk
+EXPERT_STOP_WORDS = frozenset({"core", "experts", "l2", "md", "expert", "documenter"})
+
+# Metadata kept per document: [started_at, status, domains, user_request]
+_STARTED_AT, _STATUS, _DOMAINS, _REQUEST = range(4)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; single characters are dropped."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+def expert_terms(expert_file: str) -> str:
+    """Searchable words of an expert path: experts/L2/db-query-optimizer.md -> db query optimizer"""
+    return " ".join(t for t in tokenize(expert_file) if t not in EXPERT_STOP_WORDS)
+
+
+def record_text(record: Dict[str, Any]) -> str:
+    """Concatenate the searchable fields of a session record."""
+    parts = [record.get("user_request", "")]
+    parts.extend(record.get("domains") or [])
+    plan = record.get("plan") or {}
+    parts.extend(expert_terms(task.get("agent_expert_file", "")) for task in plan.get("tasks", []))
+    for doc in record.get("task_docs") or []:
+        parts.append(doc.get("what_done", ""))
+        parts.append(doc.get("what_not_to_do", ""))
+        parts.extend(doc.get("files_changed") or [])
+    return "\n".join(parts)
+
+
+class SessionSearchIndex:
+    """
+    Thread-safe inverted index with BM25 scoring.
+
+    ``update`` replaces the postings of one session, so the index can be
+    fed every record the persistence writer stores. Queries only touch the
+    postings lists of their own terms and keep a bounded heap of the best
+    hits, so their cost depends on term selectivity rather than on the
+    total number of sessions.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._meta: Dict[str, List[Any]] = {}
+        self._total_len = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    # -- maintenance ------------------------------------------------------
+
+    def update(self, record: Dict[str, Any]) -> None:
+        """Index (or re-index) one session record."""
+        doc_id = record["session_id"]
+        terms = Counter(tokenize(record_text(record)))
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+            self._doc_terms[doc_id] = dict(terms)
+            length = sum(terms.values())
+            self._doc_len[doc_id] = length
+            self._total_len += length
+            self._meta[doc_id] = [
+                record["started_at"],
+                record["status"],
+                list(record.get("domains") or []),
+                record.get("user_request", "")[:200],
+            ]
+
+    def update_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.update(record)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+        self._meta.pop(doc_id, None)
+
+    # -- querying ---------------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        status: Optional[str] = None,
+        domain: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Return ``(hits, next_cursor)`` ordered by BM25 score.
+
+        ``since``/``until`` are inclusive ISO dates or datetimes compared
+        against the session start. ``cursor`` is the opaque value returned
+        by the previous page of the same query.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        fingerprint = self._fingerprint(terms, status, domain, since, until)
+        after = self._decode_cursor(cursor, fingerprint) if cursor else None
+
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not terms or not n_docs:
+                return [], None
+            avg_len = self._total_len / n_docs
+
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            def candidates():
+                for doc_id, score in scores.items():
+                    score = round(score, 6)
+                    if after is not None and (-score, doc_id) <= after:
+                        continue
+                    meta = self._meta[doc_id]
+                    if status is not None and meta[_STATUS] != status:
+                        continue
+                    if domain is not None and domain not in meta[_DOMAINS]:
+                        continue
+                    if since is not None and meta[_STARTED_AT][:len(since)] < since:
+                        continue
+                    if until is not None and meta[_STARTED_AT][:len(until)] > until:
+                        continue
+                    yield (-score, doc_id)
+
+            # One extra hit tells whether another page exists
+            page = heapq.nsmallest(limit + 1, candidates())
+            hits = [
+                {
+                    "session_id": doc_id,
+                    "score": -neg_score,
+                    "user_request": self._meta[doc_id][_REQUEST],
+                    "status": self._meta[doc_id][_STATUS],
+                    "started_at": self._meta[doc_id][_STARTED_AT],
+                    "domains": list(self._meta[doc_id][_DOMAINS]),
+                }
+                for neg_score, doc_id in page[:limit]
+            ]
+
+        next_cursor = None
+        if len(page) > limit:
+            last = page[limit - 1]
+            next_cursor = self._encode_cursor(last, fingerprint)
+        return hits, next_cursor
+
+    # -- cursors ----------------------------------------------------------
+
+    @staticmethod
+    def _fingerprint(terms: List[str], *filters: Optional[str]) -> str:
+        raw = json.dumps([terms, filters], separators=(",", ":"))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+    @staticmethod
+    def _encode_cursor(position: Tuple[float, str], fingerprint: str) -> str:
+        raw = json.dumps([position[0], position[1], fingerprint], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, fingerprint: str) -> Tuple[float, str]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            neg_score, doc_id, cursor_fp = json.loads(base64.urlsafe_b64decode(padded))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if cursor_fp != fingerprint:
+            raise ValueError("Cursor does not belong to this query")
+        return (float(neg_score), str(doc_id))
@@ -15,42 +15,86 @@ Total Agents: 36 (6 Core + 15 L1 Expert + 15 L2 Sub-Agent)
 """
 
 import asyncio
+import importlib
+import itertools
 import json
 import logging
 import os
 import re
 import sys
-import uuid
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional, Sequence
-from dataclasses import dataclass, asdict
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from log_pipeline import configure_logging, stop_logging
+from metrics_exporter import CountHistogram, LabelLimiter, MetricFamily, MetricsExporter
+from progress import ProgressMiddleware, ProgressSender, report_progress
+from resources import ResourceCatalog, ResourceSubscriptions, file_signature, watch_resources
+from retention import RetentionPolicy, SessionGarbageCollector, load_retention_policies
+from routing_snapshot import (
+    RoutingSnapshot,
+    apply_agent_registry,
+    baseline_digest,
+    validate_routing_tables,
+)
+from search_index import SessionSearchIndex
+from session_ids import new_session_id, session_sort_key
+from session_store import (
+    CoalescingWriter,
+    LRUSessionCache,
+    SessionStore,
+    create_session_store,
+    record_summary,
+)
+from task_events import (
+    TASK_CANCELLED,
+    TASK_COMPLETED,
+    TASK_FAILED,
+    TASK_STARTED,
+    CircuitBreakerFeed,
+    DurationEstimator,
+    TaskEvent,
+    TaskEventBus,
+    TaskThroughput,
+)
+from telemetry import LoopLagMonitor, hit_rate, process_stats
+from tool_registry import (
+    AdmissionMiddleware,
+    ResponseCacheMiddleware,
+    SingleFlightMiddleware,
+    TimingMiddleware,
+    ToolError,
+    ToolHandler,
+    ToolRegistry,
+    output_mode,
+)
 
-# ProcessManager import - Windows process lifecycle management
-# Add lib directory to path for ProcessManager import
+# Modules of the plugin checkout outside this package, imported on first use:
+# ProcessManager (lib/, Windows process lifecycle management) and
+# MetricTracker (agents/scripts/, agents circuit breaker)
 _LIB_DIR = Path(__file__).parent.parent.parent.parent / "lib"
-if str(_LIB_DIR) not in sys.path:
-    sys.path.insert(0, str(_LIB_DIR))
+_AGENT_SCRIPTS_DIR = Path(__file__).parent.parent.parent.parent / "agents" / "scripts"
 
-try:
-    from process_manager import ProcessManager, ProcessManagerError, health_check as pm_health_check
-    PROCESS_MANAGER_AVAILABLE = True
-except ImportError:
-    PROCESS_MANAGER_AVAILABLE = False
-    ProcessManager = None  # type: ignore
+def _import_plugin_module(directory: Path, name: str) -> Any:
+    """Import ``name``, adding ``directory`` to sys.path only if it is not importable yet"""
+    try:
+        return importlib.import_module(name)
+    except ModuleNotFoundError as e:
+        if e.name != name or str(directory) in sys.path:
+            raise
+    sys.path.insert(0, str(directory))
+    return importlib.import_module(name)
 
 # MCP imports
-from mcp.server.models import InitializationOptions
-from mcp.server import NotificationOptions, Server
+from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 from mcp.server.stdio import stdio_server
-from mcp.types import (
-    Tool,
-    TextContent,
-    ImageContent,
-    EmbeddedResource,
-    LoggingLevel
-)
+from mcp.types import EmbeddedResource, ImageContent, LoggingLevel, Resource, TextContent, Tool
 
 # =============================================================================
 # CONFIGURATION
@@ -58,20 +102,102 @@ from mcp.types import (
 
 PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CONFIG_DIR = os.path.join(PLUGIN_DIR, "config")
-DATA_DIR = os.path.join(PLUGIN_DIR, "data")
+DATA_DIR = os.environ.get("ORCHESTRATOR_DATA_DIR") or os.path.join(PLUGIN_DIR, "data")
 AGENTS_REGISTRY = os.path.join(CONFIG_DIR, "agent-registry.json")
 KEYWORD_MAPPINGS = os.path.join(CONFIG_DIR, "keyword-mappings.json")
-SESSIONS_FILE = os.path.join(DATA_DIR, "sessions.json")
+ORCHESTRATOR_CONFIG = os.path.join(CONFIG_DIR, "orchestrator-config.json")
+SESSIONS_FILE = os.path.join(DATA_DIR, "sessions.json")  # legacy, migrated on first start
+SESSIONS_LOG = os.path.join(DATA_DIR, "sessions.jsonl")
+SESSIONS_INDEX = os.path.join(DATA_DIR, "sessions.idx")
+SESSIONS_DB = os.path.join(DATA_DIR, "sessions.db")
+# Compiled routing tables, rebuilt when keyword-mappings.json or agent-registry.json changes
+ROUTING_SNAPSHOT = os.environ.get("ORCHESTRATOR_ROUTING_SNAPSHOT") or os.path.join(DATA_DIR, "routing.snapshot")
+
+# Session persistence backend: "json" (sessions.jsonl log) or "sqlite"
+SESSION_BACKEND = os.environ.get("ORCHESTRATOR_SESSION_BACKEND", "json").lower()
+
+# Coalescing window for background session writes (milliseconds)
+PERSIST_WINDOW_MS = float(os.environ.get("ORCHESTRATOR_PERSIST_WINDOW_MS", "20"))
+
+# Bounds of the in-memory hot cache of sessions (older ones are faulted in from the store)
+SESSION_CACHE_SIZE = int(os.environ.get("ORCHESTRATOR_SESSION_CACHE_SIZE", "256"))
+SESSION_CACHE_MB = float(os.environ.get("ORCHESTRATOR_SESSION_CACHE_MB", "32"))
+
+# Retention of finished sessions: JSON overrides of the per-status defaults
+# (see retention.DEFAULT_RETENTION), e.g. '{"cancelled": {"max_age_days": 7}}'
+RETENTION_JSON = os.environ.get("ORCHESTRATOR_RETENTION", "")
+# Background GC: seconds between cycles, and the length of one work slice (ms)
+GC_INTERVAL = float(os.environ.get("ORCHESTRATOR_GC_INTERVAL", "600"))
+GC_SLICE_MS = float(os.environ.get("ORCHESTRATOR_GC_SLICE_MS", "10"))
+
+# Max simultaneous calls of each plan-generating tool (analyze/execute/preview)
+PLAN_CONCURRENCY = int(os.environ.get("ORCHESTRATOR_PLAN_CONCURRENCY", "8"))
+# Worker threads running blocking tool calls (plan generation, store reads)
+TOOL_WORKERS = int(os.environ.get("ORCHESTRATOR_TOOL_WORKERS", "8"))
+# Admission control: calls running at once, calls allowed to wait, max wait
+ADMISSION_MAX_INFLIGHT = int(os.environ.get("ORCHESTRATOR_MAX_INFLIGHT", "32"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ORCHESTRATOR_MAX_QUEUE", "256"))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get("ORCHESTRATOR_QUEUE_TIMEOUT", "10"))
+# Per-tool caps overriding the defaults, e.g. {"orchestrator_execute": 4}
+TOOL_LIMITS_JSON = os.environ.get("ORCHESTRATOR_TOOL_LIMITS", "")
+# Max MCP progress notifications per second and tool call (0 = disabled)
+PROGRESS_RATE = float(os.environ.get("ORCHESTRATOR_PROGRESS_RATE", "10"))
+# Seconds between checks for changed resource sources (config files, sessions)
+RESOURCE_POLL_INTERVAL = float(os.environ.get("ORCHESTRATOR_RESOURCE_POLL", "2"))
+# Seconds between event-loop lag samples (orchestrator_metrics)
+LOOP_LAG_INTERVAL = float(os.environ.get("ORCHESTRATOR_LOOP_LAG_INTERVAL", "0.5"))
+# OpenMetrics export: file rewritten every interval and/or localhost port (0 = off)
+METRICS_FILE = os.environ.get("ORCHESTRATOR_METRICS_FILE") or None
+METRICS_PORT = int(os.environ.get("ORCHESTRATOR_METRICS_PORT", "0"))
+METRICS_INTERVAL = float(os.environ.get("ORCHESTRATOR_METRICS_INTERVAL", "15"))
+# Max distinct values per label (tool, expert, model); later ones become "other"
+METRICS_MAX_LABEL_VALUES = int(os.environ.get("ORCHESTRATOR_METRICS_MAX_LABEL_VALUES", "50"))
+# Bucket bounds of the tasks-per-plan histogram
+PLAN_SIZE_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+# Transport: "stdio" (one process per client) or "http" (one shared local server)
+TRANSPORT = os.environ.get("ORCHESTRATOR_TRANSPORT", "stdio").lower()
+HTTP_HOST = os.environ.get("ORCHESTRATOR_HTTP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.environ.get("ORCHESTRATOR_HTTP_PORT", "8765"))
+HTTP_SOCKET = os.environ.get("ORCHESTRATOR_HTTP_SOCKET") or None  # Unix socket path
+HTTP_MAX_CLIENTS = int(os.environ.get("ORCHESTRATOR_HTTP_MAX_CLIENTS", "32"))
+HTTP_IDLE_TIMEOUT = float(os.environ.get("ORCHESTRATOR_HTTP_IDLE_TIMEOUT", "1800"))
+# Shared daemon behind the orchestrator-mcp stdio shim (socket path: see shim.py)
+DAEMON_IDLE_EXIT = float(os.environ.get("ORCHESTRATOR_DAEMON_IDLE_EXIT", "900"))
+
+# Opt-in execution engine: command launched per task by orchestrator_execute(run=true),
+# e.g. 'claude -p "{description}" --model {model}' (placeholders: see task_runner.py)
+EXEC_COMMAND = os.environ.get("ORCHESTRATOR_EXEC_COMMAND", "")
+EXEC_LOG_DIR = os.environ.get("ORCHESTRATOR_EXEC_LOG_DIR") or os.path.join(DATA_DIR, "runs")
+# Seconds a cancelled task gets after SIGTERM before it is killed
+CANCEL_GRACE = float(os.environ.get("ORCHESTRATOR_CANCEL_GRACE", "5"))
+
+# Logging: level, optional rotating JSON-lines file, repeated-message rate limit
+LOG_LEVEL = os.environ.get("ORCHESTRATOR_LOG_LEVEL", "INFO")
+LOG_FILE = os.environ.get("ORCHESTRATOR_LOG_FILE") or None
+LOG_MAX_MB = float(os.environ.get("ORCHESTRATOR_LOG_MAX_MB", "10"))
+LOG_BACKUPS = int(os.environ.get("ORCHESTRATOR_LOG_BACKUPS", "5"))
+LOG_REPEAT_WINDOW = float(os.environ.get("ORCHESTRATOR_LOG_REPEAT_WINDOW", "60"))
+LOG_REPEAT_BURST = int(os.environ.get("ORCHESTRATOR_LOG_REPEAT_BURST", "10"))
+
+# Feed task reports to the agents circuit breaker (MetricTracker)
+CIRCUIT_BREAKER_ENABLED = os.environ.get("ORCHESTRATOR_CIRCUIT_BREAKER", "1") != "0"
+CIRCUIT_BREAKER_FILE = os.environ.get("ORCHESTRATOR_CIRCUIT_BREAKER_FILE") or None
+
+# Logging is configured by main() (see log_pipeline.py), never at import
+logger = logging.getLogger("orchestrator-mcp")
 
-# Ensure data directory exists
-os.makedirs(DATA_DIR, exist_ok=True)
 
-# Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger("orchestrator-mcp")
+def load_retention(raw: str) -> Dict[str, RetentionPolicy]:
+    """Retention policies from ORCHESTRATOR_RETENTION; invalid overrides are ignored"""
+    try:
+        return load_retention_policies(raw)
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning("Ignoring invalid ORCHESTRATOR_RETENTION: %s", e)
+        return load_retention_policies(None)
+
+
+RETENTION_POLICIES = load_retention(RETENTION_JSON)
 
 # =============================================================================
 # FIX #4: CENTRALIZED KEYWORD LOADER - Load from JSON config
@@ -86,12 +212,23 @@ def load_keyword_mappings_from_json() -> Dict[str, Dict[str, Any]]:
         if os.path.exists(KEYWORD_MAPPINGS):
             with open(KEYWORD_MAPPINGS, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                logger.info(f"Loaded keyword mappings from {KEYWORD_MAPPINGS}")
+                logger.info("Loaded keyword mappings from %s", KEYWORD_MAPPINGS)
                 return data
         else:
-            logger.warning(f"Keyword mappings file not found: {KEYWORD_MAPPINGS}")
+            logger.warning("Keyword mappings file not found: %s", KEYWORD_MAPPINGS)
+    except Exception as e:
+        logger.error("Error loading keyword mappings: %s", e)
+    return {}
+
+def load_agent_registry() -> Dict[str, Any]:
+    """Load agent-registry.json; empty dict if missing or invalid"""
+    try:
+        with open(AGENTS_REGISTRY, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning("Agent registry not found: %s", AGENTS_REGISTRY)
     except Exception as e:
-        logger.error(f"Error loading keyword mappings: {e}")
+        logger.error("Error loading agent registry: %s", e)
     return {}
 
 def build_keyword_expert_map(mappings_data: Dict[str, Any]) -> Dict[str, str]:
@@ -149,14 +286,6 @@ def build_expert_priority_map(mappings_data: Dict[str, Any]) -> Dict[str, str]:
 
     return priority_map
 
-# Load centralized mappings at startup
-_LOADED_MAPPINGS = load_keyword_mappings_from_json()
-_KEYWORD_MAP_FROM_JSON = build_keyword_expert_map(_LOADED_MAPPINGS)
-_MODEL_MAP_FROM_JSON = build_expert_model_map(_LOADED_MAPPINGS)
-_PRIORITY_MAP_FROM_JSON = build_expert_priority_map(_LOADED_MAPPINGS)
-
-logger.info(f"Loaded {len(_KEYWORD_MAP_FROM_JSON)} keywords from centralized config")
-
 # =============================================================================
 # TYPES & ENUMS
 # =============================================================================
@@ -233,6 +362,59 @@ class OrchestrationSession:
         if self.task_docs is None:
             self.task_docs = []
 
+
+def session_to_record(session: OrchestrationSession) -> Dict[str, Any]:
+    """Serialize a session into the JSON-safe record used by session stores"""
+    return {
+        "session_id": session.session_id,
+        "user_request": session.user_request,
+        "status": session.status.value,
+        "started_at": session.started_at.isoformat(),
+        "completed_at": session.completed_at.isoformat() if session.completed_at else None,
+        "tasks_count": len(session.plan.tasks) if session.plan else 0,
+        "domains": list(session.plan.domains) if session.plan else [],
+        "plan": asdict(session.plan) if session.plan else None,
+        "results": session.results,
+        "task_docs": [asdict(doc) for doc in session.task_docs],
+    }
+
+def estimate_session_size(session: OrchestrationSession) -> int:
+    """
+    Cheap estimate of a session's memory footprint in bytes.
+    Counts text payloads plus a fixed overhead per object instead of walking
+    the whole object graph, so it can run on every mutation.
+    """
+    size = 1024 + 2 * len(session.user_request)
+    if session.plan:
+        for task in session.plan.tasks:
+            size += 768 + 2 * (len(task.description) + len(task.specialization))
+    size += 512 * len(session.results)
+    for doc in session.task_docs:
+        size += 512 + 2 * (len(doc.what_done) + len(doc.what_not_to_do))
+    return size
+
+def session_from_record(record: Dict[str, Any]) -> OrchestrationSession:
+    """Rebuild a full session (plan, tasks, docs) from a stored record"""
+    plan_data = record.get("plan")
+    plan = None
+    if plan_data:
+        plan = ExecutionPlan(**dict(
+            plan_data,
+            tasks=[AgentTask(**task) for task in plan_data["tasks"]]
+        ))
+
+    completed_at = record.get("completed_at")
+    return OrchestrationSession(
+        session_id=record["session_id"],
+        user_request=record["user_request"],
+        status=TaskStatus(record["status"]),
+        plan=plan,
+        started_at=datetime.fromisoformat(record["started_at"]),
+        completed_at=datetime.fromisoformat(completed_at) if completed_at else None,
+        results=record.get("results") or [],
+        task_docs=[TaskDocumentation(**doc) for doc in record.get("task_docs") or []]
+    )
+
 # =============================================================================
 # KEYWORD MAPPINGS (from orchestrator-core.ts)
 # =============================================================================
@@ -541,18 +723,125 @@ EXPERT_TO_PRIORITY_MAPPING = {
 # FIX #4: MERGE JSON MAPPINGS - JSON takes precedence over hardcoded
 # =============================================================================
 
-# Merge JSON-loaded mappings into hardcoded ones (JSON wins on conflicts)
-if _KEYWORD_MAP_FROM_JSON:
-    KEYWORD_TO_EXPERT_MAPPING.update(_KEYWORD_MAP_FROM_JSON)
-    logger.info(f"Merged {len(_KEYWORD_MAP_FROM_JSON)} keywords from JSON config")
-
-if _MODEL_MAP_FROM_JSON:
-    EXPERT_TO_MODEL_MAPPING.update(_MODEL_MAP_FROM_JSON)
-    logger.info(f"Merged {len(_MODEL_MAP_FROM_JSON)} model mappings from JSON config")
-
-if _PRIORITY_MAP_FROM_JSON:
-    EXPERT_TO_PRIORITY_MAPPING.update(_PRIORITY_MAP_FROM_JSON)
-    logger.info(f"Merged {len(_PRIORITY_MAP_FROM_JSON)} priority mappings from JSON config")
+# Hardcoded tables are the baseline the JSON config is merged onto
+_HARDCODED_KEYWORD_MAPPING = KEYWORD_TO_EXPERT_MAPPING
+_HARDCODED_MODEL_MAPPING = EXPERT_TO_MODEL_MAPPING
+_HARDCODED_PRIORITY_MAPPING = EXPERT_TO_PRIORITY_MAPPING
+
+def merge_keyword_mappings(
+    keyword_map: Dict[str, str],
+    model_map: Dict[str, str],
+    priority_map: Dict[str, str]
+) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+    """Merge JSON-loaded mappings into copies of the hardcoded ones (JSON wins on conflicts)"""
+    keywords = dict(_HARDCODED_KEYWORD_MAPPING)
+    models = dict(_HARDCODED_MODEL_MAPPING)
+    priorities = dict(_HARDCODED_PRIORITY_MAPPING)
+    if keyword_map:
+        keywords.update(keyword_map)
+        logger.info("Merged %s keywords from JSON config", len(keyword_map))
+    if model_map:
+        models.update(model_map)
+        logger.info("Merged %s model mappings from JSON config", len(model_map))
+    if priority_map:
+        priorities.update(priority_map)
+        logger.info("Merged %s priority mappings from JSON config", len(priority_map))
+    return keywords, models, priorities
+
+def compile_routing_tables() -> Dict[str, Dict[str, str]]:
+    """
+    Merge the hardcoded tables, keyword-mappings.json and agent-registry.json
+    into validated routing tables. Only run when the routing snapshot is stale.
+    """
+    loaded = load_keyword_mappings_from_json()
+    keywords, models, priorities = merge_keyword_mappings(
+        build_keyword_expert_map(loaded),
+        build_expert_model_map(loaded),
+        build_expert_priority_map(loaded)
+    )
+    tables = {
+        "keywords": keywords,
+        "models": models,
+        "priorities": priorities,
+        "specializations": dict(_HARDCODED_SPECIALIZATIONS),
+    }
+    filled = apply_agent_registry(tables, load_agent_registry())
+    if filled:
+        logger.info("Filled %s routing entries from the agent registry", filled)
+    problems = validate_routing_tables(
+        tables, {m.value for m in ModelType}, {p.value for p in TaskPriority}
+    )
+    for problem in problems:
+        logger.warning("Dropped routing entry: %s", problem)
+    return tables
+
+def routing_sources() -> Tuple[str, str]:
+    """Config files the routing tables are compiled from"""
+    return KEYWORD_MAPPINGS, AGENTS_REGISTRY
+
+# The routing tables are loaded on first use (ensure_keyword_mappings), not
+# at import: until then they hold the hardcoded baseline
+_MAPPINGS_LOADED = False
+_MAPPINGS_SIGNATURE = None
+_BASELINE_DIGEST: Optional[str] = None
+routing_snapshot: Optional[RoutingSnapshot] = None  # the one of the last load
+
+# Bumped on every reload; versions the payloads derived from the mappings
+MAPPINGS_GENERATION = 0
+_mappings_lock = threading.Lock()
+
+def _load_merged_mappings() -> None:
+    """Swap in the routing tables from the snapshot, compiled if stale (caller holds _mappings_lock)"""
+    global _MAPPINGS_SIGNATURE, _MAPPINGS_LOADED, _BASELINE_DIGEST, routing_snapshot
+    global KEYWORD_TO_EXPERT_MAPPING, EXPERT_TO_MODEL_MAPPING, EXPERT_TO_PRIORITY_MAPPING
+    global SPECIALIZATION_DESCRIPTIONS
+    if _BASELINE_DIGEST is None:
+        _BASELINE_DIGEST = baseline_digest({
+            "keywords": _HARDCODED_KEYWORD_MAPPING,
+            "models": _HARDCODED_MODEL_MAPPING,
+            "priorities": _HARDCODED_PRIORITY_MAPPING,
+            "specializations": _HARDCODED_SPECIALIZATIONS,
+        })
+    signature = file_signature(*routing_sources())
+    routing_snapshot = RoutingSnapshot(ROUTING_SNAPSHOT, routing_sources(), _BASELINE_DIGEST)
+    tables = routing_snapshot.load(compile_routing_tables)
+    KEYWORD_TO_EXPERT_MAPPING = tables["keywords"]
+    EXPERT_TO_MODEL_MAPPING = tables["models"]
+    EXPERT_TO_PRIORITY_MAPPING = tables["priorities"]
+    SPECIALIZATION_DESCRIPTIONS = tables["specializations"]
+    _MAPPINGS_SIGNATURE = signature
+    _MAPPINGS_LOADED = True
+
+def ensure_keyword_mappings() -> None:
+    """Merge keyword-mappings.json into the tables, once, before their first use"""
+    if _MAPPINGS_LOADED:
+        return
+    with _mappings_lock:
+        if not _MAPPINGS_LOADED:
+            _load_merged_mappings()
+            logger.info("Loaded %s keywords (routing %s in %.3f ms)", len(KEYWORD_TO_EXPERT_MAPPING),
+                        routing_snapshot.last_origin, routing_snapshot.last_load_ms)
+
+def reload_keyword_mappings_if_changed() -> bool:
+    """
+    Reload the routing tables if keyword-mappings.json or agent-registry.json
+    changed on disk.
+    The merged tables are swapped in as new objects, so readers iterating
+    the previous ones are not disturbed. Returns True on reload.
+    """
+    global MAPPINGS_GENERATION
+    if not _MAPPINGS_LOADED:
+        ensure_keyword_mappings()
+        return False
+    if file_signature(*routing_sources()) == _MAPPINGS_SIGNATURE:
+        return False
+    with _mappings_lock:
+        if file_signature(*routing_sources()) == _MAPPINGS_SIGNATURE:
+            return False
+        _load_merged_mappings()
+        MAPPINGS_GENERATION += 1
+    logger.info("Keyword mappings reloaded (%s keywords)", len(KEYWORD_TO_EXPERT_MAPPING))
+    return True
 
 # =============================================================================
 
@@ -598,54 +887,245 @@ SPECIALIZATION_DESCRIPTIONS = {
     'experts/L2/social-oauth-specialist.md': 'OAuth2 Flows, PKCE, Provider Integration',
 }
 
+# Baseline of the compiled specializations, like the _HARDCODED_* mappings above
+_HARDCODED_SPECIALIZATIONS = SPECIALIZATION_DESCRIPTIONS
+
+# =============================================================================
+# RESPONSE TEXT
+# =============================================================================
+# Static blocks of the full-mode responses, built once at import instead of
+# on every call. Compact and json output modes leave them out entirely.
+
+RULE_LINE = "=" * 50
+
+PLAN_TABLE_HEADER = "\n".join([
+    "🎯 ORCHESTRATOR v6.0 - MCP MODE (36 AGENTS)",
+    "",
+    "📋 EXECUTION PLAN",
+])
+
+AGENT_TABLE_HEADER = "\n".join([
+    "",
+    "🤖 AGENT TABLE",
+    "| # | Task | Expert File | Model | Priority | Status |",
+    "|---|------|-------------|-------|----------|--------|",
+])
+
+# FIX #11: Documentation requirements / FIX #12: Temp files cleanup rule
+PLAN_RULES_TEXT = "\n".join([
+    "",
+    "📝 DOCUMENTATION REQUIREMENTS (FIX #11):",
+    "├─ Per-task doc: MANDATORY after each task completion",
+    "├─ Format: {task_id}: {what_done} | NOT: {what_not_to_do}",
+    "├─ Final doc: Consolidate all + update files",
+    "└─ Goal: Lean, essential, clear - NO error loops",
+    "",
+    "🧹 CLEANUP OBBLIGATORIO (FIX #12):",
+    "├─ REGOLA: Chi crea file temp DEVE eliminarli",
+    "├─ Pattern: *.tmp, *.temp, *.bak, *.swp, *~, *.pyc",
+    "├─ Dirs: __pycache__, .pytest_cache, .mypy_cache",
+    "├─ Quando: DOPO ogni task + FINE orchestrazione",
+    "└─ Violazione: BLOCCA completamento task",
+])
+
+EXECUTE_BANNER = """🚀 ORCHESTRATOR v6.0 - EXECUTION MODE
+⚡ ALWAYS ON - Like Serena MCP
+
+📋 EXECUTION PREPARED
+"""
+
+EXECUTE_NEXT_STEP = """
+📝 NEXT STEP: Use Task tool to launch agents with this plan:
+
+The following agents should be launched in parallel:
+"""
+
+MANDATORY_STEP_HEADER = """
+╔══════════════════════════════════════════════════════════════════════════════╗
+║  ⚠️  MANDATORY FINAL STEP - R5 - NESSUNA ECCEZIONE                          ║
+╠══════════════════════════════════════════════════════════════════════════════╣
+║                                                                              ║
+║  DOPO che TUTTI i task sopra sono completati, DEVI eseguire:                 ║
+║                                                                              ║
+"""
+
+MANDATORY_STEP_FOOTER = """║                                                                              ║
+║  !!! SE NON ESEGUI IL DOCUMENTER, L'ORCHESTRAZIONE È FALLITA !!!            ║
+║                                                                              ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+📝 DOCUMENTER PROMPT DA USARE:
+"Documenta le modifiche di questa sessione:
+- Cosa è stato fatto (1-2 righe per task)
+- Cosa NON fare (anti-patterns)
+- File modificati
+- Aggiorna documentazione se necessario"
+"""
+
+EXECUTE_RUNNING = """
+🏃 EXECUTING ON THE SERVER
+├─ Parallel tasks: {parallel}
+├─ Logs: {log_dir}
+└─ Follow progress with orchestrator_status; the documenter runs last
+"""
+
+PREVIEW_BANNER = f"🔍 ORCHESTRATOR PREVIEW MODE\n{RULE_LINE}\n"
+PREVIEW_BREAKDOWN_HEADER = f"\n🤖 TASK BREAKDOWN\n{RULE_LINE}\n\nWork Tasks (Parallel):\n"
+
 # =============================================================================
 # ORCHESTRATOR ENGINE
 # =============================================================================
 
 class OrchestratorEngine:
-    """Core orchestration engine - ported from TypeScript"""
+    """
+    Core orchestration engine - ported from TypeScript
 
-    def __init__(self):
-        self.sessions: Dict[str, OrchestrationSession] = {}
-        self._load_sessions()  # FIX #8: Load persisted sessions
-        logger.info("Orchestrator Engine initialized")
+    Thread-safe: tool calls run on worker threads. Each session is guarded
+    by one of SESSION_LOCK_STRIPES locks (see ``session_lock``); the cache,
+    writer, store, search index and estimator carry their own locks.
+    """
+
+    SESSION_LOCK_STRIPES = 64
+
+    def __init__(self, store: Optional[SessionStore] = None):
+        # Striped per-session locks: mutations of one session are serialized,
+        # calls on different sessions almost never contend
+        self._session_locks = [threading.RLock() for _ in range(self.SESSION_LOCK_STRIPES)]
+        # Changes on every session write or removal (versions the sessions resource)
+        self._generations = itertools.count(1)
+        self.sessions_generation = 0
+        # Bounded hot cache; evicted sessions are faulted back in from the store
+        self.sessions = LRUSessionCache(
+            max_count=SESSION_CACHE_SIZE,
+            max_bytes=int(SESSION_CACHE_MB * 1024 * 1024),
+            sizeof=estimate_session_size
+        )
+        # Store, writer, collector and circuit breaker are opened on first use
+        # (see open()), so creating the engine costs no I/O
+        self._store: Optional[SessionStore] = store
+        self._writer: Optional[CoalescingWriter] = None
+        self._gc: Optional[SessionGarbageCollector] = None
+        self._circuit_breaker: Optional[CircuitBreakerFeed] = None
+        self._opened = False
+        self._open_lock = threading.Lock()
+        # Full-text index, built on first search then caught up with the
+        # store's change feed (writes and deletes of every process) per search
+        self.search_index: Optional[SessionSearchIndex] = None
+        self._search_cursor: Optional[Any] = None
+        self._search_index_lock = threading.Lock()
+        # One stream of task events feeds the estimator and the circuit breaker
+        self.events = TaskEventBus()
+        self.estimator = DurationEstimator()
+        self.events.subscribe(self.estimator)
+        self.throughput = TaskThroughput()
+        self.events.subscribe(self.throughput)
+        # Sizes (tasks per plan) of the plans generated, for the metrics export
+        self.plan_sizes = CountHistogram(PLAN_SIZE_BUCKETS)
 
     # =========================================================================
     # FIX #8: SESSION PERSISTENCE
     # =========================================================================
 
-    def _load_sessions(self) -> None:
-        """Load sessions from persistent storage"""
-        try:
-            if os.path.exists(SESSIONS_FILE):
-                with open(SESSIONS_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    logger.info(f"Loaded {len(data)} sessions from {SESSIONS_FILE}")
-                    # Sessions are stored as simplified dicts, not full objects
-        except Exception as e:
-            logger.warning(f"Could not load sessions: {e}")
+    def open(self) -> None:
+        """Open the session store and start the writer, collector and circuit breaker feed (idempotent)"""
+        if self._opened:
+            return
+        with self._open_lock:
+            if self._opened:
+                return
+            store = self._store if self._store is not None else self._load_sessions()
+            # FIX #8: writes are coalesced and performed off the event loop
+            writer = CoalescingWriter(store, self._session_record, window=PERSIST_WINDOW_MS / 1000.0)
+            # Retention: sessions with unsaved changes or still in use are never collected
+            self._gc = SessionGarbageCollector(
+                store,
+                RETENTION_POLICIES,
+                is_protected=lambda session_id: (
+                    writer.get_pending(session_id) is not None or self.sessions.is_pinned(session_id)
+                ),
+                on_deleted=self._forget_sessions
+            )
+            self._circuit_breaker = self._open_circuit_breaker()
+            if self._circuit_breaker is not None:
+                self.events.subscribe(self._circuit_breaker)
+            self._store, self._writer = store, writer
+            self._opened = True
+        logger.info("Orchestrator Engine initialized")
 
-    def _save_sessions(self) -> None:
-        """Save sessions to persistent storage"""
-        try:
-            # Keep only last 50 sessions
-            sessions_list = list(self.sessions.values())[-50:]
-            data = [
-                {
-                    "session_id": s.session_id,
-                    "user_request": s.user_request,
-                    "status": s.status.value,
-                    "started_at": s.started_at.isoformat(),
-                    "completed_at": s.completed_at.isoformat() if s.completed_at else None,
-                    "tasks_count": len(s.plan.tasks) if s.plan else 0
-                }
-                for s in sessions_list
-            ]
-            with open(SESSIONS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            logger.debug(f"Saved {len(data)} sessions to {SESSIONS_FILE}")
-        except Exception as e:
-            logger.error(f"Could not save sessions: {e}")
+    @property
+    def store(self) -> SessionStore:
+        self.open()
+        return self._store
+
+    @property
+    def writer(self) -> CoalescingWriter:
+        self.open()
+        return self._writer
+
+    @property
+    def gc(self) -> SessionGarbageCollector:
+        self.open()
+        return self._gc
+
+    @property
+    def circuit_breaker(self) -> Optional[CircuitBreakerFeed]:
+        self.open()
+        return self._circuit_breaker
+
+    def _load_sessions(self) -> SessionStore:
+        """Open the configured persistent session store"""
+        os.makedirs(DATA_DIR, exist_ok=True)
+        return create_session_store(
+            SESSION_BACKEND,
+            log_path=SESSIONS_LOG,
+            index_path=SESSIONS_INDEX,
+            sqlite_path=SESSIONS_DB,
+            legacy_path=SESSIONS_FILE
+        )
+
+    def session_lock(self, session_id: str) -> threading.RLock:
+        """Lock guarding reads and writes of one session's mutable state"""
+        return self._session_locks[hash(session_id) % self.SESSION_LOCK_STRIPES]
+
+    def _session_record(self, session: OrchestrationSession) -> Dict[str, Any]:
+        """Consistent record of a session that other threads may be mutating"""
+        with self.session_lock(session.session_id):
+            return session_to_record(session)
+
+    def _save_sessions(self, *sessions: OrchestrationSession) -> None:
+        """
+        Schedule the given sessions (default: all in memory) for persistence.
+        The background writer performs the actual disk I/O.
+        """
+        for s in (sessions or self.sessions.values()):
+            # Queue first: an evicted session must stay reachable via the writer
+            self.writer.mark_dirty(s.session_id, s)
+            self.sessions.touch(s.session_id)
+        self.sessions_generation = next(self._generations)
+
+    def flush(self) -> None:
+        """Write all pending session changes to the store now"""
+        self.writer.flush()
+
+    def _forget_sessions(self, session_ids: List[str]) -> None:
+        """Drop sessions removed by retention from the cache and search index"""
+        for session_id in session_ids:
+            self.sessions.pop(session_id)
+            if self.search_index is not None:
+                self.search_index.remove(session_id)
+        self.sessions_generation = next(self._generations)
+
+    def close(self) -> None:
+        """Flush pending changes, stop the writer and release the store"""
+        if not self._opened:
+            if self._store is not None:
+                self._store.close()
+            return
+        self._gc.stop()
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.close()
+        self._writer.close()
+        self._store.close()
 
     # =========================================================================
     # FIX #7: ESTIMATED TIME FORMULA - Improved with parallelism factor
@@ -684,9 +1164,13 @@ class OrchestratorEngine:
 
         Uses ProcessManager if available for proper process lifecycle management.
         Falls back to subprocess-based cleanup on non-Windows or if ProcessManager unavailable.
+        Termination waits and subprocess calls run on a worker thread.
         """
-        import subprocess
+        return await asyncio.to_thread(self._cleanup_orphan_processes)
+
+    def _cleanup_orphan_processes(self) -> Dict[str, Any]:
         import platform
+        import subprocess
 
         results = {"cleaned": [], "errors": [], "method": "unknown"}
         is_windows = platform.system() == "Windows"
@@ -707,6 +1191,10 @@ class OrchestratorEngine:
                         results["cleaned"].append(f"PID {pid}")
                     else:
                         results["errors"].append(f"PID {pid}: termination failed")
+                report_progress(
+                    len(termination_results), len(termination_results),
+                    f"Terminated {len(results['cleaned'])} managed processes"
+                )
 
                 # Get metrics after cleanup
                 metrics_after = pm.get_metrics()
@@ -716,14 +1204,14 @@ class OrchestratorEngine:
                 }
                 results["method"] = "ProcessManager"
 
-                logger.info(f"ProcessManager cleanup completed: {len(results['cleaned'])} cleaned, {len(results['errors'])} errors")
+                logger.info("ProcessManager cleanup completed: %s cleaned, %s errors", len(results['cleaned']), len(results['errors']))
                 return results
 
-            except ProcessManagerError as e:
-                logger.warning(f"ProcessManager cleanup failed, falling back to subprocess: {e}")
+            except process_manager_module().ProcessManagerError as e:
+                logger.warning("ProcessManager cleanup failed, falling back to subprocess: %s", e)
                 results["errors"].append(f"ProcessManager: {str(e)}")
             except Exception as e:
-                logger.warning(f"Unexpected ProcessManager error, falling back to subprocess: {e}")
+                logger.warning("Unexpected ProcessManager error, falling back to subprocess: %s", e)
                 results["errors"].append(f"ProcessManager unexpected: {str(e)}")
 
         # Fallback: subprocess-based cleanup (original implementation)
@@ -740,14 +1228,15 @@ class OrchestratorEngine:
                 ("node", "pkill -f 'node.*orchestrator' 2>/dev/null || true"),
             ]
 
-        for name, cmd in commands:
+        for step, (name, cmd) in enumerate(commands, 1):
             try:
                 subprocess.run(cmd, shell=True, capture_output=True, timeout=5)
                 results["cleaned"].append(name)
             except Exception as e:
                 results["errors"].append(f"{name}: {str(e)}")
+            report_progress(step, len(commands), f"Cleaned {name} processes")
 
-        logger.info(f"Subprocess cleanup completed: {results}")
+        logger.info("Subprocess cleanup completed: %s", results)
         return results
 
     # =========================================================================
@@ -764,7 +1253,12 @@ class OrchestratorEngine:
         - *~, *.pyc, __pycache__
         - .pytest_cache, .mypy_cache
         - node_modules/.cache
+
+        The directory walk runs on a worker thread.
         """
+        return await asyncio.to_thread(self._cleanup_temp_files, working_dir)
+
+    def _cleanup_temp_files(self, working_dir: Optional[str] = None) -> Dict[str, Any]:
         import glob
         import shutil
 
@@ -794,7 +1288,7 @@ class OrchestratorEngine:
             "**/Thumbs.db"
         ]
 
-        for pattern in TEMP_PATTERNS:
+        for step, pattern in enumerate(TEMP_PATTERNS, 1):
             try:
                 full_pattern = os.path.join(working_dir, pattern)
                 matches = glob.glob(full_pattern, recursive=True)
@@ -813,14 +1307,19 @@ class OrchestratorEngine:
                         results["errors"].append(f"{match}: {str(e)}")
             except Exception as e:
                 results["errors"].append(f"Pattern {pattern}: {str(e)}")
+            report_progress(
+                step, len(TEMP_PATTERNS),
+                f"{pattern}: {results['total_cleaned']} temp files/dirs removed"
+            )
 
         if results["total_cleaned"] > 0:
-            logger.info(f"FIX #12: Cleaned {results['total_cleaned']} temp files/dirs")
+            logger.info("FIX #12: Cleaned %s temp files/dirs", results['total_cleaned'])
 
         return results
 
     def analyze_request(self, user_request: str) -> Dict[str, Any]:
         """Analyze user request and extract keywords/domains"""
+        ensure_keyword_mappings()
         request_lower = user_request.lower()
         found_keywords = []
         found_domains = set()
@@ -891,7 +1390,8 @@ class OrchestratorEngine:
 
     def generate_execution_plan(self, user_request: str) -> ExecutionPlan:
         """Generate complete execution plan for orchestration"""
-        session_id = str(uuid.uuid4())[:8]
+        # Time-sortable, so stores keep sessions in creation order
+        session_id = new_session_id()
         analysis = self.analyze_request(user_request)
 
         # Generate tasks from keywords
@@ -919,7 +1419,7 @@ class OrchestratorEngine:
                     dependencies=[],
                     priority=priority,
                     level=1,
-                    estimated_time=2.5,
+                    estimated_time=self.estimator.estimate(expert_file, 2.5),
                     estimated_cost=0.25 if model == 'opus' else 0.08 if model == 'sonnet' else 0.02
                 )
                 tasks.append(task)
@@ -936,7 +1436,7 @@ class OrchestratorEngine:
                 dependencies=[],
                 priority="MEDIA",
                 level=1,
-                estimated_time=2.5,
+                estimated_time=self.estimator.estimate("core/coder.md", 2.5),
                 estimated_cost=0.08
             ))
             task_counter = 2
@@ -964,7 +1464,7 @@ class OrchestratorEngine:
                 dependencies=documenter_deps,
                 priority="CRITICA",
                 level=1,
-                estimated_time=1.0,
+                estimated_time=self.estimator.estimate("core/documenter.md", 1.0),
                 estimated_cost=0.02,
                 requires_doc=False  # Documenter doesn't doc itself
             ))
@@ -989,7 +1489,7 @@ class OrchestratorEngine:
         )
 
         # Create session
-        self.sessions[session_id] = OrchestrationSession(
+        session = self.sessions[session_id] = OrchestrationSession(
             session_id=session_id,
             user_request=user_request,
             status=TaskStatus.PENDING,
@@ -1000,26 +1500,22 @@ class OrchestratorEngine:
         )
 
         # FIX #8: Persist sessions to file
-        self._save_sessions()
+        self._save_sessions(session)
+        self.plan_sizes.record(len(tasks))
 
         return plan
 
     def format_plan_table(self, plan: ExecutionPlan) -> str:
         """Format execution plan as table"""
         lines = [
-            "🎯 ORCHESTRATOR v6.0 - MCP MODE (36 AGENTS)",
-            "",
-            "📋 EXECUTION PLAN",
+            PLAN_TABLE_HEADER,
             f"├─ Session ID: {plan.session_id}",
             f"├─ Domains: {', '.join(plan.domains) if plan.domains else 'General'}",
             f"├─ Complexity: {plan.complexity}",
             f"├─ Total Agents: {plan.total_agents}",
             f"├─ Est. Time: {plan.estimated_time:.1f} min",
             f"├─ Est. Cost: ${plan.estimated_cost:.2f}",
-            "",
-            "🤖 AGENT TABLE",
-            "| # | Task | Expert File | Model | Priority | Status |",
-            "|---|------|-------------|-------|----------|--------|"
+            AGENT_TABLE_HEADER
         ]
 
         for task in plan.tasks:
@@ -1035,23 +1531,7 @@ class OrchestratorEngine:
         lines.append(f"├─ Parallel execution: {len(plan.parallel_batches)} batch(es)")
         lines.append(f"├─ Max concurrent agents: {max(len(b) for b in plan.parallel_batches)}")
         lines.append(f"└─ Documenter task: T{len(plan.tasks)} (always last - RULE #5)")
-
-        # FIX #11: Documentation requirements
-        lines.append("")
-        lines.append("📝 DOCUMENTATION REQUIREMENTS (FIX #11):")
-        lines.append("├─ Per-task doc: MANDATORY after each task completion")
-        lines.append("├─ Format: {task_id}: {what_done} | NOT: {what_not_to_do}")
-        lines.append("├─ Final doc: Consolidate all + update files")
-        lines.append("└─ Goal: Lean, essential, clear - NO error loops")
-
-        # FIX #12: Temp files cleanup rule
-        lines.append("")
-        lines.append("🧹 CLEANUP OBBLIGATORIO (FIX #12):")
-        lines.append("├─ REGOLA: Chi crea file temp DEVE eliminarli")
-        lines.append("├─ Pattern: *.tmp, *.temp, *.bak, *.swp, *~, *.pyc")
-        lines.append("├─ Dirs: __pycache__, .pytest_cache, .mypy_cache")
-        lines.append("├─ Quando: DOPO ogni task + FINE orchestrazione")
-        lines.append("└─ Violazione: BLOCCA completamento task")
+        lines.append(PLAN_RULES_TEXT)
 
         return "\n".join(lines)
 
@@ -1073,26 +1553,296 @@ class OrchestratorEngine:
 """
 
     def get_session(self, session_id: str) -> Optional[OrchestrationSession]:
-        """Get session by ID"""
-        return self.sessions.get(session_id)
-
-    def list_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """List recent sessions"""
-        sessions = list(self.sessions.values())
-        sessions.sort(key=lambda s: s.started_at, reverse=True)
-        return [
-            {
-                "session_id": s.session_id,
-                "user_request": s.user_request,
-                "status": s.status.value,
-                "started_at": s.started_at.isoformat(),
-                "tasks_count": len(s.plan.tasks) if s.plan else 0
-            }
-            for s in sessions[:limit]
-        ]
+        """
+        Get session by ID.
+        Sessions evicted from the hot cache or created by earlier server runs
+        are faulted back in (pending writer queue first, then the store).
+        """
+        session = self.sessions.get(session_id)
+        if session is not None:
+            return session
+        # Under the session's lock, so concurrent faults share one object
+        with self.session_lock(session_id):
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.writer.get_pending(session_id)
+                if session is None:
+                    record = self.store.get(session_id)
+                    if record is not None:
+                        session = session_from_record(record)
+                if session is not None:
+                    self.sessions[session_id] = session
+        return session
+
+    def pin_session(self, session: OrchestrationSession) -> None:
+        """
+        Keep a session in the hot cache while it is held (a run, a cancel),
+        so get_session() keeps returning the held object instead of
+        faulting in a second copy. Pair with unpin_session().
+        """
+        with self.session_lock(session.session_id):
+            self.sessions.pin(session.session_id, session)
+
+    def unpin_session(self, session_id: str) -> None:
+        self.sessions.unpin(session_id)
+
+    def cancel_session(self, session: OrchestrationSession) -> None:
+        """Mark a session (and its running tasks) as cancelled and persist the change"""
+        now = datetime.now()
+        with self.session_lock(session.session_id):
+            session.status = TaskStatus.CANCELLED
+            session.completed_at = now
+            running = [r for r in session.results if r["status"] == TaskStatus.IN_PROGRESS.value]
+            for result in running:
+                result["status"] = TaskStatus.CANCELLED.value
+                result["completed_at"] = now.isoformat()
+            self._save_sessions(session)
+            running = [dict(r) for r in running]
+        for result in running:
+            self._publish_task_event(session, result, TASK_CANCELLED, now)
+
+    def list_sessions(
+        self,
+        limit: int = 10,
+        status: Optional[str] = None,
+        domain: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List recent sessions, newest first.
+        Served by the session store so indexed backends never sort in memory;
+        changes still queued in the writer are overlaid on the result.
+        """
+        pending = {
+            s.session_id: record_summary(self._session_record(s))
+            for s in self.writer.pending()
+        }
+        summaries = self.store.list_summaries(
+            limit + len(pending), status=status, domain=domain
+        )
+        if not pending:
+            return summaries[:limit]
+
+        merged = {s["session_id"]: s for s in summaries}
+        for session_id, summary in pending.items():
+            if (status is None or summary["status"] == status) and \
+                    (domain is None or domain in summary["domains"]):
+                merged[session_id] = summary
+            else:
+                merged.pop(session_id, None)
+        return sorted(
+            merged.values(),
+            key=lambda s: session_sort_key(s["session_id"], s["started_at"]),
+            reverse=True
+        )[:limit]
+
+    # =========================================================================
+    # TASK REPORTS
+    # =========================================================================
+
+    def _open_circuit_breaker(self) -> Optional[CircuitBreakerFeed]:
+        """Start the MetricTracker feed, if enabled and importable"""
+        if not CIRCUIT_BREAKER_ENABLED:
+            return None
+        try:
+            metric_tracker = _import_plugin_module(_AGENT_SCRIPTS_DIR, "metric_tracker")
+        except ImportError:
+            return None
+        try:
+            tracker = metric_tracker.MetricTracker(Path(CIRCUIT_BREAKER_FILE) if CIRCUIT_BREAKER_FILE else None)
+        except Exception as e:
+            logger.warning("Circuit breaker feed disabled: %s", e)
+            return None
+        return CircuitBreakerFeed(tracker)
+
+    def _task_result(
+        self,
+        session: OrchestrationSession,
+        task_id: str
+    ) -> Tuple[AgentTask, Dict[str, Any]]:
+        """Return a plan task and its entry in session.results (created on first report)"""
+        tasks = session.plan.tasks if session.plan else []
+        task = next((t for t in tasks if t.id == task_id), None)
+        if task is None:
+            raise ValueError(f"Task '{task_id}' not found in session {session.session_id}")
+
+        for result in session.results:
+            if result["task_id"] == task_id:
+                return task, result
+
+        result = {
+            "task_id": task_id,
+            "agent_expert_file": task.agent_expert_file,
+            "model": task.model,
+            "status": TaskStatus.PENDING.value,
+            "started_at": None,
+            "completed_at": None,
+            "duration_seconds": None,
+            "tokens_used": 0,
+            "result": None,
+            "error": None
+        }
+        session.results.append(result)
+        return task, result
+
+    def get_progress(self, session: OrchestrationSession) -> Dict[str, int]:
+        """Count plan tasks per status, from the reported results"""
+        progress = {status.value: 0 for status in TaskStatus}
+        with self.session_lock(session.session_id):
+            reported = {r["task_id"]: r["status"] for r in session.results}
+            for task in (session.plan.tasks if session.plan else []):
+                progress[reported.get(task.id, TaskStatus.PENDING.value)] += 1
+            progress["total"] = len(session.plan.tasks) if session.plan else 0
+        return progress
+
+    def _advance_session_status(self, session: OrchestrationSession, now: datetime) -> None:
+        """
+        Derive the session status from its tasks:
+        all finished -> completed (failed if any task failed),
+        anything reported -> in_progress, otherwise unchanged.
+        """
+        progress = self.get_progress(session)
+        finished = progress[TaskStatus.COMPLETED.value] + progress[TaskStatus.FAILED.value]
+        if progress["total"] and finished == progress["total"]:
+            session.status = (
+                TaskStatus.FAILED if progress[TaskStatus.FAILED.value] else TaskStatus.COMPLETED
+            )
+            session.completed_at = now
+        elif progress[TaskStatus.PENDING.value] < progress["total"]:
+            session.status = TaskStatus.IN_PROGRESS
+            session.completed_at = None
+
+    def _publish_task_event(
+        self,
+        session: OrchestrationSession,
+        result: Dict[str, Any],
+        kind: str,
+        now: datetime
+    ) -> None:
+        self.events.publish(TaskEvent(
+            session_id=session.session_id,
+            task_id=result["task_id"],
+            kind=kind,
+            agent_file=result["agent_expert_file"],
+            model=result["model"],
+            timestamp=now.isoformat(),
+            started_at=result["started_at"],
+            duration_seconds=result["duration_seconds"] or 0.0,
+            tokens_used=result["tokens_used"],
+            error=result["error"]
+        ))
+
+    def report_task(
+        self,
+        session: OrchestrationSession,
+        task_id: str,
+        event: str,
+        result: Optional[str] = None,
+        error: Optional[str] = None,
+        tokens_used: int = 0,
+        doc: Optional[TaskDocumentation] = None
+    ) -> Dict[str, Any]:
+        """
+        Apply an agent's task report ("start", "complete", "fail" or "doc").
+
+        The change is queued on the coalescing writer, so bursts of reports
+        are persisted in batches; the resulting task event is published to
+        the estimator and circuit breaker listeners.
+        Returns the task's result entry.
+        """
+        if event not in ("start", "complete", "fail", "doc"):
+            raise ValueError(f"Unknown report event '{event}'")
+
+        with self.session_lock(session.session_id):
+            if session.status == TaskStatus.CANCELLED:
+                raise ValueError(f"Session {session.session_id} is cancelled")
+
+            task, entry = self._task_result(session, task_id)
+            now = datetime.now()
+            kind = None
+
+            if event == "start":
+                if entry["status"] == TaskStatus.COMPLETED.value:
+                    raise ValueError(f"Task {task_id} already completed")
+                # A failed task may be retried
+                entry.update(
+                    status=TaskStatus.IN_PROGRESS.value, started_at=now.isoformat(),
+                    completed_at=None, duration_seconds=None, result=None, error=None
+                )
+                kind = TASK_STARTED
+            elif event in ("complete", "fail"):
+                if entry["status"] in (TaskStatus.COMPLETED.value, TaskStatus.FAILED.value):
+                    raise ValueError(f"Task {task_id} already {entry['status']}")
+                started = datetime.fromisoformat(entry["started_at"]) if entry["started_at"] else None
+                entry.update(
+                    status=TaskStatus.COMPLETED.value if event == "complete" else TaskStatus.FAILED.value,
+                    completed_at=now.isoformat(),
+                    duration_seconds=round((now - started).total_seconds(), 3) if started else None,
+                    tokens_used=int(tokens_used or 0),
+                    result=result,
+                    error=error
+                )
+                kind = TASK_COMPLETED if event == "complete" else TASK_FAILED
+
+            if doc is not None:
+                # FIX #11: one documentation entry per task, latest report wins
+                session.task_docs = [d for d in session.task_docs if d.task_id != task_id]
+                session.task_docs.append(doc)
+
+            self._advance_session_status(session, now)
+            self._save_sessions(session)
+            # Published and returned outside the lock: a stable copy
+            entry = dict(entry)
+
+        if kind is not None:
+            self._publish_task_event(session, entry, kind, now)
+        return entry
+
+    # =========================================================================
+    # SESSION SEARCH
+    # =========================================================================
+
+    def get_search_index(self) -> SessionSearchIndex:
+        """
+        Return the search index, first applying the sessions written or
+        deleted (by this or another process) since the last call. Built
+        from the store on first use, or when the change feed cannot say
+        what changed (log compacted, feed pruned).
+        """
+        with self._search_index_lock:
+            records, deleted, cursor = self.store.changes(self._search_cursor)
+            if records is None:
+                # Cursor taken first: writes made during the build come again next time
+                index = SessionSearchIndex()
+                index.update_many(self.store.iter_records())
+                self.search_index = index
+                logger.info("Search index built over %s sessions", len(index))
+            else:
+                index = self.search_index
+                index.update_many(records)
+                for session_id in deleted:
+                    index.remove(session_id)
+            self._search_cursor = cursor
+        return index
+
+    def search_sessions(
+        self,
+        query: str,
+        limit: int = 10,
+        status: Optional[str] = None,
+        domain: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """BM25-ranked full-text search over persisted sessions"""
+        return self.get_search_index().search(
+            query, limit=limit, status=status, domain=domain,
+            since=since, until=until, cursor=cursor
+        )
 
     def get_available_agents(self) -> List[Dict[str, Any]]:
         """Get list of all available expert agents"""
+        ensure_keyword_mappings()
         agents = []
         seen_experts = set()
 
@@ -1116,8 +1866,26 @@ class OrchestratorEngine:
 engine = OrchestratorEngine()
 
 # Global ProcessManager instance (if available)
-# Initialized lazily on first use to avoid issues during import
+# Imported and initialized lazily on first use to avoid issues during import
 _process_manager: Optional[Any] = None
+_process_manager_module: Optional[Any] = None
+_process_manager_lock = threading.Lock()
+PROCESS_MANAGER_AVAILABLE: Optional[bool] = None  # None until the first import attempt
+
+def process_manager_module() -> Optional[Any]:
+    """The process_manager module, or None where it cannot be imported"""
+    global _process_manager_module, PROCESS_MANAGER_AVAILABLE
+    if PROCESS_MANAGER_AVAILABLE is None:
+        with _process_manager_lock:
+            if PROCESS_MANAGER_AVAILABLE is None:
+                try:
+                    _process_manager_module = _import_plugin_module(_LIB_DIR, "process_manager")
+                except (ImportError, AttributeError):
+                    # process_manager binds ctypes.windll at import time, which raises
+                    # AttributeError (not ImportError) on non-Windows platforms
+                    _process_manager_module = None
+                PROCESS_MANAGER_AVAILABLE = _process_manager_module is not None
+    return _process_manager_module
 
 def get_process_manager() -> Optional[Any]:
     """
@@ -1125,190 +1893,423 @@ def get_process_manager() -> Optional[Any]:
     Returns None if ProcessManager is not available (non-Windows or import error).
     """
     global _process_manager
-    if PROCESS_MANAGER_AVAILABLE and _process_manager is None:
-        try:
-            _process_manager = ProcessManager()
-            logger.info("ProcessManager initialized successfully")
-        except Exception as e:
-            logger.warning(f"Failed to initialize ProcessManager: {e}")
-            _process_manager = None
+    module = process_manager_module()
+    if module is not None and _process_manager is None:
+        with _process_manager_lock:
+            if _process_manager is None:
+                try:
+                    _process_manager = module.ProcessManager()
+                    logger.info("ProcessManager initialized successfully")
+                except Exception as e:
+                    logger.warning("Failed to initialize ProcessManager: %s", e)
+                    _process_manager = None
     return _process_manager
 
+_task_runner: Optional[Any] = None
+_task_runner_lock = threading.Lock()
+
+def get_task_runner() -> Optional[Any]:
+    """
+    Get the execution engine, created on first use.
+    Returns None unless ORCHESTRATOR_EXEC_COMMAND holds a valid command template.
+    Tasks are spawned through ProcessManager where available.
+    """
+    global _task_runner
+    if EXEC_COMMAND and _task_runner is None:
+        with _task_runner_lock:
+            if _task_runner is None:
+                from task_runner import PopenSpawner, TaskRunner
+                try:
+                    _task_runner = TaskRunner(
+                        engine, EXEC_COMMAND, EXEC_LOG_DIR,
+                        spawner=get_process_manager() or PopenSpawner()
+                    )
+                except ValueError as e:
+                    logger.warning("Execution engine disabled, invalid ORCHESTRATOR_EXEC_COMMAND: %s", e)
+    return _task_runner
+
 # =============================================================================
 # MCP SERVER SETUP
 # =============================================================================
 
-server = Server("orchestrator-mcp")
+class OrchestratorServer(Server):
+    """MCP server advertising resource subscriptions (the base class never does)"""
+
+    def get_capabilities(self, notification_options, experimental_capabilities):
+        capabilities = super().get_capabilities(notification_options, experimental_capabilities)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+server = OrchestratorServer("orchestrator-mcp", version="6.0.0")
+
+# Resource payloads are built once per source change and served as cached
+# strings with a content hash; subscribed clients are told when they change
+resource_catalog = ResourceCatalog()
+resource_subscriptions = ResourceSubscriptions()
+
+def _load_json_config(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read %s: %s", path, e)
+        return {}
+
+def build_config_payload() -> Dict[str, Any]:
+    """Effective server configuration: config/orchestrator-config.json plus runtime settings"""
+    config = _load_json_config(ORCHESTRATOR_CONFIG)
+    return {
+        "version": f"{config.get('version', '6.0.0')}-MCP",
+        "total_agents": len(engine.get_available_agents()),
+        "max_parallel_agents": config.get("parallel", {}).get("maxConcurrentAgents", 64),
+        "default_model": config.get("models", {}).get("default", "sonnet"),
+        "auto_orchestrate": True,
+        "keywords": len(KEYWORD_TO_EXPERT_MAPPING),
+        "session_backend": SESSION_BACKEND,
+        "plan_concurrency": PLAN_CONCURRENCY,
+        "tool_workers": TOOL_WORKERS,
+        "progress_rate": PROGRESS_RATE,
+        "retention": {status: vars(policy) for status, policy in RETENTION_POLICIES.items()}
+    }
+
+resource_catalog.register(
+    "orchestrator://sessions", "sessions", "Recent orchestration sessions",
+    build=lambda: engine.list_sessions(),
+    # Local changes (queued writes included) and writes by other processes sharing the store
+    source_version=lambda: (engine.sessions_generation, engine.store.change_cursor())
+)
+resource_catalog.register(
+    "orchestrator://agents", "agents", "Available expert agents",
+    build=lambda: engine.get_available_agents(),
+    source_version=lambda: MAPPINGS_GENERATION
+)
+resource_catalog.register(
+    "orchestrator://config", "config", "Server configuration",
+    build=build_config_payload,
+    source_version=lambda: (file_signature(ORCHESTRATOR_CONFIG), MAPPINGS_GENERATION)
+)
+
+# Sampled by a background task while the server runs
+loop_lag = LoopLagMonitor(LOOP_LAG_INTERVAL)
+
+def _file_bytes(*paths: str) -> int:
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+def build_metrics_payload() -> Dict[str, Any]:
+    """
+    Server telemetry. Every figure is a counter kept up to date where the
+    event happens (or a stat call), so building it never scans sessions.
+    """
+    sessions = engine.sessions
+    index = engine.search_index
+    if SESSION_BACKEND == "sqlite":
+        store_bytes = _file_bytes(SESSIONS_DB, SESSIONS_DB + "-wal")
+    else:
+        store_bytes = _file_bytes(SESSIONS_LOG, SESSIONS_INDEX)
+    pm = _process_manager
+    runner = _task_runner
+    return {
+        "tools": {name: h.snapshot() for name, h in sorted(tool_timing.histograms.items())},
+        "caches": {
+            "responses": {
+                "entries": len(tool_cache), "hits": tool_cache.hits, "misses": tool_cache.misses,
+                "hit_rate": hit_rate(tool_cache.hits, tool_cache.misses)
+            },
+            "sessions": {
+                "entries": len(sessions), "bytes": sessions.total_bytes,
+                "hits": sessions.hits, "misses": sessions.misses, "evictions": sessions.evictions,
+                "hit_rate": hit_rate(sessions.hits, sessions.misses)
+            },
+            "resources": {"builds": resource_catalog.builds}
+        },
+        "store": {
+            "backend": SESSION_BACKEND,
+            "file_bytes": store_bytes,
+            "pending_writes": engine.writer.pending_count,
+            "batches_written": engine.writer.writes,
+            "indexed_sessions": len(index) if index is not None else None
+        },
+        "admission": tool_admission.snapshot(),
+        "single_flight": {
+            "executions": tool_single_flight.executions,
+            "coalesced": tool_single_flight.coalesced,
+            "inflight": tool_single_flight.inflight
+        },
+        "event_loop": loop_lag.snapshot(),
+        "process_manager": {
+            "available": process_manager_module() is not None,
+            "metrics": pm.get_metrics() if pm is not None else None,
+            "health": process_manager_module().health_check() if pm is not None else None
+        },
+        "execution": {
+            "enabled": bool(EXEC_COMMAND),
+            "spawned": runner.spawned if runner is not None else 0,
+            "active_runs": runner.active if runner is not None else 0,
+            "cancellations": runner.cancellations if runner is not None else 0,
+            "last_quiescence_ms": runner.last_quiescence_ms if runner is not None else None
+        },
+        "process": process_stats()
+    }
+
+# Shared by every export, so label values stay stable between scrapes
+metrics_labels = LabelLimiter(METRICS_MAX_LABEL_VALUES)
+
+def collect_openmetrics() -> List[MetricFamily]:
+    """
+    Metric families of the OpenMetrics export: orchestration throughput,
+    plan sizes, per-expert task counts and durations (from task events and
+    from the agents' MetricTracker), tool latencies and process counters.
+    """
+    label = metrics_labels
+    families: List[MetricFamily] = []
+
+    def family(name: str, kind: str, help_text: str, unit: str = "") -> MetricFamily:
+        families.append(MetricFamily(name, kind, help_text, unit))
+        return families[-1]
+
+    counts, plans_generated, tasks_planned = engine.plan_sizes.snapshot()
+    family("orchestrator_plans", "counter", "Execution plans generated").add(plans_generated)
+    family("orchestrator_plan_tasks", "histogram", "Tasks per generated plan").add_histogram(
+        PLAN_SIZE_BUCKETS, counts, tasks_planned
+    )
+
+    throughput = engine.throughput.snapshot()
+    events = family("orchestrator_task_events", "counter", "Task lifecycle events by expert and kind")
+    for row in throughput["events"]:
+        events.add(row["count"], {"expert": label("expert", row["expert"]), "kind": row["kind"]})
+    durations = family(
+        "orchestrator_task_duration_seconds", "summary", "Duration of finished tasks by expert", "seconds"
+    )
+    for expert, totals in throughput["durations"].items():
+        labels = {"expert": label("expert", expert)}
+        durations.add(totals["count"], labels, "_count")
+        durations.add(totals["sum_seconds"], labels, "_sum")
+
+    feed = engine.circuit_breaker
+    if feed is not None:
+        tracker = feed.tracker
+        tracked = family("orchestrator_tracker_tasks", "counter", "MetricTracker task outcomes by expert")
+        tracked_time = family(
+            "orchestrator_tracker_task_duration_seconds", "summary",
+            "MetricTracker task durations by expert", "seconds"
+        )
+        tokens = family("orchestrator_tracker_tokens", "counter", "MetricTracker token usage by expert and model")
+        # A copy taken under the tracker's batch lock: the feed thread keeps recording
+        for agent_file, agent in tracker.snapshot_agents().items():
+            metrics = agent["metrics"]
+            labels = {"expert": label("expert", agent_file)}
+            for outcome in ("successful", "failed", "cancelled"):
+                tracked.add(metrics.get(f"tasks_{outcome}", 0), dict(labels, outcome=outcome))
+            tracked_time.add(metrics.get("tasks_total", 0), labels, "_count")
+            tracked_time.add(metrics.get("total_duration_seconds", 0.0), labels, "_sum")
+            for model, usage in agent["token_usage"].items():
+                tokens.add(usage.get("total", 0), dict(labels, model=label("model", model)))
+
+    calls = family("orchestrator_tool_calls", "counter", "Tool calls by tool")
+    errors = family("orchestrator_tool_errors", "counter", "Failed tool calls by tool")
+    latency = family("orchestrator_tool_latency_seconds", "histogram", "Tool call latency", "seconds")
+    for name, histogram in sorted(tool_timing.histograms.items()):
+        snapshot = histogram.snapshot()
+        labels = {"tool": label("tool", name)}
+        calls.add(snapshot["count"], labels)
+        errors.add(snapshot["errors"], labels)
+        latency.add_histogram(
+            [bound / 1000.0 for bound in histogram.buckets], list(snapshot["buckets"].values()),
+            snapshot["total_ms"] / 1000.0, labels
+        )
+
+    pm = _process_manager
+    if pm is not None:
+        pm_metrics = pm.get_metrics()
+        family("orchestrator_pm_spawned", "counter", "Processes spawned by ProcessManager").add(
+            pm_metrics["total_spawned"])
+        family("orchestrator_pm_terminated", "counter", "Processes terminated by ProcessManager").add(
+            pm_metrics["total_terminated"])
+        family("orchestrator_pm_failed_terminations", "counter", "ProcessManager termination failures").add(
+            pm_metrics["failed_terminations"])
+        family("orchestrator_pm_active_processes", "gauge", "Processes tracked by ProcessManager").add(
+            pm_metrics["active_processes"])
+    runner = _task_runner
+    if runner is not None:
+        family("orchestrator_exec_spawned", "counter", "Task processes launched by the execution engine").add(
+            runner.spawned)
+        family("orchestrator_exec_cancellations", "counter", "Runs cancelled").add(runner.cancellations)
+        family("orchestrator_exec_active_runs", "gauge", "Sessions being executed").add(runner.active)
+
+    family("orchestrator_sessions_cached", "gauge", "Sessions in the hot cache").add(len(engine.sessions))
+    family("orchestrator_tool_calls_inflight", "gauge", "Tool calls running").add(tool_admission.inflight)
+    family("orchestrator_tool_calls_queued", "gauge", "Tool calls waiting for admission").add(tool_admission.queued)
+    family("orchestrator_event_loop_lag_seconds", "gauge", "Last event-loop lag sample", "seconds").add(
+        loop_lag.last_ms / 1000.0)
+    rss = process_stats()["rss_bytes"]
+    if rss is not None:
+        family("orchestrator_resident_memory_bytes", "gauge", "Resident memory", "bytes").add(rss)
+    overflow = family(
+        "orchestrator_metrics_label_overflow", "counter", "Label values reported as 'other' (cardinality cap)"
+    )
+    for name, count in sorted(label.overflowed.items()):
+        overflow.add(count, {"label": name})
+    return families
+
+resource_catalog.register(
+    "orchestrator://metrics", "metrics", "Live server telemetry",
+    # Live: built on every read, left out of change tracking and update notifications
+    build=build_metrics_payload
+)
+
+def refresh_mappings() -> None:
+    """Pick up edits of keyword-mappings.json (resource watcher hook)"""
+    if reload_keyword_mappings_if_changed():
+        tool_cache.invalidate("orchestrator_agents")
 
 @server.list_resources()
-async def handle_list_resources() -> list[str]:
+async def handle_list_resources() -> List[Resource]:
     """List available resources"""
     return [
-        "orchestrator://sessions",
-        "orchestrator://agents",
-        "orchestrator://config"
+        Resource(uri=spec.uri, name=spec.name, description=spec.description, mimeType="application/json")
+        for spec in resource_catalog.specs.values()
     ]
 
 @server.read_resource()
-async def handle_read_resource(uri: str) -> str:
-    """Read a resource"""
-    if uri == "orchestrator://sessions":
-        sessions = engine.list_sessions()
-        return json.dumps(sessions, indent=2)
-    elif uri == "orchestrator://agents":
-        agents = engine.get_available_agents()
-        return json.dumps(agents, indent=2)
-    elif uri == "orchestrator://config":
-        return json.dumps({
-            "version": "6.0.0-MCP",
-            "total_agents": 36,
-            "max_parallel_agents": 64,
-            "default_model": "auto",
-            "auto_orchestrate": True
-        }, indent=2)
-    else:
+async def handle_read_resource(uri: Any) -> List[ReadResourceContents]:
+    """Read a resource from its precomputed payload"""
+    uri = str(uri)
+    if uri not in resource_catalog.specs:
         raise ValueError(f"Unknown resource: {uri}")
+    # Rebuilds (store reads for sessions) stay off the event loop
+    payload = await asyncio.to_thread(resource_catalog.get, uri)
+    return [ReadResourceContents(
+        content=payload.text,
+        mime_type=payload.mime_type,
+        meta={"etag": payload.etag, "version": payload.version}
+    )]
+
+@server.subscribe_resource()
+async def handle_subscribe_resource(uri: Any) -> None:
+    """Send resources/updated notifications for ``uri`` to the calling client"""
+    uri = str(uri)
+    if uri not in resource_catalog.specs:
+        raise ValueError(f"Unknown resource: {uri}")
+    resource_subscriptions.subscribe(uri, server.request_context.session)
 
-@server.list_tools()
-async def handle_list_tools() -> List[Tool]:
-    """List available MCP tools"""
-    return [
-        Tool(
-            name="orchestrator_analyze",
-            description="Analyze a request and generate execution plan without executing",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "request": {
-                        "type": "string",
-                        "description": "The user request to analyze"
-                    },
-                    "show_table": {
-                        "type": "boolean",
-                        "description": "Show execution plan table",
-                        "default": True
-                    }
-                },
-                "required": ["request"]
-            }
-        ),
-        Tool(
-            name="orchestrator_execute",
-            description="Execute orchestration plan (generates plan for Task tool execution)",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "request": {
-                        "type": "string",
-                        "description": "The user request to orchestrate"
-                    },
-                    "parallel": {
-                        "type": "number",
-                        "description": "Max parallel agents (1-64)",
-                        "default": 6,
-                        "minimum": 1,
-                        "maximum": 64
-                    },
-                    "model": {
-                        "type": "string",
-                        "description": "Force specific model",
-                        "enum": ["auto", "haiku", "sonnet", "opus"],
-                        "default": "auto"
-                    }
-                },
-                "required": ["request"]
-            }
-        ),
-        Tool(
-            name="orchestrator_status",
-            description="Get status of an orchestration session",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "session_id": {
-                        "type": "string",
-                        "description": "Session ID to check (leave empty for latest)"
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="orchestrator_agents",
-            description="List all available expert agents",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "filter": {
-                        "type": "string",
-                        "description": "Filter by domain or keyword (optional)"
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="orchestrator_list",
-            description="List recent orchestration sessions",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "limit": {
-                        "type": "number",
-                        "description": "Max sessions to return",
-                        "default": 10,
-                        "minimum": 1,
-                        "maximum": 50
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="orchestrator_preview",
-            description="Preview orchestration with detailed task breakdown",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "request": {
-                        "type": "string",
-                        "description": "Request to preview"
-                    }
-                },
-                "required": ["request"]
-            }
-        ),
-        Tool(
-            name="orchestrator_cancel",
-            description="Cancel an active orchestration session",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "session_id": {
-                        "type": "string",
-                        "description": "Session ID to cancel"
-                    }
-                },
-                "required": ["session_id"]
-            }
-        ),
-    ]
+@server.unsubscribe_resource()
+async def handle_unsubscribe_resource(uri: Any) -> None:
+    resource_subscriptions.unsubscribe(str(uri), server.request_context.session)
 
-@server.call_tool()
-async def handle_call_tool(name: str, arguments: dict) -> List[TextContent | ImageContent | EmbeddedResource]:
-    """Handle tool calls"""
+# =============================================================================
+# MCP TOOLS
+# =============================================================================
 
+def _require(arguments: Dict[str, Any], name: str) -> Any:
+    """Return a required argument or fail the call with the standard message"""
+    value = arguments.get(name, "")
+    if not value:
+        raise ToolError(f"Error: '{name}' parameter is required")
+    return value
+
+def _progress_channel() -> Optional[ProgressSender]:
+    """Progress sender of the current MCP request, if the client sent a progressToken"""
     try:
-        if name == "orchestrator_analyze":
-            request = arguments.get("request", "")
-            show_table = arguments.get("show_table", True)
+        ctx = server.request_context
+    except LookupError:
+        return None
+    token = ctx.meta.progressToken if ctx.meta else None
+    if token is None:
+        return None
+
+    async def send(progress: float, total: Optional[float], message: Optional[str]) -> None:
+        await ctx.session.send_progress_notification(
+            token, progress, total, message, related_request_id=str(ctx.request_id)
+        )
 
-            if not request:
-                return [TextContent(
-                    type="text",
-                    text="❌ Error: 'request' parameter is required"
-                )]
+    return send
+
+def _require_session(session_id: str) -> OrchestrationSession:
+    session = engine.get_session(session_id)
+    if not session:
+        raise ToolError(f"Session '{session_id}' not found")
+    return session
+
+
+def task_data(task: AgentTask) -> Dict[str, Any]:
+    """Plan data of one task, for the compact and json output modes"""
+    return {
+        "id": task.id,
+        "expert": task.agent_expert_file,
+        "model": task.model,
+        "priority": task.priority,
+        "depends_on": task.dependencies,
+        "est_min": task.estimated_time,
+        "est_cost": round(task.estimated_cost, 4),
+        "description": task.description
+    }
+
+
+def plan_data(plan: ExecutionPlan, with_tasks: bool = True) -> Dict[str, Any]:
+    """Plan data without the banners and rule text of the full output"""
+    data = {
+        "session_id": plan.session_id,
+        "domains": plan.domains,
+        "complexity": plan.complexity,
+        "total_tasks": plan.total_agents,
+        "est_min": round(plan.estimated_time, 2),
+        "est_cost": round(plan.estimated_cost, 4),
+        "parallel_batches": len(plan.parallel_batches),
+        # RULE #5: the documenter runs after every other task
+        "final_task": plan.tasks[-1].id if plan.tasks else None
+    }
+    if with_tasks:
+        data["tasks"] = [task_data(task) for task in plan.tasks]
+    return data
+
+
+class SessionReaderTool(ToolHandler):
+    """Read-only tool over the sessions: identical concurrent calls share one run"""
+    read_only = True
+    blocking = True
+
+    def state_version(self) -> int:
+        return engine.sessions_generation
+
+
+class AnalyzeTool(ToolHandler):
+    name = "orchestrator_analyze"
+    description = "Analyze a request and generate execution plan without executing"
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "request": {
+                "type": "string",
+                "description": "The user request to analyze"
+            },
+            "show_table": {
+                "type": "boolean",
+                "description": "Show execution plan table",
+                "default": True
+            }
+        },
+        "required": ["request"]
+    }
+    max_concurrency = PLAN_CONCURRENCY
+    blocking = True
+
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        request = _require(arguments, "request")
+        show_table = arguments.get("show_table", True)
+        full = output_mode(arguments) == "full"
 
-            plan = engine.generate_execution_plan(request)
+        plan = engine.generate_execution_plan(request)
+        if not full:
+            return plan_data(plan, with_tasks=show_table)
 
-            output = f"""🎯 ORCHESTRATOR ANALYSIS COMPLETE
+        output = f"""🎯 ORCHESTRATOR ANALYSIS COMPLETE
 
 📋 ANALYSIS SUMMARY
 ├─ Request: {request}
@@ -1321,94 +2322,170 @@ async def handle_call_tool(name: str, arguments: dict) -> List[TextContent | Ima
 └─ Parallel Batches: {len(plan.parallel_batches)}
 """
 
-            if show_table:
-                output += "\n" + engine.format_plan_table(plan)
-
-            return [TextContent(type="text", text=output)]
-
-        elif name == "orchestrator_execute":
-            request = arguments.get("request", "")
-            parallel = arguments.get("parallel", 6)
-            model = arguments.get("model", "auto")
-
-            if not request:
-                return [TextContent(
-                    type="text",
-                    text="❌ Error: 'request' parameter is required"
-                )]
-
-            plan = engine.generate_execution_plan(request)
-
-            output = f"""🚀 ORCHESTRATOR v6.0 - EXECUTION MODE
-⚡ ALWAYS ON - Like Serena MCP
+        if show_table:
+            output += "\n" + engine.format_plan_table(plan)
+
+        return output
+
+
+class ExecuteTool(ToolHandler):
+    name = "orchestrator_execute"
+    description = "Execute orchestration plan (generates plan for Task tool execution)"
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "request": {
+                "type": "string",
+                "description": "The user request to orchestrate"
+            },
+            "parallel": {
+                "type": "number",
+                "description": "Max parallel agents (1-64)",
+                "default": 6,
+                "minimum": 1,
+                "maximum": 64
+            },
+            "model": {
+                "type": "string",
+                "description": "Force specific model",
+                "enum": ["auto", "haiku", "sonnet", "opus"],
+                "default": "auto"
+            },
+            "run": {
+                "type": "boolean",
+                "description": "Launch the tasks on the server (needs ORCHESTRATOR_EXEC_COMMAND)",
+                "default": False
+            }
+        },
+        "required": ["request"]
+    }
+    max_concurrency = PLAN_CONCURRENCY
+    blocking = True
+
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        request = _require(arguments, "request")
+        parallel = arguments.get("parallel", 6)
+        model = arguments.get("model", "auto")
+        full = output_mode(arguments) == "full"
+        runner = None
+        if arguments.get("run", False):
+            runner = get_task_runner()
+            if runner is None:
+                raise ToolError("Execution engine disabled: set ORCHESTRATOR_EXEC_COMMAND")
+
+        report_progress(0, None, "Analyzing request")
+        plan = engine.generate_execution_plan(request)
+        # Stages: plan, table, one per released task, documenter
+        total = 2 + len(plan.tasks)
+        report_progress(
+            1, total,
+            f"Plan {plan.session_id}: {plan.total_agents} tasks, "
+            f"{', '.join(plan.domains) if plan.domains else 'General'}"
+        )
+        table = engine.format_plan_table(plan) if full else ""
+        report_progress(2, total, "Execution table ready")
 
-📋 EXECUTION PREPARED
-├─ Session ID: {plan.session_id}
+        parts: List[str] = []
+        if full:
+            parts += [EXECUTE_BANNER, f"""├─ Session ID: {plan.session_id}
 ├─ Parallelism: {parallel} agents max
 ├─ Model Override: {model}
 ├─ Total Tasks: {plan.total_agents}
 
-{engine.format_plan_table(plan)}
-
-📝 NEXT STEP: Use Task tool to launch agents with this plan:
-
-The following agents should be launched in parallel:
-"""
-
-            for task in plan.tasks:
-                if "documenter" not in task.agent_expert_file:
-                    output += f"\n  [{task.id}] {task.description}\n"
-                    output += f"      → Expert: {task.agent_expert_file}\n"
-                    output += f"      → Model: {task.model}\n"
-
-            output += f"""
-╔══════════════════════════════════════════════════════════════════════════════╗
-║  ⚠️  MANDATORY FINAL STEP - R5 - NESSUNA ECCEZIONE                          ║
-╠══════════════════════════════════════════════════════════════════════════════╣
-║                                                                              ║
-║  DOPO che TUTTI i task sopra sono completati, DEVI eseguire:                 ║
-║                                                                              ║
-"""
-            doc_task = plan.tasks[-1]
-            output += f"║  [{doc_task.id}] {doc_task.description[:60]}\n"
-            output += f"║      → Expert: {doc_task.agent_expert_file}\n"
-            output += f"║      → Model: {doc_task.model}\n"
-            output += f"""║                                                                              ║
-║  !!! SE NON ESEGUI IL DOCUMENTER, L'ORCHESTRAZIONE È FALLITA !!!            ║
-║                                                                              ║
-╚══════════════════════════════════════════════════════════════════════════════╝
+{table}
+""", EXECUTE_NEXT_STEP]
 
-📝 DOCUMENTER PROMPT DA USARE:
-"Documenta le modifiche di questa sessione:
-- Cosa è stato fatto (1-2 righe per task)
-- Cosa NON fare (anti-patterns)
-- File modificati
-- Aggiorna documentazione se necessario"
-"""
-
-            return [TextContent(type="text", text=output)]
-
-        elif name == "orchestrator_status":
-            session_id = arguments.get("session_id", "")
-
-            if session_id:
-                session = engine.get_session(session_id)
-                if not session:
-                    return [TextContent(
-                        type="text",
-                        text=f"❌ Session '{session_id}' not found"
-                    )]
-
-                # Calculate values safely
-                tasks_count = len(session.plan.tasks) if session.plan else 0
-                est_cost = session.plan.estimated_cost if session.plan else 0.00
-                est_time = session.plan.estimated_time if session.plan else 0.0
-                complexity = session.plan.complexity if session.plan else "N/A"
-                domains = ', '.join(session.plan.domains) if session.plan and session.plan.domains else "N/A"
+        released = 2
+        for task in plan.tasks:
+            if "documenter" not in task.agent_expert_file:
+                if full:
+                    parts.append(
+                        f"\n  [{task.id}] {task.description}\n"
+                        f"      → Expert: {task.agent_expert_file}\n"
+                        f"      → Model: {task.model}\n"
+                    )
+                released += 1
+                report_progress(released, total, f"Released {task.id} → {task.agent_expert_file} ({task.model})")
+
+        doc_task = plan.tasks[-1]
+        report_progress(total, total, f"Released {doc_task.id} → {doc_task.agent_expert_file} (runs last)")
+        execution = None
+        if runner is not None:
+            run = runner.start(engine.get_session(plan.session_id), parallel, model)
+            execution = {"parallel": run.parallel, "log_dir": run.log_dir}
+        if not full:
+            data = plan_data(plan)
+            data.update(parallel=parallel, model_override=model)
+            if execution is not None:
+                data["execution"] = execution
+            return data
+        if execution is not None:
+            # The server runs the tasks: no instructions for the client
+            return "".join(parts[:2]) + EXECUTE_RUNNING.format(**execution)
+
+        parts.append(MANDATORY_STEP_HEADER)
+        parts.append(
+            f"║  [{doc_task.id}] {doc_task.description[:60]}\n"
+            f"║      → Expert: {doc_task.agent_expert_file}\n"
+            f"║      → Model: {doc_task.model}\n"
+        )
+        parts.append(MANDATORY_STEP_FOOTER)
+        return "".join(parts)
+
+
+class StatusTool(SessionReaderTool):
+    name = "orchestrator_status"
+    description = "Get status of an orchestration session"
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "session_id": {
+                "type": "string",
+                "description": "Session ID to check (leave empty for latest)"
+            }
+        }
+    }
+
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        session_id = arguments.get("session_id", "")
+        full = output_mode(arguments) == "full"
+
+        if session_id:
+            session = _require_session(session_id)
+            # Consistent view while reports may be updating the session
+            with engine.session_lock(session_id):
+                status = session.status.value
+                results = [dict(r) for r in session.results]
+
+            # Calculate values safely
+            tasks_count = len(session.plan.tasks) if session.plan else 0
+            est_cost = session.plan.estimated_cost if session.plan else 0.00
+            est_time = session.plan.estimated_time if session.plan else 0.0
+            complexity = session.plan.complexity if session.plan else "N/A"
+            if not full:
+                data = {
+                    "session_id": session.session_id,
+                    "request": session.user_request,
+                    "status": status,
+                    "started_at": session.started_at.isoformat(),
+                    "domains": session.plan.domains if session.plan else [],
+                    "complexity": complexity,
+                    "total_tasks": tasks_count,
+                    "est_min": round(est_time, 2),
+                    "est_cost": round(est_cost, 4)
+                }
+                if results:
+                    data["progress"] = engine.get_progress(session)
+                    data["results"] = [
+                        {"task_id": r["task_id"], "expert": r["agent_expert_file"], "status": r["status"]}
+                        for r in results
+                    ]
+                return data
+            domains = ', '.join(session.plan.domains) if session.plan and session.plan.domains else "N/A"
 
-                output = f"""📊 SESSION STATUS: {session.session_id}
+            output = f"""📊 SESSION STATUS: {session.session_id}
 ├─ Request: {session.user_request}
-├─ Status: {session.status.value}
+├─ Status: {status}
 ├─ Started: {session.started_at.isoformat()}
 ├─ Domains: {domains}
 ├─ Complexity: {complexity}
@@ -1416,88 +2493,155 @@ The following agents should be launched in parallel:
 ├─ Est. Time: {est_time:.1f} min
 └─ Est. Cost: ${est_cost:.2f}
 """
-            else:
-                sessions = engine.list_sessions(5)
-                if not sessions:
-                    return [TextContent(
-                        type="text",
-                        text="📊 No recent sessions found"
-                    )]
-
-                output = "📊 RECENT SESSIONS\n\n"
-                for s in sessions:
-                    output += f"├─ {s['session_id']}: {s['user_request'][:40]}...\n"
-                    output += f"   │  Status: {s['status']} | Tasks: {s['tasks_count']}\n"
-
-            return [TextContent(type="text", text=output)]
-
-        elif name == "orchestrator_agents":
-            filter_kw = arguments.get("filter", "").lower()
-            agents = engine.get_available_agents()
-
-            if filter_kw:
-                agents = [
-                    a for a in agents
-                    if filter_kw in a["expert_file"].lower() or
-                       filter_kw in a["keyword"].lower() or
-                       filter_kw in a["specialization"].lower()
-                ]
-
-            output = f"🤖 AVAILABLE EXPERT AGENTS ({len(agents)} total)\n\n"
-            output += "| Keyword | Expert File | Model | Priority | Specialization |\n"
-            output += "|---------|-------------|-------|----------|----------------|\n"
-
-            for agent in agents:
-                output += f"| {agent['keyword']} | {agent['expert_file']} | {agent['model']} | {agent['priority']} | {agent['specialization'][:40]}... |\n"
-
-            return [TextContent(type="text", text=output)]
-
-        elif name == "orchestrator_list":
-            limit = min(arguments.get("limit", 10), 50)
-            sessions = engine.list_sessions(limit)
+            if results:
+                progress = engine.get_progress(session)
+                output += f"""
+📈 PROGRESS: {progress['completed']}/{progress['total']} completed | {progress['failed']} failed | {progress['in_progress']} running
+"""
+                for r in results:
+                    output += f"├─ [{r['task_id']}] {r['agent_expert_file']}: {r['status']}\n"
+        else:
+            sessions = engine.list_sessions(5)
+            if not full:
+                return {"sessions": sessions}
+            if not sessions:
+                return "📊 No recent sessions found"
 
-            output = f"📋 RECENT ORCHESTRATION SESSIONS (max {limit})\n\n"
+            output = "📊 RECENT SESSIONS\n\n"
+            for s in sessions:
+                output += f"├─ {s['session_id']}: {s['user_request'][:40]}...\n"
+                output += f"   │  Status: {s['status']} | Tasks: {s['tasks_count']}\n"
 
-            if not sessions:
-                output += "No sessions found yet. Use orchestrator_analyze or orchestrator_execute first."
-            else:
-                for s in sessions:
-                    output += f"├─ [{s['session_id']}] {s['user_request'][:50]}\n"
-                    output += f"│  └─ Status: {s['status']} | Tasks: {s['tasks_count']} | {s['started_at']}\n"
+        return output
 
-            return [TextContent(type="text", text=output)]
 
-        elif name == "orchestrator_preview":
-            request = arguments.get("request", "")
+class AgentsTool(ToolHandler):
+    name = "orchestrator_agents"
+    description = "List all available expert agents"
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "filter": {
+                "type": "string",
+                "description": "Filter by domain or keyword (optional)"
+            }
+        }
+    }
+    # Depends only on the keyword mappings loaded at startup
+    pure = True
+    # The first call loads the keyword mappings and routing snapshot
+    blocking = True
+
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        filter_kw = arguments.get("filter", "").lower()
+        agents = engine.get_available_agents()
 
-            if not request:
-                return [TextContent(
-                    type="text",
-                    text="❌ Error: 'request' parameter is required"
-                )]
+        if filter_kw:
+            agents = [
+                a for a in agents
+                if filter_kw in a["expert_file"].lower() or
+                   filter_kw in a["keyword"].lower() or
+                   filter_kw in a["specialization"].lower()
+            ]
 
-            plan = engine.generate_execution_plan(request)
-            analysis = engine.analyze_request(request)
+        if output_mode(arguments) != "full":
+            return {"total": len(agents), "agents": agents}
+
+        output = f"🤖 AVAILABLE EXPERT AGENTS ({len(agents)} total)\n\n"
+        output += "| Keyword | Expert File | Model | Priority | Specialization |\n"
+        output += "|---------|-------------|-------|----------|----------------|\n"
+
+        for agent in agents:
+            output += f"| {agent['keyword']} | {agent['expert_file']} | {agent['model']} | {agent['priority']} | {agent['specialization'][:40]}... |\n"
+
+        return output
+
+
+class ListTool(SessionReaderTool):
+    name = "orchestrator_list"
+    description = "List recent orchestration sessions"
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "limit": {
+                "type": "number",
+                "description": "Max sessions to return",
+                "default": 10,
+                "minimum": 1,
+                "maximum": 50
+            },
+            "status": {
+                "type": "string",
+                "description": "Only sessions with this status (optional)",
+                "enum": [s.value for s in TaskStatus]
+            },
+            "domain": {
+                "type": "string",
+                "description": "Only sessions touching this domain, e.g. GUI, Database (optional)"
+            }
+        }
+    }
+
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        limit = min(int(arguments.get("limit", 10)), 50)
+        sessions = engine.list_sessions(
+            limit,
+            status=arguments.get("status") or None,
+            domain=arguments.get("domain") or None
+        )
+        if output_mode(arguments) != "full":
+            return {"sessions": sessions}
 
-            output = f"""🔍 ORCHESTRATOR PREVIEW MODE
-{'=' * 50}
+        output = f"📋 RECENT ORCHESTRATION SESSIONS (max {limit})\n\n"
 
+        if not sessions:
+            output += "No sessions found yet. Use orchestrator_analyze or orchestrator_execute first."
+        else:
+            for s in sessions:
+                output += f"├─ [{s['session_id']}] {s['user_request'][:50]}\n"
+                output += f"│  └─ Status: {s['status']} | Tasks: {s['tasks_count']} | {s['started_at']}\n"
+
+        return output
+
+
+class PreviewTool(ToolHandler):
+    name = "orchestrator_preview"
+    description = "Preview orchestration with detailed task breakdown"
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "request": {
+                "type": "string",
+                "description": "Request to preview"
+            }
+        },
+        "required": ["request"]
+    }
+    max_concurrency = PLAN_CONCURRENCY
+    blocking = True
+
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        request = _require(arguments, "request")
+
+        plan = engine.generate_execution_plan(request)
+        analysis = engine.analyze_request(request)
+        if output_mode(arguments) != "full":
+            data = plan_data(plan)
+            data.update(keywords=analysis["keywords"], multi_domain=analysis["is_multi_domain"])
+            return data
+
+        output = PREVIEW_BANNER + f"""
 📋 REQUEST ANALYSIS
 ├─ Input: "{request}"
 ├─ Keywords Found: {', '.join(analysis['keywords']) if analysis['keywords'] else 'None - will use fallback'}
 ├─ Domains: {', '.join(analysis['domains']) if analysis['domains'] else 'General'}
 ├─ Complexity: {analysis['complexity']}
 ├─ Multi-Domain: {'Yes' if analysis['is_multi_domain'] else 'No'}
+""" + PREVIEW_BREAKDOWN_HEADER
 
-🤖 TASK BREAKDOWN
-{'=' * 50}
-
-Work Tasks (Parallel):
-"""
-
-            work_tasks = [t for t in plan.tasks if "documenter" not in t.agent_expert_file]
-            for i, task in enumerate(work_tasks, 1):
-                output += f"""
+        work_tasks = [t for t in plan.tasks if "documenter" not in t.agent_expert_file]
+        for i, task in enumerate(work_tasks, 1):
+            output += f"""
   [{task.id}] {task.description}
   ├─ Expert: {task.agent_expert_file}
   ├─ Model: {task.model}
@@ -1506,8 +2650,8 @@ Work Tasks (Parallel):
   └─ Est: {task.estimated_time}m / ${task.estimated_cost:.2f}
 """
 
-            doc_task = plan.tasks[-1]
-            output += f"""
+        doc_task = plan.tasks[-1]
+        output += f"""
 Final Task (Sequential):
   [{doc_task.id}] {doc_task.description}
   ├─ Expert: {doc_task.agent_expert_file}
@@ -1522,80 +2666,498 @@ Final Task (Sequential):
 └─ Session ID: {plan.session_id}
 """
 
-            return [TextContent(type="text", text=output)]
+        return output
 
-        elif name == "orchestrator_cancel":
-            session_id = arguments.get("session_id", "")
 
-            if not session_id:
-                return [TextContent(
-                    type="text",
-                    text="❌ Error: 'session_id' parameter is required"
-                )]
+class CancelTool(ToolHandler):
+    name = "orchestrator_cancel"
+    description = "Cancel an active orchestration session"
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "session_id": {
+                "type": "string",
+                "description": "Session ID to cancel"
+            }
+        },
+        "required": ["session_id"]
+    }
+    blocking = True
+
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        session_id = _require(arguments, "session_id")
+        session = _require_session(session_id)
+
+        start = time.perf_counter()
+        # Held until the run has stopped: its last reports must land on this object
+        engine.pin_session(session)
+        try:
+            # Status first: from now on no task of the session can be started or reported
+            engine.cancel_session(session)
+            stopped = _task_runner.cancel(session_id, CANCEL_GRACE) if _task_runner is not None else None
+        finally:
+            engine.unpin_session(session_id)
+        quiescence_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        # RULE #5: the documenter still consolidates what was finished
+        finished = [
+            r["task_id"] for r in session.results
+            if r["status"] in (TaskStatus.COMPLETED.value, TaskStatus.FAILED.value)
+        ]
+        doc_task = next(
+            (t for t in reversed(session.plan.tasks) if "documenter" in t.agent_expert_file), None
+        ) if session.plan else None
+        if doc_task is not None and doc_task.id in finished:
+            doc_task = None
+        launched = stopped is not None and stopped["documenter"] is not None
+
+        if output_mode(arguments) != "full":
+            data = {
+                "session_id": session_id,
+                "status": TaskStatus.CANCELLED.value,
+                "quiescence_ms": quiescence_ms,
+                "finished_tasks": finished,
+                "documenter": doc_task.id if doc_task else None,
+                "documenter_launched": launched
+            }
+            if stopped is not None:
+                data.update(
+                    terminated=stopped["terminated"], killed=stopped["killed"], dropped=stopped["dropped"]
+                )
+            return data
+
+        lines = [f"✅ Session {session_id} cancelled successfully"]
+        if stopped is not None:
+            lines.append(f"├─ Processes: {stopped['terminated']} terminated, {stopped['killed']} killed")
+            lines.append(f"├─ Dropped from queue: {', '.join(stopped['dropped']) or 'none'}")
+        if launched:
+            lines.append(f"├─ Documenter: {doc_task.id} launched to finalize partial results")
+        elif doc_task is not None:
+            lines.append(
+                f"├─ 📝 Launch {doc_task.id} ({doc_task.agent_expert_file}) to finalize partial results "
+                f"of: {', '.join(finished) or 'none'}"
+            )
+        lines.append(f"└─ Quiescent in {quiescence_ms:.1f} ms")
+        return "\n".join(lines)
 
-            session = engine.get_session(session_id)
-            if not session:
-                return [TextContent(
-                    type="text",
-                    text=f"❌ Session '{session_id}' not found"
-                )]
 
-            session.status = TaskStatus.CANCELLED
-            session.completed_at = datetime.now()
+class SearchTool(SessionReaderTool):
+    name = "orchestrator_search"
+    description = "Full-text search over past orchestration sessions (requests, domains, experts, task docs)"
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "Words to search for, e.g. 'jwt refresh token'"
+            },
+            "status": {
+                "type": "string",
+                "description": "Only sessions with this status (optional)",
+                "enum": [s.value for s in TaskStatus]
+            },
+            "domain": {
+                "type": "string",
+                "description": "Only sessions touching this domain (optional)"
+            },
+            "since": {
+                "type": "string",
+                "description": "Only sessions started on/after this ISO date (optional)"
+            },
+            "until": {
+                "type": "string",
+                "description": "Only sessions started on/before this ISO date (optional)"
+            },
+            "limit": {
+                "type": "number",
+                "description": "Max results per page",
+                "default": 10,
+                "minimum": 1,
+                "maximum": 50
+            },
+            "cursor": {
+                "type": "string",
+                "description": "Cursor returned by the previous page (optional)"
+            }
+        },
+        "required": ["query"]
+    }
 
-            return [TextContent(
-                type="text",
-                text=f"✅ Session {session_id} cancelled successfully"
-            )]
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        query = _require(arguments, "query")
 
+        limit = min(int(arguments.get("limit", 10)), 50)
+        try:
+            hits, next_cursor = engine.search_sessions(
+                query,
+                limit=limit,
+                status=arguments.get("status") or None,
+                domain=arguments.get("domain") or None,
+                since=arguments.get("since") or None,
+                until=arguments.get("until") or None,
+                cursor=arguments.get("cursor") or None
+            )
+        except ValueError as e:
+            raise ToolError(f"Error: {e}")
+
+        if output_mode(arguments) != "full":
+            return {"query": query, "results": hits, "next_cursor": next_cursor}
+
+        output = f"🔎 SESSION SEARCH: \"{query}\" ({len(hits)} results)\n\n"
+
+        if not hits:
+            output += "No matching sessions found."
         else:
-            return [TextContent(
-                type="text",
-                text=f"❌ Unknown tool: {name}"
-            )]
+            for hit in hits:
+                output += f"├─ [{hit['session_id']}] {hit['user_request'][:60]}\n"
+                output += f"│  └─ Score: {hit['score']:.2f} | Status: {hit['status']} | {hit['started_at']}\n"
+
+        if next_cursor:
+            output += f"\n➡️ More results: call again with cursor=\"{next_cursor}\""
+
+        return output
+
+
+class ReportTool(ToolHandler):
+    name = "orchestrator_report"
+    description = "Report task progress for a session: start, completion/failure with result, and task documentation"
+    input_schema = {
+        "type": "object",
+        "properties": {
+            "session_id": {
+                "type": "string",
+                "description": "Session the task belongs to"
+            },
+            "task_id": {
+                "type": "string",
+                "description": "Task ID from the plan, e.g. T1"
+            },
+            "event": {
+                "type": "string",
+                "description": "What happened: start, complete, fail, or doc (documentation only)",
+                "enum": ["start", "complete", "fail", "doc"]
+            },
+            "result": {
+                "type": "string",
+                "description": "Short result summary (complete/fail)"
+            },
+            "error": {
+                "type": "string",
+                "description": "Error message (fail)"
+            },
+            "tokens_used": {
+                "type": "number",
+                "description": "Tokens consumed by the task (optional)"
+            },
+            "what_done": {
+                "type": "string",
+                "description": "FIX #11 doc: what was done (1 line)"
+            },
+            "what_not_to_do": {
+                "type": "string",
+                "description": "FIX #11 doc: approaches to avoid"
+            },
+            "files_changed": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "FIX #11 doc: files modified"
+            },
+            "doc_status": {
+                "type": "string",
+                "description": "FIX #11 doc status (default derived from event)",
+                "enum": ["success", "partial", "failed"]
+            }
+        },
+        "required": ["session_id", "task_id", "event"]
+    }
+    blocking = True
+
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        session_id = arguments.get("session_id", "")
+        task_id = arguments.get("task_id", "")
+        event = arguments.get("event", "")
+
+        if not (session_id and task_id and event):
+            raise ToolError("Error: 'session_id', 'task_id' and 'event' parameters are required")
+
+        session = _require_session(session_id)
+
+        doc = None
+        if arguments.get("what_done"):
+            doc = TaskDocumentation(
+                task_id=task_id,
+                what_done=arguments["what_done"],
+                what_not_to_do=arguments.get("what_not_to_do", ""),
+                files_changed=list(arguments.get("files_changed") or []),
+                status=arguments.get("doc_status") or (
+                    "success" if event == "complete" else
+                    "failed" if event == "fail" else "partial"
+                )
+            )
 
-    except Exception as e:
-        logger.exception(f"Error executing tool {name}")
-        return [TextContent(
-            type="text",
-            text=f"❌ Error executing {name}: {str(e)}"
-        )]
+        try:
+            entry = engine.report_task(
+                session,
+                task_id,
+                event,
+                result=arguments.get("result"),
+                error=arguments.get("error"),
+                tokens_used=arguments.get("tokens_used", 0),
+                doc=doc
+            )
+        except ValueError as e:
+            raise ToolError(f"Error: {e}")
+
+        progress = engine.get_progress(session)
+        if output_mode(arguments) != "full":
+            return {
+                "session_id": session_id,
+                "task_id": task_id,
+                "task_status": entry["status"],
+                "duration_seconds": entry["duration_seconds"],
+                "documentation": doc is not None,
+                "session_status": session.status.value,
+                "progress": progress
+            }
+        duration = f" ({entry['duration_seconds']:.1f}s)" if entry["duration_seconds"] else ""
+        return f"""✅ REPORT RECORDED: {session_id} / {task_id}
+├─ Task Status: {entry['status']}{duration}
+├─ Documentation: {'recorded' if doc else 'none'}
+├─ Session Status: {session.status.value}
+└─ Progress: {progress['completed']}/{progress['total']} completed | {progress['failed']} failed | {progress['in_progress']} running
+"""
+
+
+class MetricsTool(ToolHandler):
+    name = "orchestrator_metrics"
+    description = "Live server telemetry: tool latencies, caches, store, event loop, processes, memory"
+    input_schema = {
+        "type": "object",
+        "properties": {}
+    }
+    # The first call opens the session store and search index
+    blocking = True
+
+    def run(self, arguments: Dict[str, Any]) -> Any:
+        metrics = build_metrics_payload()
+        if output_mode(arguments) != "full":
+            return metrics
+
+        def rate(value: Optional[float]) -> str:
+            return f"{value:.1%}" if value is not None else "-"
+
+        caches, store, loop = metrics["caches"], metrics["store"], metrics["event_loop"]
+        admission, flight = metrics["admission"], metrics["single_flight"]
+        pm, process = metrics["process_manager"], metrics["process"]
+        rss = process["rss_bytes"]
+        output = f"""📊 ORCHESTRATOR METRICS
+{RULE_LINE}
+
+| Tool | Calls | Errors | p50 ms | p99 ms | Max ms |
+|------|-------|--------|--------|--------|--------|
+"""
+        for name, tool in metrics["tools"].items():
+            output += (
+                f"| {name} | {tool['count']} | {tool['errors']} | {tool['p50_ms']:g} "
+                f"| {tool['p99_ms']:g} | {tool['max_ms']:g} |\n"
+            )
+        output += f"""
+🗄️ CACHES & STORE
+├─ Response cache: {caches['responses']['entries']} entries, hit rate {rate(caches['responses']['hit_rate'])}
+├─ Session cache: {caches['sessions']['entries']} sessions, {caches['sessions']['bytes'] / 1024:.0f} KB, hit rate {rate(caches['sessions']['hit_rate'])}, {caches['sessions']['evictions']} evictions
+└─ Store ({store['backend']}): {store['file_bytes'] / 1024:.0f} KB on disk, {store['pending_writes']} pending writes, {store['batches_written']} batches written
+
+⚙️ RUNTIME
+├─ Event loop lag: last {loop['last_ms']:.1f} ms | p99 {loop['p99_ms']:g} ms | max {loop['max_ms']:.1f} ms ({loop['samples']} samples)
+├─ Admission: {admission['inflight']} running | {admission['queued']} queued | {admission['rejected']} rejected | {admission['timed_out']} timed out
+├─ Single-flight: {flight['executions']} executions | {flight['coalesced']} coalesced
+├─ ProcessManager: {'healthy' if pm['health'] and pm['health']['healthy'] else 'available' if pm['available'] else 'unavailable'}{f" | {pm['metrics']['active_processes']} active | {pm['metrics']['total_spawned']} spawned" if pm['metrics'] else ''}
+├─ Memory: {f'{rss / 1048576:.1f} MB RSS' if rss else 'RSS unknown'} | {process['threads']} threads
+└─ GC: collections {process['gc']['collections']} | pending {process['gc']['pending']}
+"""
+        return output
+
+
+def load_tool_limits(raw: str) -> Dict[str, int]:
+    """Per-tool concurrency caps from ORCHESTRATOR_TOOL_LIMITS (JSON object)"""
+    if not raw:
+        return {}
+    try:
+        limits = {str(k): int(v) for k, v in json.loads(raw).items()}
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning("Ignoring invalid ORCHESTRATOR_TOOL_LIMITS: %s", e)
+        return {}
+    return {name: limit for name, limit in limits.items() if limit > 0}
+
+
+# Middleware shared by every tool: timing (outermost, so it sees the full
+# cost including waits), single-flight coalescing (duplicates never queue),
+# the response cache (hits skip admission), admission control, then
+# progress notifications
+tool_timing = TimingMiddleware()
+tool_single_flight = SingleFlightMiddleware()
+tool_cache = ResponseCacheMiddleware()
+tool_admission = AdmissionMiddleware(
+    max_inflight=ADMISSION_MAX_INFLIGHT,
+    max_queue=ADMISSION_MAX_QUEUE,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+    tool_limits=load_tool_limits(TOOL_LIMITS_JSON)
+)
+# Blocking tools run here, so one slow call never stalls the event loop
+tool_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="orchestrator-tool")
+tool_registry = ToolRegistry(middleware=[
+    tool_timing,
+    tool_single_flight,
+    tool_cache,
+    tool_admission,
+    ProgressMiddleware(_progress_channel, PROGRESS_RATE),
+], executor=tool_executor)
+for _handler in (
+    AnalyzeTool(),
+    ExecuteTool(),
+    StatusTool(),
+    AgentsTool(),
+    ListTool(),
+    PreviewTool(),
+    CancelTool(),
+    SearchTool(),
+    ReportTool(),
+    MetricsTool(),
+):
+    tool_registry.register(_handler)
+
+@server.list_tools()
+async def handle_list_tools() -> List[Tool]:
+    """List available MCP tools"""
+    return tool_registry.list_tools()
+
+@server.call_tool()
+async def handle_call_tool(name: str, arguments: dict) -> List[TextContent | ImageContent | EmbeddedResource]:
+    """Handle tool calls through the registry's middleware pipeline"""
+    return await tool_registry.call(name, arguments)
 
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
-async def run_server():
-    """Main entry point for MCP server with ProcessManager lifecycle."""
-    # Initialize ProcessManager if available
-    pm = get_process_manager()
+def warm_up_server() -> None:
+    """Open the engine, load the keyword mappings and probe ProcessManager"""
+    try:
+        engine.open()
+        ensure_keyword_mappings()
+        get_process_manager()
+    except Exception:
+        # Left to the first call that needs it, which reports the error
+        logger.exception("Start-up initialization failed")
+
+async def run_retention(warm_up: "asyncio.Future[None]") -> None:
+    """Retention loop, started once the engine is open"""
+    await asyncio.shield(warm_up)
+    await engine.gc.run(GC_INTERVAL, GC_SLICE_MS / 1000.0)
+
+async def run_server(
+    transport: str = TRANSPORT,
+    host: str = HTTP_HOST,
+    port: int = HTTP_PORT,
+    socket_path: Optional[str] = None
+):
+    """
+    Main entry point for MCP server with ProcessManager lifecycle.
+    With transport="http" or "daemon" one process serves every local client.
+    """
+    # Heavy initialization runs on a worker thread while the client completes
+    # the MCP handshake; a tool call arriving earlier waits for what it needs
+    warm_up = asyncio.create_task(asyncio.to_thread(warm_up_server))
+    # Retention runs in small slices off the event loop
+    gc_task = asyncio.create_task(run_retention(warm_up))
+    # Resource change detection for subscribed clients
+    watch_task = asyncio.create_task(watch_resources(
+        resource_catalog, resource_subscriptions, RESOURCE_POLL_INTERVAL, refresh_mappings
+    ))
+    lag_task = asyncio.create_task(loop_lag.run())
+    export_task = None
+    if METRICS_FILE or METRICS_PORT:
+        export_task = asyncio.create_task(MetricsExporter(
+            collect_openmetrics, path=METRICS_FILE, port=METRICS_PORT, interval=METRICS_INTERVAL
+        ).serve())
 
     try:
-        async with stdio_server() as (read_stream, write_stream):
-            await server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="orchestrator-mcp",
-                    server_version="6.0.0",
-                    capabilities=server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={}
-                    )
+        if transport == "http":
+            from http_transport import LocalHttpTransport
+            await LocalHttpTransport(
+                server,
+                host=host,
+                port=port,
+                socket_path=socket_path or HTTP_SOCKET,
+                max_clients=HTTP_MAX_CLIENTS,
+                idle_timeout=HTTP_IDLE_TIMEOUT
+            ).serve()
+        elif transport == "daemon":
+            from daemon import DaemonAlreadyRunningError, DaemonServer
+            from shim import default_socket_path
+            try:
+                await DaemonServer(
+                    server,
+                    socket_path or default_socket_path(),
+                    max_clients=HTTP_MAX_CLIENTS,
+                    idle_exit=DAEMON_IDLE_EXIT
+                ).serve()
+            except DaemonAlreadyRunningError as e:
+                # Lost the start-up race against another shim's daemon
+                logger.info(str(e))
+        else:
+            async with stdio_server() as (read_stream, write_stream):
+                await server.run(
+                    read_stream,
+                    write_stream,
+                    server.create_initialization_options()
                 )
-            )
     finally:
+        background = [gc_task, watch_task, lag_task]
+        if export_task is not None:
+            background.append(export_task)
+        for task in background:
+            task.cancel()
+        # The warm-up is not cancelled: its thread would run on and race the shutdown below
+        await asyncio.gather(warm_up, *background, return_exceptions=True)
+        # Let running tool calls finish before the engine goes away, off the event loop
+        await asyncio.to_thread(tool_executor.shutdown, True)
+        if _task_runner is not None:
+            _task_runner.close()
+        # Writes out coalesced session changes before the process exits
+        engine.close()
+
         # Ensure ProcessManager cleanup on server shutdown
+        pm = _process_manager
         if pm is not None:
             try:
                 logger.info("Performing ProcessManager cleanup on server shutdown")
                 pm.terminate_all(timeout=5.0)
             except Exception as e:
-                logger.warning(f"Error during ProcessManager cleanup: {e}")
+                logger.warning("Error during ProcessManager cleanup: %s", e)
 
 def main():
     """Synchronous entry point for uvx"""
-    asyncio.run(run_server())
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Orchestrator MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http", "daemon"], default=TRANSPORT)
+    parser.add_argument("--host", default=HTTP_HOST, help="HTTP transport: loopback address")
+    parser.add_argument("--port", type=int, default=HTTP_PORT, help="HTTP transport: TCP port")
+    parser.add_argument("--socket", default=None, help="HTTP/daemon transport: Unix socket path")
+    args = parser.parse_args()
+    configure_logging(
+        LOG_LEVEL,
+        json_file=LOG_FILE,
+        max_bytes=int(LOG_MAX_MB * 1024 * 1024),
+        backups=LOG_BACKUPS,
+        repeat_window=LOG_REPEAT_WINDOW,
+        repeat_burst=LOG_REPEAT_BURST
+    )
+    try:
+        asyncio.run(run_server(args.transport, args.host, args.port, args.socket))
+    finally:
+        stop_logging()
 
 if __name__ == "__main__":
     main()
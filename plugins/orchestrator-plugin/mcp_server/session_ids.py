@@ -0,0 +1,95 @@
+"""
+SESSION IDS
+===========
+
+ULID-style session identifiers: 16 lowercase Crockford base32 characters,
+a 48-bit millisecond timestamp (10 chars) followed by 30 random bits
+(6 chars). IDs sort lexicographically in creation order and are strictly
+monotonic within a process: IDs created in the same millisecond increment
+the random part instead of drawing a new one.
+
+Sessions created by older versions have 8-character hex IDs that carry no
+time information; ``session_sort_key`` gives them a key derived from their
+start time so both kinds interleave correctly in ordered storage.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import secrets
+import threading
+import time
+from datetime import datetime
+
+# Crockford base32 (no I, L, O, U); ASCII order == numeric order
+ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"
+_ALPHABET_SET = frozenset(ALPHABET)
+
+TIME_CHARS = 10     # 50 bits of room for a 48-bit millisecond timestamp
+RANDOM_CHARS = 6    # 30 bits
+ID_LENGTH = TIME_CHARS + RANDOM_CHARS
+_RANDOM_LIMIT = 1 << (5 * RANDOM_CHARS)
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def encode_time(ms: int) -> str:
+    """Fixed-width, sortable encoding of a millisecond timestamp"""
+    return _encode(ms, TIME_CHARS)
+
+
+def is_sortable_id(session_id: str) -> bool:
+    """True for IDs produced by ``new_session_id`` (as opposed to legacy hex IDs)"""
+    return len(session_id) == ID_LENGTH and _ALPHABET_SET.issuperset(session_id)
+
+
+def session_sort_key(session_id: str, started_at: str) -> str:
+    """
+    Storage ordering key of a session.
+
+    For current IDs the key is the ID itself. Legacy IDs are prefixed with
+    the encoded start time, which places them among current IDs of the
+    same millisecond.
+    """
+    if is_sortable_id(session_id):
+        return session_id
+    ms = int(datetime.fromisoformat(started_at).timestamp() * 1000)
+    return encode_time(ms) + session_id
+
+
+def id_from_sort_key(key: str) -> str:
+    """Inverse of ``session_sort_key``"""
+    return key if is_sortable_id(key) else key[TIME_CHARS:]
+
+
+class SessionIdGenerator:
+    """Thread-safe, monotonic ULID-style ID factory"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._random = 0
+
+    def __call__(self) -> str:
+        with self._lock:
+            ms = int(time.time() * 1000)
+            if ms > self._last_ms:
+                self._random = secrets.randbelow(_RANDOM_LIMIT)
+            else:
+                # Same millisecond (or clock went backwards): keep ordering
+                ms = self._last_ms
+                self._random += 1
+                if self._random >= _RANDOM_LIMIT:
+                    ms += 1
+                    self._random = secrets.randbelow(_RANDOM_LIMIT)
+            self._last_ms = ms
+            return encode_time(ms) + _encode(self._random, RANDOM_CHARS)
+
+
+new_session_id = SessionIdGenerator()
@@ -0,0 +1,1313 @@
+"""
+SESSION STORE
+=============
+
+Persistence backends for orchestration sessions.
+
+The engine hands every backend plain session *records* (JSON-safe dicts
+produced by ``server.session_to_record``) so this module has no dependency
+on the dataclasses defined in ``server.py``.
+
+Backends:
+- JsonlSessionStore: append-only JSON-lines log with offset index (default)
+- SqliteSessionStore: SQLite in WAL mode with indexed listing queries
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import bisect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from session_ids import id_from_sort_key, session_sort_key
+
+logger = logging.getLogger("orchestrator-mcp.store")
+
+# Fields kept in the compact summary used by listings
+SUMMARY_FIELDS = (
+    "session_id",
+    "user_request",
+    "status",
+    "started_at",
+    "completed_at",
+    "tasks_count",
+    "domains",
+)
+
+
+def record_summary(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the compact listing summary from a full session record."""
+    return {field: record.get(field) for field in SUMMARY_FIELDS}
+
+
+class SessionStore:
+    """Interface shared by all session persistence backends."""
+
+    #: True when listing queries are served by an index instead of a sort
+    indexed = False
+
+    def put(self, record: Dict[str, Any]) -> None:
+        """Insert or replace a single session record."""
+        self.put_many([record])
+
+    def put_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Insert or replace several session records in one write."""
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the full record of a session, or None if unknown."""
+        raise NotImplementedError
+
+    def list_summaries(
+        self,
+        limit: int = 10,
+        status: Optional[str] = None,
+        domain: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the most recent session summaries, newest first."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        """Return the number of stored sessions."""
+        raise NotImplementedError
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Yield the full record of every stored session."""
+        raise NotImplementedError
+
+    def changes(
+        self, cursor: Optional[Any]
+    ) -> Tuple[Optional[List[Dict[str, Any]]], List[str], Any]:
+        """
+        Sessions written or deleted by any process since ``cursor``.
+
+        Returns ``(records, deleted_ids, next_cursor)``. ``records`` is None
+        when the changes since ``cursor`` are not known (no cursor yet, log
+        replaced, feed pruned): the caller must reload from ``iter_records``.
+        Pass ``next_cursor`` to the next call.
+        """
+        raise NotImplementedError
+
+    def change_cursor(self) -> Hashable:
+        """Cheap key of the change feed position: moves whenever any process writes."""
+        raise NotImplementedError
+
+    def oldest(
+        self,
+        status: str,
+        limit: int,
+        after: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Page through sessions with ``status`` in storage (creation) order.
+
+        Returns ``(entries, cursor)``; each entry has ``session_id``,
+        ``started_at`` and ``size`` (stored bytes). Pass ``cursor`` as
+        ``after`` for the next page; it is None once the end is reached.
+        """
+        raise NotImplementedError
+
+    def delete_many(self, session_ids: Iterable[str]) -> int:
+        """Delete sessions; returns how many existed."""
+        raise NotImplementedError
+
+    def compact_step(self, budget: float) -> bool:
+        """
+        Reclaim space left by deleted or superseded records, spending at
+        most about ``budget`` seconds. Returns True while work remains.
+        """
+        return False
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+# =============================================================================
+# CROSS-PROCESS FILE LOCK
+# =============================================================================
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class InterProcessLock:
+    """
+    Exclusive advisory lock on a side file, shared by every server process.
+
+    Uses ``fcntl.flock`` on POSIX and ``msvcrt.locking`` on Windows. Only
+    writers take it; readers never block on it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "InterProcessLock":
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s, keep waiting
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+# =============================================================================
+# JSON-LINES BACKEND (append-only log + compact offset index)
+# =============================================================================
+
+# Compact index entry: [offset, length, started_at, status, domains]
+_OFFSET, _LENGTH, _STARTED_AT, _STATUS, _DOMAINS = range(5)
+
+
+class JsonlSessionStore(SessionStore):
+    """
+    Full-state store backed by an append-only JSON-lines log.
+
+    Every write appends the complete session record to ``sessions.jsonl``.
+    A compact ``id -> [offset, length, started_at, status, domains]`` index
+    is kept in memory and snapshotted to ``sessions.idx``; startup loads
+    that snapshot and only scans log lines appended after it, so restart
+    time does not grow with the amount of history kept. Full records are
+    read from the log on demand.
+
+    Session IDs are kept in a sorted list of sort keys (see
+    ``session_ids``). New IDs are time-ordered, so inserts land at the end
+    and "latest N" listings are a reverse scan that stops after N matches.
+    Deleted keys stay in the list, marked dead, until they outnumber the
+    live ones, so a GC deletion batch does not rebuild the whole list.
+
+    Several server processes may share the same files. Appends are
+    serialized with an ``InterProcessLock``; readers take no lock and
+    simply index whatever complete lines other processes appended since
+    their last look (a cheap ``stat`` when nothing changed). Index
+    snapshots and log rewrites are published with an atomic rename, and
+    a replaced log (new inode) triggers a full re-index.
+    """
+
+    #: Appends between two index snapshots
+    SNAPSHOT_EVERY = 256
+
+    #: Compaction starts once superseded/deleted bytes exceed both this
+    #: and the live bytes (i.e. more than half of the log is garbage)
+    COMPACT_MIN_DEAD_BYTES = 1024 * 1024
+
+    #: Keys examined per ``oldest`` call, so sparse statuses stay bounded
+    SCAN_LIMIT = 5000
+
+    #: Dead sort keys tolerated before the key list is rebuilt
+    #: (beyond this, only once they outnumber the live keys)
+    DEAD_KEYS_SLACK = 1024
+
+    def __init__(self, log_path: str, index_path: str, legacy_path: Optional[str] = None):
+        self.log_path = log_path
+        self.index_path = index_path
+        self.file_lock = InterProcessLock(log_path + ".lock")
+        self._lock = threading.RLock()
+        self._index: Dict[str, List[Any]] = {}
+        self._order: List[str] = []
+        # Keys of deleted sessions still in _order; readers skip them
+        self._dead_keys: Set[str] = set()
+        # Bytes of the log holding current records (the rest is garbage)
+        self._live_bytes = 0
+        self._log_size = 0
+        self._log_id = None
+        self._unsnapshotted = 0
+        self._compaction: Optional[Dict[str, Any]] = None
+
+        with self.file_lock:
+            if legacy_path and not os.path.exists(log_path) and os.path.exists(legacy_path):
+                self._migrate_legacy(legacy_path)
+            self._reader = open(log_path, 'a+b')
+
+        self._log_id = self._file_id(os.fstat(self._reader.fileno()))
+        self._load_index()
+
+    # -- startup ----------------------------------------------------------
+
+    def _migrate_legacy(self, legacy_path: str) -> None:
+        """Import the summary-only sessions.json written by older versions."""
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with open(self.log_path, 'ab') as log:
+                for item in data:
+                    record = dict(item, domains=item.get("domains") or [],
+                                  plan=None, results=[], task_docs=[])
+                    log.write(self._encode(record))
+            logger.info("Migrated %s legacy sessions from %s", len(data), legacy_path)
+        except Exception as e:
+            logger.warning("Could not migrate legacy sessions: %s", e)
+
+    def _load_index(self) -> None:
+        log_size = os.fstat(self._reader.fileno()).st_size
+        try:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                if snapshot.get("log_id") == self._log_id and \
+                        snapshot.get("log_size", 0) <= log_size:
+                    self._index = snapshot["entries"]
+                    self._log_size = snapshot["log_size"]
+        except Exception as e:
+            logger.warning("Ignoring unreadable session index: %s", e)
+            self._index, self._log_size = {}, 0
+        # Snapshot entries are in first-write order, i.e. nearly sorted
+        self._order = sorted(
+            session_sort_key(session_id, entry[_STARTED_AT])
+            for session_id, entry in self._index.items()
+        )
+        self._live_bytes = sum(entry[_LENGTH] for entry in self._index.values())
+
+        tail = self._scan_log()
+        logger.info(
+            "Session index ready: %s sessions (%s log entries replayed)", len(self._index), tail
+        )
+
+    # -- log tailing ------------------------------------------------------
+
+    @staticmethod
+    def _file_id(st: os.stat_result) -> List[int]:
+        return [st.st_dev, st.st_ino]
+
+    def _scan_log(self) -> int:
+        """Index every complete log line after the indexed prefix."""
+        replayed = 0
+        offset = self._log_size
+        self._reader.seek(offset)
+        for line in self._reader:
+            if not line.endswith(b"\n"):
+                break  # torn or in-flight write, retried on the next scan
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping corrupt session log line at %s", offset)
+            else:
+                if record.get("deleted"):
+                    self._unindex([record["session_id"]])
+                else:
+                    self._index_record(record, offset, len(line))
+                replayed += 1
+            offset += len(line)
+        self._log_size = offset
+        return replayed
+
+    def _refresh(self) -> None:
+        """Merge in changes made by other processes since the last look."""
+        try:
+            st = os.stat(self.log_path)
+        except FileNotFoundError:
+            return
+        if self._file_id(st) != self._log_id:
+            # Log was rewritten (compaction) and atomically renamed into place
+            self._reader.close()
+            self._reader = open(self.log_path, 'a+b')
+            self._log_id = self._file_id(os.fstat(self._reader.fileno()))
+            self._index, self._order, self._log_size = {}, [], 0
+            self._dead_keys, self._live_bytes = set(), 0
+            self._scan_log()
+        elif st.st_size > self._log_size:
+            self._scan_log()
+
+    # -- helpers ----------------------------------------------------------
+
+    @staticmethod
+    def _encode(record: Dict[str, Any]) -> bytes:
+        return (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+    def _index_record(self, record: Dict[str, Any], offset: int, length: int) -> None:
+        session_id = record["session_id"]
+        previous = self._index.get(session_id)
+        if previous is None or previous[_STARTED_AT] != record["started_at"]:
+            if previous is not None:
+                # Legacy IDs are keyed by start time
+                self._unindex([session_id])
+            key = session_sort_key(session_id, record["started_at"])
+            if key in self._dead_keys:
+                self._dead_keys.discard(key)  # still in place in _order
+            elif not self._order or key > self._order[-1]:
+                self._order.append(key)
+            else:
+                bisect.insort(self._order, key)
+        else:
+            self._live_bytes -= previous[_LENGTH]
+        self._live_bytes += length
+        self._index[session_id] = [
+            offset, length, record["started_at"], record["status"],
+            record.get("domains") or [],
+        ]
+
+    def _unindex(self, session_ids: Iterable[str]) -> None:
+        for session_id in session_ids:
+            entry = self._index.pop(session_id, None)
+            if entry is not None:
+                self._live_bytes -= entry[_LENGTH]
+                self._dead_keys.add(session_sort_key(session_id, entry[_STARTED_AT]))
+        if len(self._dead_keys) > max(self.DEAD_KEYS_SLACK, len(self._index)):
+            self._order = [key for key in self._order if key not in self._dead_keys]
+            self._dead_keys.clear()
+
+    def _live_keys(self) -> Iterator[str]:
+        return (key for key in self._order if key not in self._dead_keys)
+
+    def _read(self, entry: List[Any]) -> Dict[str, Any]:
+        self._reader.seek(entry[_OFFSET])
+        return json.loads(self._reader.read(entry[_LENGTH]))
+
+    def _write_snapshot(self) -> None:
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"log_id": self._log_id, "log_size": self._log_size,
+                       "entries": self._index}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+        self._unsnapshotted = 0
+
+    # -- SessionStore API -------------------------------------------------
+
+    def put_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        encoded = [(record, self._encode(record)) for record in records]
+        if not encoded:
+            return
+        with self._lock, self.file_lock:
+            # Catch up with other writers; with the lock held an unterminated
+            # tail can only be a crashed writer's torn line, so drop it
+            self._refresh()
+            self._reader.seek(0, os.SEEK_END)
+            if self._reader.tell() != self._log_size:
+                self._reader.truncate(self._log_size)
+
+            offset = self._log_size
+            for record, line in encoded:
+                self._index_record(record, offset, len(line))
+                offset += len(line)
+            self._reader.write(b"".join(line for _, line in encoded))
+            self._reader.flush()
+            self._log_size = offset
+
+            self._unsnapshotted += len(encoded)
+            if self._unsnapshotted >= self.SNAPSHOT_EVERY:
+                self._write_snapshot()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(session_id)
+            return self._read(entry) if entry else None
+
+    def list_summaries(
+        self,
+        limit: int = 10,
+        status: Optional[str] = None,
+        domain: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            summaries = []
+            for key in reversed(self._order):
+                if len(summaries) >= limit:
+                    break
+                if key in self._dead_keys:
+                    continue
+                entry = self._index[id_from_sort_key(key)]
+                if (status is None or entry[_STATUS] == status) and \
+                        (domain is None or domain in entry[_DOMAINS]):
+                    summaries.append(record_summary(self._read(entry)))
+            return summaries
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            entries = sorted(self._index.values())
+        # Sequential pass over the log with a private handle
+        with open(self.log_path, 'rb') as f:
+            for entry in entries:
+                f.seek(entry[_OFFSET])
+                yield json.loads(f.read(entry[_LENGTH]))
+
+    def changes(
+        self, cursor: Optional[Any]
+    ) -> Tuple[Optional[List[Dict[str, Any]]], List[str], Any]:
+        # Cursor: [log_id, offset]; the log between offset and its end is the feed
+        with self._lock:
+            self._refresh()
+            position = [self._log_id, self._log_size]
+            if cursor is None or cursor[0] != self._log_id or cursor[1] > self._log_size:
+                return None, [], position
+            self._reader.seek(cursor[1])
+            data = self._reader.read(self._log_size - cursor[1])
+        written: Dict[str, Dict[str, Any]] = {}
+        deleted: Dict[str, None] = {}
+        for line in data.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # already reported by _scan_log
+            session_id = record["session_id"]
+            if record.get("deleted"):
+                written.pop(session_id, None)
+                deleted[session_id] = None
+            else:
+                deleted.pop(session_id, None)
+                written[session_id] = record
+        return list(written.values()), list(deleted), position
+
+    def change_cursor(self) -> Hashable:
+        with self._lock:
+            self._refresh()
+            return (tuple(self._log_id), self._log_size)
+
+    def oldest(
+        self,
+        status: str,
+        limit: int,
+        after: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        with self._lock:
+            self._refresh()
+            start = bisect.bisect_right(self._order, after) if after is not None else 0
+            stop = min(len(self._order), start + self.SCAN_LIMIT)
+            page = []
+            position = start
+            while position < stop and len(page) < limit:
+                key = self._order[position]
+                position += 1
+                if key in self._dead_keys:
+                    continue
+                session_id = id_from_sort_key(key)
+                entry = self._index[session_id]
+                if entry[_STATUS] == status:
+                    page.append({
+                        "session_id": session_id,
+                        "started_at": entry[_STARTED_AT],
+                        "size": entry[_LENGTH],
+                    })
+            cursor = self._order[position - 1] if position < len(self._order) else None
+            return page, cursor
+
+    def delete_many(self, session_ids: Iterable[str]) -> int:
+        session_ids = list(session_ids)
+        with self._lock, self.file_lock:
+            self._refresh()
+            present = [sid for sid in session_ids if sid in self._index]
+            if not present:
+                return 0
+            self._reader.seek(0, os.SEEK_END)
+            if self._reader.tell() != self._log_size:
+                self._reader.truncate(self._log_size)
+            # Tombstones: other processes drop the sessions when tailing the log
+            tombstones = b"".join(
+                self._encode({"session_id": sid, "deleted": True}) for sid in present
+            )
+            self._reader.write(tombstones)
+            self._reader.flush()
+            self._log_size += len(tombstones)
+            self._unindex(present)
+            self._unsnapshotted += len(present)
+            if self._unsnapshotted >= self.SNAPSHOT_EVERY:
+                self._write_snapshot()
+            return len(present)
+
+    # -- compaction -------------------------------------------------------
+
+    def compact_step(self, budget: float) -> bool:
+        """
+        Incrementally rewrite the log with live records only.
+
+        Live lines are copied to a temporary file in storage order from a
+        private handle, without holding any lock (written log bytes never
+        change). The final step takes the locks, copies whatever was
+        appended meanwhile, and atomically renames the new log into place.
+        """
+        deadline = time.monotonic() + budget
+        if self._compaction is None and not self._start_compaction():
+            return False
+        state = self._compaction
+        source, target = state["source"], state["target"]
+        ids, offsets = state["ids"], state["offsets"]
+
+        while state["position"] < len(ids):
+            session_id, offset, length = ids[state["position"]]
+            source.seek(offset)
+            offsets[session_id] = (target.tell(), offset)
+            target.write(source.read(length))
+            state["position"] += 1
+            if time.monotonic() >= deadline:
+                return True
+
+        self._finish_compaction()
+        return False
+
+    def _start_compaction(self) -> bool:
+        with self._lock:
+            self._refresh()
+            live = self._live_bytes
+            dead = self._log_size - live
+            if dead < max(self.COMPACT_MIN_DEAD_BYTES, live):
+                return False
+            source = open(self.log_path, 'rb')
+            if self._file_id(os.fstat(source.fileno())) != self._log_id:
+                source.close()
+                return False
+            ids = [
+                (session_id, self._index[session_id][_OFFSET], self._index[session_id][_LENGTH])
+                for session_id in map(id_from_sort_key, self._live_keys())
+            ]
+        tmp_path = f"{self.log_path}.compact.{os.getpid()}.tmp"
+        self._compaction = {
+            "source": source,
+            "target": open(tmp_path, 'wb'),
+            "tmp_path": tmp_path,
+            "log_id": self._log_id,
+            "ids": ids,
+            "offsets": {},
+            "position": 0,
+        }
+        logger.info("Compacting session log: %s of %s bytes reclaimable", dead, self._log_size)
+        return True
+
+    def _finish_compaction(self) -> None:
+        state, self._compaction = self._compaction, None
+        source, target, offsets = state["source"], state["target"], state["offsets"]
+        try:
+            with self._lock, self.file_lock:
+                self._refresh()
+                if self._log_id != state["log_id"]:
+                    # Another process compacted first
+                    raise RuntimeError("session log replaced during compaction")
+                index = {}
+                for session_id, entry in self._index.items():
+                    copied = offsets.get(session_id)
+                    if copied is not None and copied[1] == entry[_OFFSET]:
+                        new_offset = copied[0]
+                    else:
+                        # Written after the copy started
+                        self._reader.seek(entry[_OFFSET])
+                        new_offset = target.tell()
+                        target.write(self._reader.read(entry[_LENGTH]))
+                    index[session_id] = [new_offset] + entry[1:]
+                for session_id in offsets.keys() - self._index.keys():
+                    # Deleted after being copied
+                    target.write(self._encode({"session_id": session_id, "deleted": True}))
+                target.flush()
+                os.fsync(target.fileno())
+                log_size = target.tell()
+                target.close()
+                os.replace(state["tmp_path"], self.log_path)
+
+                self._reader.close()
+                self._reader = open(self.log_path, 'a+b')
+                self._log_id = self._file_id(os.fstat(self._reader.fileno()))
+                self._index, self._log_size = index, log_size
+                self._write_snapshot()
+            logger.info("Session log compacted to %s bytes", log_size)
+        except Exception as e:
+            logger.warning("Session log compaction abandoned: %s", e)
+            target.close()
+            try:
+                os.remove(state["tmp_path"])
+            except OSError:
+                pass
+        finally:
+            source.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._compaction is not None:
+                state, self._compaction = self._compaction, None
+                state["source"].close()
+                state["target"].close()
+                os.remove(state["tmp_path"])
+            if self._reader.closed:
+                return
+            try:
+                self._write_snapshot()
+            except Exception as e:
+                logger.warning("Could not write session index snapshot: %s", e)
+            self._reader.close()
+
+
+# =============================================================================
+# SQLITE BACKEND (WAL mode, indexed)
+# =============================================================================
+
+_SQLITE_SCHEMA_VERSION = 3
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id   TEXT PRIMARY KEY,
+    sort_key     TEXT NOT NULL,
+    user_request TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    started_at   TEXT NOT NULL,
+    completed_at TEXT,
+    tasks_count  INTEGER NOT NULL DEFAULT 0,
+    complexity   TEXT,
+    domains      TEXT NOT NULL DEFAULT '[]',
+    payload      TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_sort_key
+    ON sessions (sort_key);
+CREATE INDEX IF NOT EXISTS idx_sessions_status_sort_key
+    ON sessions (status, sort_key);
+
+CREATE TABLE IF NOT EXISTS session_domains (
+    domain     TEXT NOT NULL,
+    sort_key   TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    PRIMARY KEY (domain, sort_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_session_domains_session
+    ON session_domains (session_id);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    session_id        TEXT NOT NULL,
+    task_id           TEXT NOT NULL,
+    agent_expert_file TEXT NOT NULL,
+    model             TEXT NOT NULL,
+    priority          TEXT NOT NULL,
+    status            TEXT NOT NULL,
+    PRIMARY KEY (session_id, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_tasks_expert
+    ON tasks (agent_expert_file);
+
+CREATE TABLE IF NOT EXISTS task_docs (
+    session_id     TEXT NOT NULL,
+    task_id        TEXT NOT NULL,
+    what_done      TEXT NOT NULL,
+    what_not_to_do TEXT NOT NULL,
+    files_changed  TEXT NOT NULL,
+    status         TEXT NOT NULL,
+    PRIMARY KEY (session_id, task_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS session_changes (
+    seq        INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL
+);
+"""
+
+_SUMMARY_COLUMNS = ", ".join(SUMMARY_FIELDS)
+_SUMMARY_COLUMNS_S = ", ".join(f"s.{field}" for field in SUMMARY_FIELDS)
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Full-state session store backed by SQLite in WAL mode.
+
+    Listing queries walk ``idx_sessions_sort_key`` (or the status/domain
+    composite indexes) backwards and stop after ``limit`` rows, so their
+    cost does not depend on how many historical sessions are stored.
+
+    A new database is filled from ``migrate_from`` (the sessions of the
+    JSON-lines backend) in the transaction that creates the schema.
+
+    Every write and delete also appends the session ID to
+    ``session_changes``, the change feed read by ``changes``; only the
+    last ``CHANGE_FEED_ROWS`` entries are kept.
+    """
+
+    indexed = True
+
+    #: Entries kept in the change feed; readers further behind reload everything
+    CHANGE_FEED_ROWS = 10000
+
+    def __init__(
+        self,
+        path: str,
+        migrate_from: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None,
+    ):
+        self.path = path
+        self.migrate_from = migrate_from
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        # Only takes effect on a new database; lets compact_step free pages in slices
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Other server processes share the database: wait for their write
+        # transactions instead of failing with "database is locked"
+        self._conn.execute("PRAGMA busy_timeout=10000")
+        self._create_schema()
+        logger.info("SQLite session store ready at %s", path)
+
+    def _create_schema(self) -> None:
+        conn = self._conn
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= _SQLITE_SCHEMA_VERSION:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-check under the write lock: another process may have migrated
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < _SQLITE_SCHEMA_VERSION:
+                tables = {row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )}
+                # Version 2 only adds tables, created below
+                from_v0 = "sessions" in tables and version < 1
+                if from_v0:
+                    self._migrate_v1(conn)
+                for statement in _SQLITE_SCHEMA.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+                if from_v0:
+                    conn.execute(
+                        "INSERT INTO session_domains (domain, sort_key, session_id) "
+                        "SELECT j.value, s.sort_key, s.session_id "
+                        "FROM sessions s, json_each(s.domains) j"
+                    )
+                if "sessions" in tables and version < 3:
+                    self._migrate_v3(conn)
+                elif "sessions" not in tables and self.migrate_from is not None:
+                    self._import_sessions(conn)
+                conn.execute(f"PRAGMA user_version = {_SQLITE_SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _migrate_v1(conn: sqlite3.Connection) -> None:
+        """Order storage by session sort key instead of started_at."""
+        conn.execute("ALTER TABLE sessions ADD COLUMN sort_key TEXT NOT NULL DEFAULT ''")
+        conn.executemany(
+            "UPDATE sessions SET sort_key = ? WHERE session_id = ?",
+            [
+                (session_sort_key(row[0], row[1]), row[0])
+                for row in conn.execute("SELECT session_id, started_at FROM sessions").fetchall()
+            ],
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_sessions_started_at")
+        conn.execute("DROP INDEX IF EXISTS idx_sessions_status_started_at")
+        # Rebuilt (and refilled) with the new primary key
+        conn.execute("DROP TABLE IF EXISTS session_domains")
+
+    @staticmethod
+    def _migrate_v3(conn: sqlite3.Connection) -> None:
+        """Fill tasks.status from the reported results (it was always 'pending')."""
+        updates = []
+        for session_id, payload in conn.execute("SELECT session_id, payload FROM sessions"):
+            for result in json.loads(payload).get("results") or []:
+                updates.append((result["status"], session_id, result["task_id"]))
+        conn.executemany(
+            "UPDATE tasks SET status = ? WHERE session_id = ? AND task_id = ?", updates
+        )
+
+    def _import_sessions(self, conn: sqlite3.Connection) -> None:
+        """Copy the sessions of the previous backend into the new database."""
+        imported = 0
+        for record in self.migrate_from():
+            self._write_record(conn, record)
+            imported += 1
+        if imported:
+            logger.info("Imported %s sessions into %s", imported, self.path)
+
+    def put_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                session_ids = []
+                for record in records:
+                    self._write_record(conn, record)
+                    session_ids.append(record["session_id"])
+                self._log_changes(conn, session_ids)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _write_record(conn: sqlite3.Connection, record: Dict[str, Any]) -> None:
+        session_id = record["session_id"]
+        sort_key = session_sort_key(session_id, record["started_at"])
+        plan = record.get("plan") or {}
+        domains = record.get("domains") or []
+
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions "
+            "(session_id, sort_key, user_request, status, started_at, completed_at, "
+            " tasks_count, complexity, domains, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                session_id,
+                sort_key,
+                record["user_request"],
+                record["status"],
+                record["started_at"],
+                record.get("completed_at"),
+                record.get("tasks_count", 0),
+                plan.get("complexity"),
+                json.dumps(domains, ensure_ascii=False),
+                json.dumps(record, ensure_ascii=False),
+            ),
+        )
+
+        conn.execute("DELETE FROM session_domains WHERE session_id = ?", (session_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO session_domains (domain, sort_key, session_id) "
+            "VALUES (?, ?, ?)",
+            [(domain, sort_key, session_id) for domain in domains],
+        )
+
+        # Task status as last reported (orchestrator_report), else pending
+        reported = {r["task_id"]: r["status"] for r in record.get("results") or []}
+        conn.execute("DELETE FROM tasks WHERE session_id = ?", (session_id,))
+        conn.executemany(
+            "INSERT INTO tasks "
+            "(session_id, task_id, agent_expert_file, model, priority, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    session_id,
+                    task["id"],
+                    task["agent_expert_file"],
+                    task["model"],
+                    task["priority"],
+                    reported.get(task["id"], "pending"),
+                )
+                for task in plan.get("tasks", [])
+            ],
+        )
+
+        conn.execute("DELETE FROM task_docs WHERE session_id = ?", (session_id,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO task_docs "
+            "(session_id, task_id, what_done, what_not_to_do, files_changed, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    session_id,
+                    doc["task_id"],
+                    doc["what_done"],
+                    doc["what_not_to_do"],
+                    json.dumps(doc["files_changed"], ensure_ascii=False),
+                    doc["status"],
+                )
+                for doc in record.get("task_docs") or []
+            ],
+        )
+
+    def _log_changes(self, conn: sqlite3.Connection, session_ids: List[str]) -> None:
+        """Append to the change feed and trim it (inside the write transaction)"""
+        conn.executemany(
+            "INSERT INTO session_changes (session_id) VALUES (?)", [(sid,) for sid in session_ids]
+        )
+        conn.execute(
+            "DELETE FROM session_changes WHERE seq <= "
+            "(SELECT MAX(seq) FROM session_changes) - ?", (self.CHANGE_FEED_ROWS,)
+        )
+
+    def changes(
+        self, cursor: Optional[Any]
+    ) -> Tuple[Optional[List[Dict[str, Any]]], List[str], Any]:
+        # Cursor: the last change feed sequence number seen
+        with self._lock:
+            first, last = self._conn.execute(
+                "SELECT MIN(seq), MAX(seq) FROM session_changes"
+            ).fetchone()
+            last = last or 0
+            if cursor is None or cursor > last or (first is not None and cursor < first - 1):
+                return None, [], last
+            session_ids = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT session_id FROM session_changes WHERE seq > ?", (cursor,)
+            )]
+            written = []
+            for start in range(0, len(session_ids), 500):
+                chunk = session_ids[start:start + 500]
+                written.extend(self._conn.execute(
+                    "SELECT session_id, payload FROM sessions WHERE session_id IN "
+                    f"({', '.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        found = {row["session_id"] for row in written}
+        deleted = [sid for sid in session_ids if sid not in found]
+        return [json.loads(row["payload"]) for row in written], deleted, last
+
+    def change_cursor(self) -> Hashable:
+        with self._lock:
+            return self._conn.execute("SELECT MAX(seq) FROM session_changes").fetchone()[0] or 0
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def list_summaries(
+        self,
+        limit: int = 10,
+        status: Optional[str] = None,
+        domain: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        if domain is not None:
+            sql = (
+                f"SELECT {_SUMMARY_COLUMNS_S} "
+                "FROM session_domains d JOIN sessions s ON s.session_id = d.session_id "
+                "WHERE d.domain = ?"
+            )
+            params: List[Any] = [domain]
+            if status is not None:
+                sql += " AND s.status = ?"
+                params.append(status)
+            sql += " ORDER BY d.sort_key DESC LIMIT ?"
+        elif status is not None:
+            sql = (
+                f"SELECT {_SUMMARY_COLUMNS} FROM sessions "
+                "WHERE status = ? ORDER BY sort_key DESC LIMIT ?"
+            )
+            params = [status]
+        else:
+            sql = f"SELECT {_SUMMARY_COLUMNS} FROM sessions ORDER BY sort_key DESC LIMIT ?"
+            params = []
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._row_to_summary(row) for row in rows]
+
+    @staticmethod
+    def _row_to_summary(row: sqlite3.Row) -> Dict[str, Any]:
+        summary = dict(row)
+        summary["domains"] = json.loads(summary["domains"])
+        return summary
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        last_id = ""
+        while True:
+            # Keyset pagination keeps the connection lock free between pages
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT session_id, payload FROM sessions WHERE session_id > ? "
+                    "ORDER BY session_id LIMIT 500", (last_id,)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row["payload"])
+            last_id = rows[-1]["session_id"]
+
+    def oldest(
+        self,
+        status: str,
+        limit: int,
+        after: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, sort_key, started_at, LENGTH(payload) AS size "
+                "FROM sessions WHERE status = ? AND sort_key > ? "
+                "ORDER BY sort_key LIMIT ?", (status, after or "", limit)
+            ).fetchall()
+        page = [
+            {"session_id": row["session_id"], "started_at": row["started_at"], "size": row["size"]}
+            for row in rows
+        ]
+        cursor = rows[-1]["sort_key"] if len(rows) == limit else None
+        return page, cursor
+
+    def delete_many(self, session_ids: Iterable[str]) -> int:
+        session_ids = [(sid,) for sid in session_ids]
+        if not session_ids:
+            return 0
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = conn.total_changes
+                conn.executemany("DELETE FROM sessions WHERE session_id = ?", session_ids)
+                deleted = conn.total_changes - before
+                for table in ("session_domains", "tasks", "task_docs"):
+                    conn.executemany(f"DELETE FROM {table} WHERE session_id = ?", session_ids)
+                if deleted:
+                    self._log_changes(conn, [sid for (sid,) in session_ids])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return deleted
+
+    #: Free pages released per compaction slice
+    VACUUM_PAGES = 128
+
+    def compact_step(self, budget: float) -> bool:
+        deadline = time.monotonic() + budget
+        with self._lock:
+            if self._conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return False  # database created without incremental vacuum
+            while self._conn.execute("PRAGMA freelist_count").fetchone()[0]:
+                self._conn.execute(f"PRAGMA incremental_vacuum({self.VACUUM_PAGES})")
+                if time.monotonic() >= deadline:
+                    return True
+        return False
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# =============================================================================
+# BOUNDED HOT CACHE (LRU)
+# =============================================================================
+
+class LRUSessionCache:
+    """
+    In-memory LRU cache of live session objects bounded by count and bytes.
+
+    ``sizeof`` estimates the footprint of an object; it is re-evaluated by
+    ``touch`` whenever the object changes. Evicted objects are simply
+    dropped from memory - callers must make sure they are persisted (or
+    queued for persistence) so they can be faulted back in from the store.
+
+    Pinned keys (``pin``/``unpin``, counted) are never evicted: an object
+    still held by someone must stay the one copy served from the cache.
+    """
+
+    def __init__(self, max_count: int, max_bytes: int, sizeof: Callable[[Any], int]):
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, List[Any]]" = OrderedDict()  # key -> [obj, size]
+        self._pins: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __setitem__(self, key: str, obj: Any) -> None:
+        with self._lock:
+            self._discard(key)
+            size = self.sizeof(obj)
+            self._entries[key] = [obj, size]
+            self.total_bytes += size
+            self._evict()
+
+    def touch(self, key: str) -> None:
+        """Mark ``key`` as most recently used and refresh its size estimate."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            size = self.sizeof(entry[0])
+            self.total_bytes += size - entry[1]
+            entry[1] = size
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._discard(key)
+            return entry[0] if entry else default
+
+    def pin(self, key: str, obj: Any) -> None:
+        """Keep ``key`` (cached as ``obj`` if absent) until a matching ``unpin``."""
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+            if key not in self._entries:
+                self[key] = obj
+
+    def unpin(self, key: str) -> None:
+        with self._lock:
+            count = self._pins.pop(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            self._evict()
+
+    def is_pinned(self, key: str) -> bool:
+        return key in self._pins
+
+    def values(self) -> List[Any]:
+        with self._lock:
+            return [entry[0] for entry in self._entries.values()]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, key: str) -> Optional[List[Any]]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+        return entry
+
+    def _evict(self) -> None:
+        # Always keep the most recent entry, even if it alone exceeds max_bytes
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_count or self.total_bytes > self.max_bytes
+        ):
+            # Pinned entries are skipped (few: one per running session)
+            victim = next((key for key in self._entries if key not in self._pins), None)
+            if victim is None or victim == next(reversed(self._entries)):
+                break
+            self._discard(victim)
+            self.evictions += 1
+
+
+# =============================================================================
+# COALESCING PERSISTENCE WRITER
+# =============================================================================
+
+class CoalescingWriter:
+    """
+    Background writer that batches session changes off the event loop.
+
+    ``mark_dirty`` only records the changed object in a dirty map; a daemon
+    thread waits ``window`` seconds after the first change so that bursts
+    of mutations collapse into a single ``put_many`` call. Objects are
+    serialized with ``serialize`` at write time, so the latest state wins.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        serialize: Callable[[Any], Dict[str, Any]],
+        window: float = 0.02,
+    ):
+        self.store = store
+        self.serialize = serialize
+        self.window = window
+        self.writes = 0  # number of store writes performed
+        self._dirty: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="session-writer", daemon=True
+        )
+        self._thread.start()
+
+    def mark_dirty(self, key: str, obj: Any) -> None:
+        """Schedule ``obj`` to be written; never blocks on disk I/O."""
+        with self._lock:
+            self._dirty[key] = obj
+        self._wakeup.set()
+
+    def pending(self) -> List[Any]:
+        """Objects marked dirty but not written yet."""
+        with self._lock:
+            return list(self._dirty.values())
+
+    @property
+    def pending_count(self) -> int:
+        """Number of objects waiting to be written."""
+        return len(self._dirty)
+
+    def get_pending(self, key: str) -> Optional[Any]:
+        """Return the pending object for ``key``, if any."""
+        with self._lock:
+            return self._dirty.get(key)
+
+    def flush(self) -> None:
+        """Write every pending change now, from the calling thread."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._dirty = self._dirty, {}
+            if not batch:
+                return
+            try:
+                self.store.put_many([self.serialize(obj) for obj in batch.values()])
+                self.writes += 1
+            except Exception as e:
+                logger.error("Could not save sessions: %s", e)
+                with self._lock:
+                    # Keep newer changes made while we were writing
+                    for key, obj in batch.items():
+                        self._dirty.setdefault(key, obj)
+
+    def close(self) -> None:
+        """Flush pending changes and stop the background thread."""
+        self._closing.set()
+        self._wakeup.set()
+        self._thread.join(timeout=5.0)
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._closing.is_set():
+            self._wakeup.wait()
+            # Coalescing window: let the burst of mutations settle
+            # (cut short on close, which flushes right after)
+            if self._closing.wait(self.window):
+                break
+            self._wakeup.clear()
+            self.flush()
+
+
+def create_session_store(
+    backend: str,
+    log_path: str,
+    index_path: str,
+    sqlite_path: str,
+    legacy_path: Optional[str] = None,
+) -> SessionStore:
+    """
+    Instantiate the configured backend, falling back to JSON-lines on error.
+    A new SQLite database starts with the sessions of the JSON-lines files.
+    """
+    if backend == "sqlite":
+
+        def jsonl_records() -> Iterator[Dict[str, Any]]:
+            if not (os.path.exists(log_path) or (legacy_path and os.path.exists(legacy_path))):
+                return
+            previous = JsonlSessionStore(log_path, index_path, legacy_path=legacy_path)
+            try:
+                yield from previous.iter_records()
+            finally:
+                previous.close()
+
+        try:
+            return SqliteSessionStore(sqlite_path, migrate_from=jsonl_records)
+        except sqlite3.Error as e:
+            logger.error("Could not open SQLite session store, using JSON: %s", e)
+    elif backend != "json":
+        logger.warning("Unknown session backend '%s', using JSON", backend)
+    return JsonlSessionStore(log_path, index_path, legacy_path=legacy_path)
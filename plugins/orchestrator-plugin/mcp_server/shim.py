@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+STDIO SHIM
+==========
+
+Entry point of the ``orchestrator-mcp`` console script.
+
+Instead of starting a full server per editor session, the shim attaches
+to a shared background daemon (``server.py --transport daemon``) over an
+owner-only Unix socket, starting it on first use, and copies bytes
+between its stdio and the socket. MCP messages are forwarded as-is
+(newline-delimited JSON-RPC, exactly as on stdio) and never parsed here,
+so the shim only needs the standard library and attaches in a few
+milliseconds while the daemon keeps its routing index, caches and
+session store warm for every client.
+
+The daemon exits after ``ORCHESTRATOR_DAEMON_IDLE_EXIT`` seconds without
+clients. With arguments, with ``ORCHESTRATOR_DAEMON=0``, with another
+``ORCHESTRATOR_TRANSPORT`` or on platforms without Unix sockets the
+server runs in-process as before.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+import zlib
+from typing import Optional
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+CHUNK_SIZE = 64 * 1024
+# How long a shim waits for a freshly started daemon to accept connections
+START_TIMEOUT = float(os.environ.get("ORCHESTRATOR_DAEMON_START_TIMEOUT", "15"))
+
+
+def default_socket_path() -> str:
+    """
+    Per-user daemon socket. Installs and environments with different
+    ``ORCHESTRATOR_*`` settings get their own daemon.
+    """
+    configured = os.environ.get("ORCHESTRATOR_DAEMON_SOCKET")
+    if configured:
+        return configured
+    settings = sorted((k, v) for k, v in os.environ.items() if k.startswith("ORCHESTRATOR_"))
+    digest = zlib.crc32(repr((SERVER_SCRIPT, settings)).encode("utf-8"))
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(base, f"orchestrator-mcp-{os.getuid()}-{digest:08x}.sock")
+
+
+def shim_enabled() -> bool:
+    return (
+        os.name == "posix"
+        and hasattr(socket, "AF_UNIX")
+        and os.environ.get("ORCHESTRATOR_DAEMON", "1") != "0"
+        and os.environ.get("ORCHESTRATOR_TRANSPORT", "stdio").lower() == "stdio"
+    )
+
+
+def connect(path: str) -> Optional[socket.socket]:
+    """Connected socket to a live daemon, or None"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return sock
+    except OSError:
+        sock.close()
+        return None
+
+
+def start_daemon(path: str) -> None:
+    """Spawn a detached daemon; its log goes next to the socket"""
+    import subprocess
+
+    log_fd = os.open(path + ".log", os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    try:
+        subprocess.Popen(
+            [sys.executable, SERVER_SCRIPT, "--transport", "daemon", "--socket", path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=log_fd,
+            cwd=os.path.dirname(SERVER_SCRIPT),
+            start_new_session=True,  # outlives this editor session
+            close_fds=True
+        )
+    finally:
+        os.close(log_fd)
+
+
+def attach(path: str, timeout: float = START_TIMEOUT) -> Optional[socket.socket]:
+    """
+    Connect to the daemon at ``path``, starting it if nobody answers.
+    Concurrent shims may all spawn one; the daemon's lock file lets
+    only the first of them serve.
+    """
+    sock = connect(path)
+    if sock is not None:
+        return sock
+    start_daemon(path)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.01)
+        sock = connect(path)
+        if sock is not None:
+            return sock
+    return None
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def forward(sock: socket.socket, stdin_fd: int = 0, stdout_fd: int = 1) -> None:
+    """
+    Copy stdin to the socket and the socket to stdout until the daemon
+    closes the connection. EOF on stdin is passed on as a half-close, so
+    the daemon finishes the session and then hangs up.
+    """
+    def upstream() -> None:
+        try:
+            while True:
+                data = os.read(stdin_fd, CHUNK_SIZE)
+                if not data:
+                    break
+                sock.sendall(data)
+        except OSError:
+            pass
+        finally:
+            try:
+                sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+    threading.Thread(target=upstream, name="orchestrator-shim", daemon=True).start()
+    try:
+        while True:
+            data = sock.recv(CHUNK_SIZE)
+            if not data:
+                break
+            _write_all(stdout_fd, data)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+def run_in_process() -> None:
+    sys.path.insert(0, os.path.dirname(SERVER_SCRIPT))
+    import server
+
+    server.main()
+
+
+def main() -> None:
+    """Console script: attach to the shared daemon, or serve in-process"""
+    # Explicit server options (--transport http, ...) are for the full server
+    if len(sys.argv) > 1 or not shim_enabled():
+        run_in_process()
+        return
+    sock = attach(default_socket_path())
+    if sock is None:
+        sys.stderr.write("orchestrator-mcp: daemon did not start, serving in-process\n")
+        run_in_process()
+        return
+    forward(sock)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+TASK EVENTS
+===========
+
+Single stream of task lifecycle events reported by agents through the
+``orchestrator_report`` tool, plus the built-in consumers:
+
+- DurationEstimator: learns per-expert task durations for new plans
+- TaskThroughput: per-expert event counts and durations (metrics export)
+- CircuitBreakerFeed: forwards events to the agents' MetricTracker
+  (circuit-breaker.json) in batches, off the event loop
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import logging
+import os
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("orchestrator-mcp")
+
+# Event kinds
+TASK_STARTED = "started"
+TASK_COMPLETED = "completed"
+TASK_FAILED = "failed"
+TASK_CANCELLED = "cancelled"
+
+
+@dataclass
+class TaskEvent:
+    """One task lifecycle transition"""
+    session_id: str
+    task_id: str
+    kind: str
+    agent_file: str
+    model: str
+    timestamp: str                      # ISO time of the transition
+    started_at: Optional[str] = None    # ISO start time, for finish events
+    duration_seconds: float = 0.0
+    tokens_used: int = 0
+    error: Optional[str] = None
+
+
+class TaskEventBus:
+    """
+    Synchronous publish/subscribe hub for task events.
+
+    Listeners run in the publisher's thread and must be cheap; anything
+    slow (disk, network) belongs on a queue, as in CircuitBreakerFeed.
+    A failing listener is logged and never affects the others.
+    """
+
+    def __init__(self) -> None:
+        self._listeners: List[Callable[[TaskEvent], None]] = []
+
+    def subscribe(self, listener: Callable[[TaskEvent], None]) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[TaskEvent], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def publish(self, event: TaskEvent) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Task event listener failed on %s %s", event.kind, event.task_id)
+
+
+class DurationEstimator:
+    """
+    Exponentially weighted moving average of observed task durations,
+    per expert file, in minutes (the unit of AgentTask.estimated_time).
+    """
+
+    def __init__(self, alpha: float = 0.3) -> None:
+        self.alpha = alpha
+        self._minutes: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: TaskEvent) -> None:
+        if event.kind != TASK_COMPLETED or event.duration_seconds <= 0:
+            return
+        minutes = event.duration_seconds / 60.0
+        with self._lock:
+            previous = self._minutes.get(event.agent_file)
+            if previous is None:
+                self._minutes[event.agent_file] = minutes
+            else:
+                self._minutes[event.agent_file] = previous + self.alpha * (minutes - previous)
+            self._samples[event.agent_file] = self._samples.get(event.agent_file, 0) + 1
+
+    def estimate(self, agent_file: str, default: float) -> float:
+        """Learned duration for an expert, or ``default`` if never observed"""
+        minutes = self._minutes.get(agent_file)
+        return default if minutes is None else round(minutes, 1)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                agent_file: {"minutes": round(minutes, 2), "samples": self._samples[agent_file]}
+                for agent_file, minutes in self._minutes.items()
+            }
+
+
+class TaskThroughput:
+    """Running totals per (expert, event kind), plus finished-task durations per expert"""
+
+    def __init__(self) -> None:
+        self._counts: Dict[tuple, int] = {}
+        self._durations: Dict[str, List[float]] = {}  # expert -> [sum seconds, count]
+        self._lock = threading.Lock()
+
+    def __call__(self, event: TaskEvent) -> None:
+        key = (event.agent_file, event.kind)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            if event.kind in (TASK_COMPLETED, TASK_FAILED) and event.duration_seconds > 0:
+                totals = self._durations.setdefault(event.agent_file, [0.0, 0])
+                totals[0] += event.duration_seconds
+                totals[1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "events": [
+                    {"expert": expert, "kind": kind, "count": count}
+                    for (expert, kind), count in self._counts.items()
+                ],
+                "durations": {
+                    expert: {"sum_seconds": round(total, 3), "count": count}
+                    for expert, (total, count) in self._durations.items()
+                },
+            }
+
+
+class CircuitBreakerFeed:
+    """
+    Forwards task events to a MetricTracker from a background thread.
+
+    MetricTracker rewrites circuit-breaker.json on every call, so events
+    are drained in batches and applied inside ``tracker.batch()``: one
+    file write per batch instead of one per event.
+    """
+
+    def __init__(self, tracker: Any, window: float = 0.5) -> None:
+        self.tracker = tracker
+        self.window = window
+        self.batches = 0
+        self._queue: "queue.Queue[Optional[TaskEvent]]" = queue.Queue()
+        self._unapplied = 0
+        self._cond = threading.Condition()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="circuit-breaker-feed", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, event: TaskEvent) -> None:
+        with self._cond:
+            self._unapplied += 1
+        self._queue.put(event)
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            # Let a burst of reports accumulate into one batch
+            if self.window:
+                self._closing.wait(self.window)
+            events = [event]
+            stop = False
+            while True:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    stop = True
+                    break
+                events.append(more)
+            try:
+                self._apply(events)
+            except Exception:
+                logger.exception("Failed to feed %s task events to the circuit breaker", len(events))
+            with self._cond:
+                self._unapplied -= len(events)
+                self._cond.notify_all()
+            if stop:
+                return
+
+    def _apply(self, events: List[TaskEvent]) -> None:
+        tracker = self.tracker
+        with tracker.batch():
+            for event in events:
+                if tracker.get_agent(event.agent_file) is None:
+                    # Registration marks the agent healthy for the breaker
+                    tracker.register_agent(os.path.splitext(os.path.basename(event.agent_file))[0],
+                                           event.agent_file)
+                start = event.started_at or event.timestamp
+                if event.kind == TASK_STARTED:
+                    tracker.record_task_start(event.agent_file, event.task_id, event.model)
+                elif event.kind == TASK_COMPLETED:
+                    tracker.record_task_complete(
+                        event.agent_file, start, event.tokens_used, event.model, event.task_id
+                    )
+                elif event.kind == TASK_FAILED:
+                    tracker.record_task_failure(
+                        event.agent_file, start, event.error, event.model, event.task_id
+                    )
+                elif event.kind == TASK_CANCELLED:
+                    tracker.record_task_cancelled(
+                        event.agent_file, start, event.error, event.task_id
+                    )
+        self.batches += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event has been applied"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._unapplied == 0, timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Apply what is queued and stop the feed thread"""
+        self._closing.set()
+        self._queue.put(None)
+        self._thread.join(timeout)
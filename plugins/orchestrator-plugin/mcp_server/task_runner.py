@@ -0,0 +1,400 @@
+"""
+TASK RUNNER
+===========
+
+Opt-in execution engine behind ``orchestrator_execute(run=true)``.
+
+Without it the server only prints the plan and the client launches the
+agents. With a command template configured (``ORCHESTRATOR_EXEC_COMMAND``)
+the runner launches every plan task as a subprocess on its own event
+loop thread:
+
+- a task starts once the tasks it depends on have finished, so the
+  documenter still runs last (RULE #5)
+- at most ``parallel`` tasks of a session run at once (asyncio semaphore)
+- stdout and stderr of each task go straight to ``<log_dir>/<session>/<task>.log``
+- start, exit code and log path are recorded on the session through
+  ``OrchestratorEngine.report_task``, like agent reports
+
+The template is split like a shell command line and each argument is
+filled with the task's fields (see COMMAND_FIELDS), so descriptions never
+go through a shell.
+
+``cancel`` stops a run: tasks not yet released are dropped, every task
+process (its whole process group on POSIX) gets SIGTERM, then SIGKILL
+after the grace period, and the documenter is launched to finalize the
+partial results. The time to quiescence is measured.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import asyncio
+import logging
+import os
+import shlex
+import signal
+import string
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("orchestrator-mcp")
+
+# Placeholders available in the command template
+COMMAND_FIELDS = (
+    "session_id", "task_id", "expert", "model", "priority",
+    "description", "request", "log_file"
+)
+
+# Exit status polling: starts fast for short tasks, backs off for long ones
+POLL_MIN = 0.005
+POLL_MAX = 0.1
+
+# Description given to the documenter of a cancelled run
+FINALIZE_DESCRIPTION = (
+    "[PARTIAL] Session cancelled: finalize documentation of the finished tasks "
+    "({finished}); do not start new work"
+)
+
+
+def parse_command_template(template: str) -> List[str]:
+    """Split a command template into arguments and check its placeholders"""
+    args = shlex.split(template)
+    if not args:
+        raise ValueError("Empty command template")
+    for arg in args:
+        for _, field, _, _ in string.Formatter().parse(arg):
+            if field is not None and field not in COMMAND_FIELDS:
+                raise ValueError(
+                    f"Unknown placeholder '{{{field}}}' in command template "
+                    f"(available: {', '.join(COMMAND_FIELDS)})"
+                )
+    return args
+
+
+def render_command(args: List[str], fields: Dict[str, str]) -> List[str]:
+    """Fill each template argument; substituted values are never split or re-parsed"""
+    return [arg.format(**fields) for arg in args]
+
+
+class PopenSpawner:
+    """
+    Stand-in for ProcessManager where it is unavailable (it needs Windows
+    job objects): same ``spawn`` signature, plain subprocess.Popen.
+    """
+
+    def spawn(self, command: List[str], **kwargs: Any) -> subprocess.Popen:
+        return subprocess.Popen(command, **kwargs)
+
+
+def stop_process(proc: subprocess.Popen, force: bool = False) -> None:
+    """
+    SIGTERM (or SIGKILL with ``force``) to the task's process group, so
+    helpers started by the agent stop too. Windows has no graceful
+    signal for console-less children: terminate() there.
+    """
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL if force else signal.SIGTERM)
+        elif proc.poll() is None:
+            proc.kill() if force else proc.terminate()
+    except (ProcessLookupError, PermissionError, OSError):
+        pass  # already gone
+
+
+class SessionRun:
+    """Processes and coroutine of one session being executed"""
+
+    def __init__(self, session_id: str, parallel: int, log_dir: str,
+                 model_override: Optional[str] = None) -> None:
+        self.session_id = session_id
+        self.parallel = parallel
+        self.log_dir = log_dir
+        self.model_override = model_override
+        self.processes: Dict[str, subprocess.Popen] = {}
+        # Tasks waiting for their dependencies or a slot (the ready queue)
+        self.waiting: Dict[str, asyncio.Task] = {}
+        self.cancelled = False
+        self.future: Optional[Any] = None  # concurrent.futures.Future of the run
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+class TaskRunner:
+    """Runs plan tasks as subprocesses and records their results on the session"""
+
+    def __init__(
+        self,
+        engine: Any,
+        command_template: str,
+        log_dir: str,
+        spawner: Optional[Any] = None,
+        env: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.engine = engine
+        self.command = parse_command_template(command_template)
+        self.log_dir = log_dir
+        self.spawner = spawner or PopenSpawner()
+        self.env = env
+        self.runs: Dict[str, SessionRun] = {}
+        self.spawned = 0
+        self.active = 0  # runs not finished yet
+        self.cancellations = 0
+        self.last_quiescence_ms: Optional[float] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # =========================================================================
+    # EVENT LOOP THREAD
+    # =========================================================================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="orchestrator-exec", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop every run, terminate its processes and stop the loop thread"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            runs = list(self.runs.values())
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), loop).result(timeout)
+        except Exception as e:
+            logger.warning("Execution engine shutdown: %s", e)
+        for run in runs:
+            for proc in list(run.processes.values()):
+                stop_process(proc)
+        for run in runs:
+            for proc in list(run.processes.values()):
+                try:
+                    proc.wait(timeout)
+                except subprocess.TimeoutExpired:
+                    stop_process(proc, force=True)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
+
+    @staticmethod
+    async def _cancel_all() -> None:
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # =========================================================================
+    # RUNS
+    # =========================================================================
+
+    def start(self, session: Any, parallel: int, model_override: Optional[str] = None) -> SessionRun:
+        """Launch the session's plan in the background (thread-safe)"""
+        session_id = session.session_id
+        with self._lock:
+            current = self.runs.get(session_id)
+            if current is not None and not current.done:
+                raise ValueError(f"Session {session_id} is already running")
+            run = self.runs[session_id] = SessionRun(
+                session_id, max(1, int(parallel)), os.path.join(self.log_dir, session_id),
+                model_override
+            )
+        os.makedirs(run.log_dir, exist_ok=True)
+        # The run holds the session object: keep it the copy the engine serves
+        self.engine.pin_session(session)
+        run.future = asyncio.run_coroutine_threadsafe(
+            self._run_session(run, session), self._ensure_loop()
+        )
+        run.future.add_done_callback(lambda _: self.engine.unpin_session(session_id))
+        return run
+
+    def cancel(self, session_id: str, grace: float = 5.0) -> Optional[Dict[str, Any]]:
+        """
+        Stop the session's run and wait until none of its processes is left
+        (thread-safe). Returns what was stopped and the cancel-to-quiescence
+        latency, or None when the session was never run here.
+        """
+        run = self.get_run(session_id)
+        loop = self._loop
+        if run is None or loop is None:
+            return None
+        return asyncio.run_coroutine_threadsafe(self._cancel_run(run, grace), loop).result()
+
+    def get_run(self, session_id: str) -> Optional[SessionRun]:
+        with self._lock:
+            return self.runs.get(session_id)
+
+    def wait(self, session_id: str, timeout: Optional[float] = None) -> None:
+        """Block until the session's run is over (for tests and headless callers)"""
+        run = self.get_run(session_id)
+        if run is not None and run.future is not None:
+            run.future.result(timeout)
+
+    async def _run_session(self, run: SessionRun, session: Any) -> None:
+        semaphore = asyncio.Semaphore(run.parallel)
+        tasks = session.plan.tasks if session.plan else []
+        finished = {task.id: asyncio.Event() for task in tasks}
+
+        async def run_task(task: Any) -> None:
+            try:
+                for dependency in task.dependencies:
+                    if dependency in finished:
+                        await finished[dependency].wait()
+                async with semaphore:
+                    if run.cancelled:
+                        return
+                    del run.waiting[task.id]
+                    await self._run_task(run, session, task)
+            finally:
+                finished[task.id].set()
+
+        logger.info("Executing session %s: %s tasks, %s parallel", run.session_id, len(tasks), run.parallel)
+        self.active += 1
+        try:
+            for task in tasks:
+                run.waiting[task.id] = asyncio.ensure_future(run_task(task))
+            await asyncio.gather(*run.waiting.values(), return_exceptions=True)
+        finally:
+            self.active -= 1
+        logger.info("Execution of session %s finished", run.session_id)
+
+    async def _cancel_run(self, run: SessionRun, grace: float) -> Dict[str, Any]:
+        start = time.perf_counter()
+        run.cancelled = True
+        self.cancellations += 1
+
+        # Unreleased tasks never start
+        dropped = sorted(run.waiting)
+        for waiter in list(run.waiting.values()):
+            waiter.cancel()
+        run.waiting.clear()
+
+        # Graceful stop first, kill whatever outlives the grace period
+        live = [proc for proc in run.processes.values() if proc.poll() is None]
+        for proc in live:
+            stop_process(proc)
+        deadline = start + grace
+        while any(proc.poll() is None for proc in live) and time.perf_counter() < deadline:
+            await asyncio.sleep(POLL_MIN)
+        killed = [proc for proc in live if proc.poll() is None]
+        for proc in killed:
+            stop_process(proc, force=True)
+        while any(proc.poll() is None for proc in killed):
+            await asyncio.sleep(POLL_MIN)
+        quiescence_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.last_quiescence_ms = quiescence_ms
+        logger.info(
+            "Cancelled session %s: %s processes stopped (%s killed), %s tasks dropped, quiescent in %s ms",
+            run.session_id, len(live), len(killed), len(dropped), quiescence_ms
+        )
+
+        return {
+            "terminated": len(live) - len(killed),
+            "killed": len(killed),
+            "dropped": dropped,
+            "quiescence_ms": quiescence_ms,
+            "documenter": self._finalize(run)
+        }
+
+    def _finalize(self, run: SessionRun) -> Optional[str]:
+        """Launch the documenter on the partial results, unless it already ran"""
+        session = self.engine.get_session(run.session_id)
+        tasks = session.plan.tasks if session is not None and session.plan else []
+        documenter = next((t for t in reversed(tasks) if "documenter" in t.agent_expert_file), None)
+        if documenter is None or documenter.id in run.processes:
+            return None
+        finished = [
+            r["task_id"] for r in session.results
+            if r["status"] in ("completed", "failed") and r["task_id"] != documenter.id
+        ]
+        description = FINALIZE_DESCRIPTION.format(finished=", ".join(finished) or "none")
+        command, log_file = self._command(run, session, documenter, description)
+        try:
+            proc = self._spawn(run, documenter.id, command, log_file)
+        except Exception as e:
+            logger.warning("Failed to launch the documenter of %s: %s", run.session_id, e)
+            return None
+        asyncio.ensure_future(self._reap(run.session_id, proc))
+        return documenter.id
+
+    @staticmethod
+    async def _wait_exit(proc: subprocess.Popen) -> int:
+        delay = POLL_MIN
+        while proc.poll() is None:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, POLL_MAX)
+        return proc.returncode
+
+    async def _reap(self, session_id: str, proc: subprocess.Popen) -> None:
+        code = await self._wait_exit(proc)
+        logger.info("Documenter of cancelled session %s exited with code %s", session_id, code)
+
+    def _report(self, session_id: str, task_id: str, event: str, **kwargs: Any) -> bool:
+        """Record a task transition; False once the session is cancelled or gone"""
+        session = self.engine.get_session(session_id)
+        if session is None:
+            return False
+        try:
+            self.engine.report_task(session, task_id, event, **kwargs)
+        except ValueError as e:
+            logger.info("Execution of %s/%s stopped: %s", session_id, task_id, e)
+            return False
+        return True
+
+    def _command(self, run: SessionRun, session: Any, task: Any, description: str) -> Tuple[List[str], str]:
+        log_file = os.path.join(run.log_dir, f"{task.id}.log")
+        override = run.model_override
+        command = render_command(self.command, {
+            "session_id": run.session_id,
+            "task_id": task.id,
+            "expert": task.agent_expert_file,
+            "model": override if override and override != "auto" else task.model,
+            "priority": task.priority,
+            "description": description,
+            "request": session.user_request,
+            "log_file": log_file
+        })
+        return command, log_file
+
+    def _spawn(self, run: SessionRun, task_id: str, command: List[str], log_file: str) -> subprocess.Popen:
+        with open(log_file, "ab") as log:
+            proc = self.spawner.spawn(
+                command, stdin=subprocess.DEVNULL, stdout=log,
+                stderr=subprocess.STDOUT, env=self.env,
+                # Own process group: cancel reaches the agent's children too
+                start_new_session=os.name == "posix"
+            )
+        run.processes[task_id] = proc
+        self.spawned += 1
+        return proc
+
+    async def _run_task(self, run: SessionRun, session: Any, task: Any) -> None:
+        command, log_file = self._command(run, session, task, task.description)
+        if not self._report(run.session_id, task.id, "start"):
+            return
+
+        try:
+            proc = self._spawn(run, task.id, command, log_file)
+        except Exception as e:
+            logger.warning("Failed to launch %s/%s: %s", run.session_id, task.id, e)
+            self._report(run.session_id, task.id, "fail", error=f"Launch failed: {e}")
+            return
+
+        if await self._wait_exit(proc) == 0:
+            self._report(run.session_id, task.id, "complete", result=f"Log: {log_file}")
+        else:
+            self._report(
+                run.session_id, task.id, "fail",
+                error=f"Exit code {proc.returncode}, log: {log_file}"
+            )
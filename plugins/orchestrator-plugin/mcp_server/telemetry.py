@@ -0,0 +1,112 @@
+"""
+TELEMETRY
+=========
+
+Cheap runtime measurements behind ``orchestrator_metrics`` and the
+``orchestrator://metrics`` resource:
+
+- LoopLagMonitor: event-loop responsiveness, sampled by a background task
+  that measures how late its own timer fires
+- process_stats: resident memory, garbage collector and thread counts
+- hit_rate: ratio helper for the cache counters kept by the caches themselves
+
+Nothing here scans sessions or other data: every figure comes from a
+counter that is maintained where the event happens, or from one small
+read of the process's own statistics.
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import asyncio
+import gc
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from tool_registry import LatencyHistogram
+
+# Upper bounds of the event-loop lag histogram buckets, in milliseconds
+LAG_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_STARTED = time.time()
+
+
+def hit_rate(hits: int, misses: int) -> Optional[float]:
+    """hits / lookups, or None before the first lookup"""
+    lookups = hits + misses
+    return round(hits / lookups, 4) if lookups else None
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: every ``interval`` seconds a timer is armed
+    and the delay between its due time and the moment it actually runs is
+    recorded. A blocked loop shows up as large lag.
+    """
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self.histogram = LatencyHistogram(LAG_BUCKETS_MS)
+        self.last_ms = 0.0
+        self.running = False
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        self.running = True
+        try:
+            while True:
+                due = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                self.last_ms = max(0.0, (loop.time() - due) * 1000.0)
+                self.histogram.record(self.last_ms)
+        finally:
+            self.running = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        histogram = self.histogram.snapshot()
+        return {
+            "running": self.running,
+            "interval_s": self.interval,
+            "samples": histogram["count"],
+            "last_ms": round(self.last_ms, 3),
+            "max_ms": histogram["max_ms"],
+            "p50_ms": histogram["p50_ms"],
+            "p99_ms": histogram["p99_ms"],
+        }
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux: /proc/self/statm; else peak RSS)"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def process_stats() -> Dict[str, Any]:
+    """Memory, garbage collector and thread figures of this process"""
+    stats = gc.get_stats()
+    return {
+        "pid": os.getpid(),
+        "uptime_s": round(time.time() - _STARTED, 1),
+        "rss_bytes": _rss_bytes(),
+        "threads": threading.active_count(),
+        "gc": {
+            "enabled": gc.isenabled(),
+            "pending": list(gc.get_count()),
+            "collections": [s["collections"] for s in stats],
+            "collected": [s["collected"] for s in stats],
+            "uncollectable": [s["uncollectable"] for s in stats],
+        },
+    }
@@ -0,0 +1,23 @@
+"""
+Shared test setup for the Orchestrator MCP server tests.
+
+The server module reads its data directory at import time, so the
+environment is redirected to a throwaway directory before importing it.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_SESSION_DATA_DIR = tempfile.mkdtemp(prefix="orchestrator-mcp-tests-")
+os.environ.setdefault("ORCHESTRATOR_DATA_DIR", _SESSION_DATA_DIR)
+# Keep the agents circuit breaker file out of the user's home directory
+os.environ.setdefault(
+    "ORCHESTRATOR_CIRCUIT_BREAKER_FILE", os.path.join(_SESSION_DATA_DIR, "circuit-breaker.json")
+)
+
+# Add server directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# Agents scripts (MetricTracker), which server.py adds on first use
+sys.path.insert(0, str(Path(__file__).parents[4] / "agents" / "scripts"))
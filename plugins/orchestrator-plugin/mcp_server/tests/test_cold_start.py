@@ -0,0 +1,62 @@
+"""
+Tests for the cold start: importing server.py does no I/O and no global setup.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).parent.parent
+
+PROBE = """
+import json, logging, os, sys
+path_before = list(sys.path)
+import server
+print(json.dumps({
+    "sys_path_changed": sys.path != path_before,
+    "root_handlers": len(logging.getLogger().handlers),
+    "engine_opened": server.engine._opened,
+    "mappings_loaded": server._MAPPINGS_LOADED,
+    "data_dir_created": os.path.exists(server.DATA_DIR),
+    "modules": sorted(m for m in ("task_runner", "process_manager", "metric_tracker") if m in sys.modules),
+}))
+server.engine.generate_execution_plan("API REST con database")
+server.engine.close()
+print(json.dumps({"mappings_loaded": server._MAPPINGS_LOADED}))
+"""
+
+
+def test_import_defers_initialization(tmp_path):
+    data_dir = tmp_path / "data"
+    env = dict(
+        os.environ,
+        ORCHESTRATOR_DATA_DIR=str(data_dir),
+        ORCHESTRATOR_CIRCUIT_BREAKER="0",
+        PYTHONPATH=str(SERVER_DIR),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, cwd=str(tmp_path),
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    at_import, after_use = [json.loads(line) for line in result.stdout.splitlines()]
+    assert at_import == {
+        "sys_path_changed": False,
+        "root_handlers": 0,
+        "engine_opened": False,
+        "mappings_loaded": False,
+        "data_dir_created": False,
+        "modules": [],
+    }
+    # First use opens the store (creating the data directory) and loads the mappings
+    assert after_use == {"mappings_loaded": True}
+    assert (data_dir / "sessions.jsonl").exists()
+
+
+def test_every_tool_runs_off_the_event_loop():
+    import server
+
+    # Each tool can be the first to open the engine or load the mappings
+    assert [name for name, handler in server.tool_registry.handlers.items() if not handler.blocking] == []
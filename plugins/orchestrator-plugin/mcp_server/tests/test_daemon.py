@@ -0,0 +1,215 @@
+"""
+Tests for the shared daemon and the stdio shim in front of it.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import shim
+from daemon import DaemonAlreadyRunningError, DaemonServer
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets only")
+
+INITIALIZE = {
+    "jsonrpc": "2.0", "id": 1, "method": "initialize",
+    "params": {"protocolVersion": "2025-06-18", "capabilities": {},
+               "clientInfo": {"name": "test", "version": "1"}},
+}
+
+
+async def start(daemon):
+    task = asyncio.create_task(daemon.serve())
+    for _ in range(200):
+        if daemon.started or task.done():
+            break
+        await asyncio.sleep(0.01)
+    assert daemon.started
+    return task
+
+
+class Client:
+    """Speaks the stdio framing over the daemon socket, like a shim does"""
+
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.next_id = 1
+
+    @classmethod
+    async def connect(cls, path):
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def send(self, message):
+        self.writer.write((json.dumps(message) + "\n").encode("utf-8"))
+        await self.writer.drain()
+
+    async def request(self, method, params=None):
+        self.next_id += 1
+        await self.send({"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params or {}})
+        while True:
+            message = json.loads(await asyncio.wait_for(self.reader.readline(), 10))
+            if message.get("id") == self.next_id:
+                return message
+
+    async def initialize(self):
+        await self.send(INITIALIZE)
+        response = json.loads(await asyncio.wait_for(self.reader.readline(), 10))
+        await self.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        return response
+
+    async def call_text(self, name, arguments):
+        response = await self.request("tools/call", {"name": name, "arguments": arguments})
+        return response["result"]["content"][0]["text"]
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "d.sock")
+
+
+class TestDaemonServer:
+
+    async def test_sessions_share_one_warm_server(self, socket_path):
+        import server
+
+        daemon = DaemonServer(server.server, socket_path, idle_exit=0)
+        task = await start(daemon)
+        try:
+            a, b = await Client.connect(socket_path), await Client.connect(socket_path)
+            info = await a.initialize()
+            await b.initialize()
+            assert info["result"]["serverInfo"]["name"] == "orchestrator-mcp"
+
+            analysis = await a.call_text("orchestrator_analyze", {"request": "API REST con database"})
+            session_id = analysis.split("Session ID: ")[1].split()[0]
+            status = await b.call_text("orchestrator_status", {"session_id": session_id})
+            assert f"SESSION STATUS: {session_id}" in status
+            assert daemon.clients == 2
+
+            await a.close()
+            await b.close()
+            for _ in range(100):
+                if daemon.clients == 0:
+                    break
+                await asyncio.sleep(0.01)
+            assert (daemon.clients, daemon.sessions_served) == (0, 2)
+        finally:
+            daemon.stop()
+            await asyncio.wait_for(task, 5)
+        assert not os.path.exists(socket_path)
+
+    async def test_only_one_daemon_per_socket(self, socket_path):
+        import server
+
+        daemon = DaemonServer(server.server, socket_path, idle_exit=0)
+        task = await start(daemon)
+        try:
+            with pytest.raises(DaemonAlreadyRunningError):
+                await DaemonServer(server.server, socket_path).serve()
+            assert os.path.exists(socket_path)  # the loser left the live socket alone
+        finally:
+            daemon.stop()
+            await asyncio.wait_for(task, 5)
+
+    async def test_clients_beyond_the_limit_get_busy_errors(self, socket_path):
+        import server
+
+        daemon = DaemonServer(server.server, socket_path, max_clients=1, idle_exit=0)
+        task = await start(daemon)
+        try:
+            first = await Client.connect(socket_path)
+            await first.initialize()
+            second = await Client.connect(socket_path)
+            await second.send(INITIALIZE)
+            refused = json.loads(await asyncio.wait_for(second.reader.readline(), 5))
+            assert refused["id"] == 1
+            assert "busy" in refused["error"]["message"]
+            assert daemon.refused == 1
+            await first.close()
+        finally:
+            daemon.stop()
+            await asyncio.wait_for(task, 5)
+
+    async def test_exits_when_idle(self, socket_path):
+        daemon = DaemonServer(object(), socket_path, idle_exit=0.05)
+        await asyncio.wait_for(daemon.serve(), 5)
+        assert not os.path.exists(socket_path)
+
+
+class TestShim:
+
+    def test_forward_copies_bytes_verbatim_both_ways(self):
+        shim_end, daemon_end = socket.socketpair()
+        stdin_r, stdin_w = os.pipe()
+        stdout_r, stdout_w = os.pipe()
+        payload = b'{"jsonrpc": "2.0", "id": 1, "method": "ping"}\n' * 1000
+
+        def daemon_side():
+            received = b""
+            while chunk := daemon_end.recv(65536):  # until the shim half-closes
+                received += chunk
+            daemon_end.sendall(received[::-1])
+            daemon_end.close()
+
+        echo = threading.Thread(target=daemon_side)
+        echo.start()
+        pump = threading.Thread(target=shim.forward, args=(shim_end, stdin_r, stdout_w))
+        pump.start()
+        os.write(stdin_w, payload)
+        os.close(stdin_w)
+        pump.join(5)
+        echo.join(5)
+        os.close(stdout_w)
+
+        output = b""
+        while chunk := os.read(stdout_r, 65536):
+            output += chunk
+        os.close(stdout_r)
+        os.close(stdin_r)
+        assert output == payload[::-1]
+
+    def test_attach_reaches_a_running_daemon(self, socket_path, monkeypatch):
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(socket_path)
+        listener.listen()
+        monkeypatch.setattr(shim, "start_daemon", lambda path: pytest.fail("daemon restarted"))
+        try:
+            sock = shim.attach(socket_path, timeout=0.1)
+            assert sock is not None
+            sock.close()
+        finally:
+            listener.close()
+
+    def test_attach_gives_up_when_the_daemon_never_comes_up(self, socket_path, monkeypatch):
+        started = []
+        monkeypatch.setattr(shim, "start_daemon", started.append)
+        assert shim.attach(socket_path, timeout=0.05) is None
+        assert started == [socket_path]
+
+    def test_socket_path_depends_on_configuration(self, monkeypatch):
+        monkeypatch.delenv("ORCHESTRATOR_DAEMON_SOCKET", raising=False)
+        first = shim.default_socket_path()
+        assert first == shim.default_socket_path()
+        monkeypatch.setenv("ORCHESTRATOR_SESSION_BACKEND", "sqlite-other")
+        assert shim.default_socket_path() != first
+        monkeypatch.setenv("ORCHESTRATOR_DAEMON_SOCKET", "/tmp/explicit.sock")
+        assert shim.default_socket_path() == "/tmp/explicit.sock"
+
+    def test_server_options_run_in_process(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(shim, "run_in_process", lambda: calls.append("in-process"))
+        monkeypatch.setattr(shim, "attach", lambda path: pytest.fail("attached"))
+        monkeypatch.setattr("sys.argv", ["orchestrator-mcp", "--transport", "http"])
+        shim.main()
+        monkeypatch.setattr("sys.argv", ["orchestrator-mcp"])
+        monkeypatch.setenv("ORCHESTRATOR_DAEMON", "0")
+        shim.main()
+        assert calls == ["in-process", "in-process"]
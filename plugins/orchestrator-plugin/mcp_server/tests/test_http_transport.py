@@ -0,0 +1,108 @@
+"""
+Tests for the local streamable HTTP transport.
+"""
+
+import asyncio
+import os
+import stat
+
+import httpx
+import pytest
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+
+from http_transport import LocalHttpTransport
+
+
+async def start(transport):
+    task = asyncio.create_task(transport.serve())
+    for _ in range(200):
+        if transport.started or task.done():
+            break
+        await asyncio.sleep(0.01)
+    assert transport.started
+    return task
+
+
+async def stop(transport, task):
+    transport.stop()
+    await asyncio.wait_for(task, 5)
+
+
+async def call_text(session, name, arguments):
+    result = await session.call_tool(name, arguments)
+    return result.content[0].text
+
+
+@pytest.fixture
+async def http_server():
+    import server
+
+    transport = LocalHttpTransport(server.server, port=0, max_clients=2)
+    task = await start(transport)
+    yield transport
+    await stop(transport, task)
+
+
+class TestLocalHttpTransport:
+
+    def test_refuses_non_loopback_hosts(self):
+        with pytest.raises(ValueError):
+            LocalHttpTransport(object(), host="0.0.0.0")
+
+    async def test_clients_share_one_warm_server(self, http_server):
+        url = http_server.address
+
+        async with streamable_http_client(url) as (read_a, write_a, _), \
+                streamable_http_client(url) as (read_b, write_b, _):
+            async with ClientSession(read_a, write_a) as a, ClientSession(read_b, write_b) as b:
+                info = await a.initialize()
+                await b.initialize()
+                assert info.serverInfo.name == "orchestrator-mcp"
+                assert info.capabilities.resources.subscribe
+
+                analysis, agents = await asyncio.gather(
+                    call_text(a, "orchestrator_analyze", {"request": "API REST con database"}),
+                    call_text(b, "orchestrator_agents", {}),
+                )
+                session_id = analysis.split("Session ID: ")[1].split()[0]
+                # Session created through client A is visible to client B
+                status = await call_text(b, "orchestrator_status", {"session_id": session_id})
+
+        assert "AVAILABLE EXPERT AGENTS" in agents
+        assert f"SESSION STATUS: {session_id}" in status
+
+    async def test_client_limit(self, http_server):
+        url = http_server.address
+        headers = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+        initialize = {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {"protocolVersion": "2025-06-18", "capabilities": {},
+                       "clientInfo": {"name": "test", "version": "1"}},
+        }
+        async with httpx.AsyncClient(timeout=5) as client:
+            codes = []
+            for _ in range(3):
+                response = await client.post(url, json=initialize, headers=headers)
+                codes.append(response.status_code)
+        assert codes[:2] == [200, 200]
+        assert codes[2] >= 400
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="Unix sockets only")
+    async def test_unix_socket_is_owner_only(self, tmp_path):
+        import server
+
+        path = str(tmp_path / "orchestrator.sock")
+        transport = LocalHttpTransport(server.server, socket_path=path)
+        task = await start(transport)
+        try:
+            assert stat.S_IMODE(os.stat(path).st_mode) & 0o077 == 0
+            with pytest.raises(RuntimeError):
+                LocalHttpTransport(server.server, socket_path=path)._bind()
+
+            async with httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(uds=path)) as client:
+                response = await client.get("http://localhost/mcp", headers={"Accept": "text/event-stream"})
+            assert response.status_code == 400  # GET without a session id
+        finally:
+            await stop(transport, task)
+        assert not os.path.exists(path)
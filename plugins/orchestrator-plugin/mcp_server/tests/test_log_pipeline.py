@@ -0,0 +1,101 @@
+"""
+Tests for the queue-based logging pipeline.
+"""
+
+import json
+import logging
+import threading
+
+import pytest
+from metric_tracker import MetricTracker
+
+from log_pipeline import RepeatFilter, configure_logging, stop_logging
+
+
+def make_record(msg, *args, level=logging.WARNING):
+    return logging.LogRecord("orchestrator-mcp", level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def root_logger():
+    """Restores the root logger configuration changed by configure_logging"""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    stop_logging()
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+class TestRepeatFilter:
+
+    def test_repeats_beyond_the_burst_are_dropped_and_counted(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr("log_pipeline.time.monotonic", lambda: clock[0])
+        repeats = RepeatFilter(window=60, burst=3)
+
+        passed = [repeats.filter(make_record("Store write failed: %s", i)) for i in range(10)]
+        assert passed == [True] * 3 + [False] * 7
+        assert repeats.filter(make_record("Another message"))
+
+        clock[0] += 60
+        record = make_record("Store write failed: %s", "disk full")
+        assert repeats.filter(record)
+        assert record.getMessage() == "Store write failed: disk full (repeated 7 more times)"
+        assert repeats.suppressed_total == 7
+
+    def test_literal_percent_signs_survive_the_note(self, monkeypatch):
+        clock = [0.0]
+        monkeypatch.setattr("log_pipeline.time.monotonic", lambda: clock[0])
+        repeats = RepeatFilter(window=1, burst=1)
+        repeats.filter(make_record("Disk 100% full"))
+        repeats.filter(make_record("Disk 100% full"))
+        clock[0] += 1
+        record = make_record("Disk 100% full")
+        repeats.filter(record)
+        assert record.getMessage() == "Disk 100% full (repeated 1 more times)"
+
+
+class TestPipeline:
+
+    def test_json_lines_sink(self, root_logger, tmp_path):
+        path = tmp_path / "server.jsonl"
+        configure_logging("INFO", json_file=str(path))
+        logger = logging.getLogger("orchestrator-mcp")
+        logger.info("Session %s created", "S1")
+        logger.debug("Not written at INFO: %s", "S1")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Tool %s failed", "orchestrator_analyze")
+        stop_logging()
+
+        entries = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [e["message"] for e in entries] == ["Session S1 created", "Tool orchestrator_analyze failed"]
+        assert entries[0]["level"] == "INFO" and entries[0]["logger"] == "orchestrator-mcp"
+        assert "ValueError: boom" in entries[1]["exception"]
+
+    def test_records_are_written_by_the_listener_thread(self, root_logger, tmp_path):
+        writers = []
+
+        class Recorder(logging.Handler):
+            def emit(self, record):
+                writers.append(threading.current_thread().name)
+
+        listener = configure_logging("INFO")
+        listener.handlers = listener.handlers + (Recorder(),)
+        logging.getLogger("orchestrator-mcp").warning("queued")
+        stop_logging()
+        assert writers and "MainThread" not in writers
+
+    def test_metric_tracker_logs_circuit_changes(self, tmp_path, caplog):
+        tracker = MetricTracker(tmp_path / "circuit-breaker.json")
+        tracker.register_agent("coder", "core/coder.md")
+        with caplog.at_level(logging.INFO, logger="metric_tracker"):
+            for _ in range(5):
+                tracker.record_task_failure("core/coder.md", "2026-01-01T00:00:00", "boom")
+            tracker.reset_agent_failures("core/coder.md")
+        messages = [r.getMessage() for r in caplog.records if r.name == "metric_tracker"]
+        assert messages == ["Circuit open for core/coder.md after 5 failures",
+                            "Failures of core/coder.md reset, circuit closed"]
@@ -0,0 +1,104 @@
+"""
+Tests for the OpenMetrics exporter (file and localhost port).
+"""
+
+import asyncio
+import socket
+
+from metrics_exporter import (
+    CountHistogram,
+    LabelLimiter,
+    MetricFamily,
+    MetricsExporter,
+    render_openmetrics,
+)
+
+
+def sample_families():
+    calls = MetricFamily("demo_calls", "counter", "Calls")
+    calls.add(3, {"tool": "analyze"})
+    calls.add(2, {"tool": "analyze"})
+    latency = MetricFamily("demo_latency_seconds", "histogram", "Latency", "seconds")
+    latency.add_histogram([0.1, 1], [2, 1, 1], 3.5)
+    return [calls, latency]
+
+
+async def scrape(port, path="/metrics"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.decode().partition("\r\n\r\n")
+    return head, body
+
+
+class TestFormat:
+
+    def test_label_values_beyond_the_limit_become_other(self):
+        limit = LabelLimiter(max_values=2)
+        assert [limit("expert", v) for v in ("a", "b", "c", "a", "d")] == ["a", "b", "other", "a", "other"]
+        assert limit("model", "opus") == "opus"
+        assert limit.overflowed == {"expert": 2}
+
+    def test_render(self):
+        text = render_openmetrics(sample_families())
+        lines = text.splitlines()
+        assert lines[:3] == ["# TYPE demo_calls counter", "# HELP demo_calls Calls", 'demo_calls_total{tool="analyze"} 5']
+        assert "# UNIT demo_latency_seconds seconds" in lines
+        assert 'demo_latency_seconds_bucket{le="0.1"} 2' in lines
+        assert 'demo_latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert "demo_latency_seconds_count 4" in lines and "demo_latency_seconds_sum 3.5" in lines
+        assert text.endswith("# EOF\n")
+
+    def test_count_histogram(self):
+        sizes = CountHistogram((2, 5))
+        for value in (1, 2, 3, 9):
+            sizes.record(value)
+        assert sizes.snapshot() == ([2, 1, 1], 4, 15)
+
+
+class TestExporter:
+
+    async def test_file_is_rewritten_every_interval(self, tmp_path):
+        path = tmp_path / "metrics" / "orchestrator.prom"
+        exporter = MetricsExporter(sample_families, path=str(path), interval=0.01)
+        task = asyncio.create_task(exporter.serve())
+        try:
+            while exporter.writes < 2:
+                await asyncio.sleep(0.01)
+        finally:
+            task.cancel()
+        assert path.read_text().endswith("# EOF\n")
+        assert list(path.parent.iterdir()) == [path]
+
+    async def test_port_answers_scrapes(self):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        exporter = MetricsExporter(sample_families, port=port, interval=60)
+        task = asyncio.create_task(exporter.serve())
+        try:
+            while exporter.bound_port is None:
+                await asyncio.sleep(0.01)
+            head, body = await scrape(port)
+            assert head.startswith("HTTP/1.1 200 OK")
+            assert "application/openmetrics-text" in head
+            assert 'demo_calls_total{tool="analyze"} 5' in body
+            head, _ = await scrape(port, "/other")
+            assert head.startswith("HTTP/1.1 404")
+        finally:
+            task.cancel()
+        assert exporter.scrapes == 1
+
+    async def test_server_families(self):
+        import server
+
+        await server.handle_call_tool("orchestrator_analyze", {"request": "API REST database"})
+        text = render_openmetrics(server.collect_openmetrics())
+        assert "orchestrator_plan_tasks_bucket" in text
+        counts, plans, tasks = server.engine.plan_sizes.snapshot()
+        assert f"orchestrator_plans_total {plans}" in text
+        assert f"orchestrator_plan_tasks_sum {tasks}" in text
+        assert 'orchestrator_tool_calls_total{tool="orchestrator_analyze"}' in text
+        assert "# TYPE orchestrator_task_duration_seconds summary" in text
@@ -0,0 +1,115 @@
+"""
+Tests for the coalescing background session writer.
+"""
+
+import threading
+import time
+
+from session_store import CoalescingWriter, SessionStore
+
+
+class RecordingStore(SessionStore):
+    """In-memory store that records every put_many batch."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.records = {}
+        self.fail = fail
+        self.threads = set()
+
+    def put_many(self, records):
+        self.threads.add(threading.current_thread().name)
+        if self.fail:
+            raise OSError("disk full")
+        batch = list(records)
+        self.batches.append(batch)
+        for record in batch:
+            self.records[record["session_id"]] = record
+
+    def get(self, session_id):
+        return self.records.get(session_id)
+
+
+def serialize(obj):
+    return {"session_id": obj["id"], "value": obj["value"]}
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class TestCoalescingWriter:
+
+    def test_burst_of_mutations_produces_one_write(self):
+        store = RecordingStore()
+        writer = CoalescingWriter(store, serialize, window=0.05)
+        obj = {"id": "s1", "value": 0}
+
+        for i in range(100):
+            obj["value"] = i
+            writer.mark_dirty("s1", obj)
+        writer.mark_dirty("s2", {"id": "s2", "value": -1})
+
+        assert wait_for(lambda: store.batches)
+        writer.close()
+
+        assert len(store.batches) == 1
+        assert store.records["s1"]["value"] == 99
+        assert set(store.records) == {"s1", "s2"}
+
+    def test_writes_happen_off_calling_thread(self):
+        store = RecordingStore()
+        writer = CoalescingWriter(store, serialize, window=0.0)
+        writer.mark_dirty("s1", {"id": "s1", "value": 1})
+
+        assert wait_for(lambda: store.batches)
+        writer.close()
+
+        assert store.threads == {"session-writer"}
+
+    def test_flush_writes_pending_immediately(self):
+        store = RecordingStore()
+        writer = CoalescingWriter(store, serialize, window=10.0)
+        writer.mark_dirty("s1", {"id": "s1", "value": 1})
+
+        assert writer.get_pending("s1") is not None
+        writer.flush()
+
+        assert store.records["s1"]["value"] == 1
+        assert writer.pending() == []
+        writer.close()
+
+    def test_failed_write_keeps_changes_pending(self):
+        store = RecordingStore(fail=True)
+        writer = CoalescingWriter(store, serialize, window=10.0)
+        writer.mark_dirty("s1", {"id": "s1", "value": 1})
+
+        writer.flush()
+        assert [p["id"] for p in writer.pending()] == ["s1"]
+
+        store.fail = False
+        writer.close()
+        assert store.records["s1"]["value"] == 1
+
+
+class TestEngineUsesWriter:
+
+    def test_list_sessions_sees_unwritten_sessions(self, tmp_path):
+        from server import OrchestratorEngine
+        from session_store import SqliteSessionStore
+
+        engine = OrchestratorEngine(store=SqliteSessionStore(str(tmp_path / "s.db")))
+        engine.writer.window = 10.0  # keep everything pending
+        plan = engine.generate_execution_plan("Ottimizza le query PostgreSQL")
+
+        assert engine.store.count() == 0
+        assert engine.list_sessions(5)[0]["session_id"] == plan.session_id
+
+        engine.flush()
+        assert engine.store.count() == 1
+        engine.close()
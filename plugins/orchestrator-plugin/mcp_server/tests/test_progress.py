@@ -0,0 +1,146 @@
+"""
+Tests for throttled MCP progress notifications.
+"""
+
+import asyncio
+import threading
+import time
+
+from progress import ProgressMiddleware, ProgressReporter, report_progress
+from tool_registry import ToolHandler, ToolRegistry
+
+
+class Recorder:
+    def __init__(self):
+        self.updates = []
+        self.times = []
+
+    async def __call__(self, progress, total, message):
+        self.updates.append((progress, total, message))
+        self.times.append(time.monotonic())
+
+
+class CountingTool(ToolHandler):
+    name = "count"
+    blocking = True
+
+    def run(self, arguments):
+        for i in range(1, arguments["n"] + 1):
+            report_progress(i, arguments["n"], f"step {i}")
+            time.sleep(arguments.get("sleep", 0))
+        return "done"
+
+
+def registry_with(channel, max_rate=10.0):
+    registry = ToolRegistry(middleware=[ProgressMiddleware(channel, max_rate)])
+    registry.register(CountingTool())
+    return registry
+
+
+class TestProgressReporter:
+
+    async def test_updates_are_throttled_and_last_wins(self):
+        send = Recorder()
+        reporter = ProgressReporter(send, asyncio.get_running_loop(), min_interval=0.05)
+
+        def worker():
+            for i in range(1, 201):
+                reporter.report(i, 200)
+                time.sleep(0.001)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        while thread.is_alive():
+            await asyncio.sleep(0.01)
+        await reporter.aclose()
+
+        progress = [u[0] for u in send.updates]
+        assert progress[-1] == 200
+        assert progress == sorted(progress)
+        assert len(progress) < 20
+        assert reporter.coalesced > 150
+        # Apart from the final flush, notifications respect the interval
+        gaps = [b - a for a, b in zip(send.times, send.times[1:-1])]
+        assert all(gap >= 0.045 for gap in gaps)
+
+    async def test_reports_after_close_are_ignored(self):
+        send = Recorder()
+        reporter = ProgressReporter(send, asyncio.get_running_loop())
+        reporter.report(1, 2, "first")
+        await reporter.aclose()
+        reporter.report(2, 2, "late")
+        await asyncio.sleep(0.01)
+        assert send.updates == [(1, 2, "first")]
+
+
+class TestProgressMiddleware:
+
+    async def test_worker_thread_progress_reaches_the_client(self):
+        send = Recorder()
+        registry = registry_with(lambda: send)
+
+        out = await registry.call("count", {"n": 5})
+
+        assert out[0].text == "done"
+        assert send.updates[-1] == (5, 5, "step 5")
+
+    async def test_rate_limit(self):
+        send = Recorder()
+        registry = registry_with(lambda: send, max_rate=10.0)
+
+        await registry.call("count", {"n": 40, "sleep": 0.005})
+
+        # ~0.2 s of work at 10/s: the first update, one per 100 ms, the final one
+        assert 2 <= len(send.updates) <= 5
+        assert send.updates[-1][0] == 40
+
+    async def test_no_progress_token_means_no_notifications(self):
+        registry = registry_with(lambda: None)
+        assert (await registry.call("count", {"n": 3}))[0].text == "done"
+        report_progress(1, 1, "outside a call")  # no-op
+
+
+class TestServerProgress:
+
+    def test_execute_reports_plan_and_released_tasks(self, monkeypatch):
+        import server
+
+        reports = []
+        monkeypatch.setattr(server, "report_progress", lambda *update: reports.append(update))
+
+        server.ExecuteTool().run({"request": "GUI PyQt5 con database SQLite"})
+
+        messages = [message for _, _, message in reports]
+        assert messages[0] == "Analyzing request"
+        assert messages[2] == "Execution table ready"
+        assert any(m.startswith("Released T1 → ") for m in messages)
+        assert messages[-1].endswith("(runs last)")
+        progress = [p for p, _, _ in reports]
+        assert progress == sorted(progress)
+        assert reports[-1][0] == reports[-1][1]
+
+    async def test_cleanup_reports_counts(self, tmp_path):
+        from server import OrchestratorEngine
+        from session_store import SqliteSessionStore
+
+        (tmp_path / "a.tmp").write_text("x")
+        (tmp_path / "b.bak").write_text("x")
+        engine = OrchestratorEngine(store=SqliteSessionStore(str(tmp_path / "sessions.db")))
+        send = Recorder()
+
+        class CleanupTool(ToolHandler):
+            name = "cleanup"
+
+            async def run(self, arguments):
+                results = await engine.cleanup_temp_files(str(tmp_path))
+                return str(results["total_cleaned"])
+
+        registry = ToolRegistry(middleware=[ProgressMiddleware(lambda: send, max_rate=1000.0)])
+        registry.register(CleanupTool())
+        try:
+            assert (await registry.call("cleanup", {}))[0].text == "2"
+        finally:
+            engine.close()
+        progress, total, message = send.updates[-1]
+        assert progress == total
+        assert "2 temp files/dirs removed" in message
@@ -0,0 +1,205 @@
+"""
+Tests for precomputed, version-stamped orchestrator:// resources.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+
+from mcp import types
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from resources import ResourceCatalog, ResourceSubscriptions, file_signature, watch_resources
+from session_store import SqliteSessionStore
+
+
+def make_catalog(state):
+    catalog = ResourceCatalog()
+    catalog.register(
+        "test://data", "data", "Test data",
+        build=lambda: {"value": state["value"]},
+        source_version=lambda: state["generation"]
+    )
+    return catalog
+
+
+class TestResourceCatalog:
+
+    def test_payload_is_cached_until_the_source_changes(self):
+        state = {"value": 1, "generation": 0}
+        catalog = make_catalog(state)
+
+        first = catalog.get("test://data")
+        assert json.loads(first.text) == {"value": 1}
+        assert catalog.get("test://data") is first
+        assert catalog.builds == 1
+
+        state["value"] = 2  # not announced: still served from cache
+        assert catalog.get("test://data") is first
+
+        state["generation"] = 1
+        second = catalog.get("test://data")
+        assert json.loads(second.text) == {"value": 2}
+        assert (second.version, second.etag != first.etag) == (2, True)
+        assert catalog.drain_changes() == ["test://data"]
+        assert catalog.drain_changes() == []
+
+    def test_rebuild_with_same_content_keeps_the_version(self):
+        state = {"value": 1, "generation": 0}
+        catalog = make_catalog(state)
+        first = catalog.get("test://data")
+
+        state["generation"] = 1
+        assert catalog.refresh_all() == []
+        assert catalog.get("test://data") is first
+        assert catalog.builds == 2
+        assert catalog.drain_changes() == []
+
+    def test_live_resources_are_built_on_read_and_never_tracked(self, caplog):
+        state = {"value": 1}
+        catalog = ResourceCatalog()
+        catalog.register("test://live", "live", "Live data", build=lambda: {"value": state["value"]})
+
+        first = catalog.get("test://live")
+        state["value"] = 2
+        second = catalog.get("test://live")
+        assert json.loads(second.text) == {"value": 2}
+        assert (first.version, second.version) == (1, 2)
+        assert catalog.get("test://live") is second  # same content, same version
+
+        state["value"] = 3
+        with caplog.at_level("INFO", logger="orchestrator-mcp"):
+            assert catalog.refresh_all() == []
+            catalog.get("test://live")
+        assert catalog.drain_changes() == []
+        assert not caplog.records
+
+    def test_file_signature_tracks_edits(self, tmp_path):
+        path = tmp_path / "config.json"
+        assert file_signature(str(path)) == ((0, 0),)
+        path.write_text("{}")
+        before = file_signature(str(path))
+        path.write_text('{"a": 1}')
+        assert file_signature(str(path)) != before
+
+
+class TestResourceSubscriptions:
+
+    async def test_watcher_notifies_subscribers(self):
+        state = {"value": 1, "generation": 0}
+        catalog = make_catalog(state)
+        catalog.get("test://data")
+        subscriptions = ResourceSubscriptions()
+
+        class Session:
+            def __init__(self):
+                self.updated = []
+
+            async def send_resource_updated(self, uri):
+                self.updated.append(str(uri))
+
+        session = Session()
+        subscriptions.subscribe("test://data", session)
+        watcher = asyncio.create_task(watch_resources(catalog, subscriptions, 0.01))
+        try:
+            state.update(value=2, generation=1)
+            for _ in range(100):
+                if session.updated:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            watcher.cancel()
+        assert session.updated == ["test://data"]
+
+
+class TestServerResources:
+
+    async def test_read_serves_stamped_payloads(self):
+        import server
+
+        async with create_connected_server_and_client_session(server.server) as client:
+            listed = await client.list_resources()
+            assert [str(r.uri) for r in listed.resources] == [
+                "orchestrator://sessions", "orchestrator://agents", "orchestrator://config",
+                "orchestrator://metrics"
+            ]
+            builds = server.resource_catalog.builds
+            config = (await client.read_resource("orchestrator://config")).contents[0]
+            again = (await client.read_resource("orchestrator://config")).contents[0]
+
+        assert json.loads(config.text)["max_parallel_agents"] == 64
+        assert config.meta["etag"] == again.meta["etag"]
+        assert server.resource_catalog.builds <= builds + 1
+
+    async def test_subscribed_client_hears_about_new_sessions(self):
+        import server
+
+        updates = []
+
+        async def on_message(message):
+            if isinstance(message, types.ServerNotification) and \
+                    isinstance(message.root, types.ResourceUpdatedNotification):
+                updates.append(str(message.root.params.uri))
+
+        async with create_connected_server_and_client_session(
+            server.server, message_handler=on_message
+        ) as client:
+            await client.read_resource("orchestrator://sessions")
+            await client.subscribe_resource("orchestrator://sessions")
+            await client.call_tool("orchestrator_analyze", {"request": "database SQLite"})
+
+            server.resource_catalog.refresh_all()
+            for uri in server.resource_catalog.drain_changes():
+                await server.resource_subscriptions.notify(uri)
+            for _ in range(50):
+                if updates:
+                    break
+                await asyncio.sleep(0.01)
+            await client.unsubscribe_resource("orchestrator://sessions")
+
+        assert "orchestrator://sessions" in updates
+
+    def test_sessions_follow_writes_of_other_processes(self, tmp_path, monkeypatch):
+        from test_session_store import make_record
+
+        import server
+
+        engine = server.OrchestratorEngine(store=SqliteSessionStore(str(tmp_path / "s.db")))
+        monkeypatch.setattr(server, "engine", engine)
+        other = SqliteSessionStore(str(tmp_path / "s.db"))  # another server process
+        try:
+            before = server.resource_catalog.get("orchestrator://sessions")
+            assert server.resource_catalog.get("orchestrator://sessions") is before
+
+            other.put(make_record("elsewhere", datetime.now()))
+            after = server.resource_catalog.get("orchestrator://sessions")
+            assert after.version == before.version + 1
+            assert "elsewhere" in after.text
+        finally:
+            other.close()
+            engine.close()
+
+    def test_mapping_edits_are_reloaded(self, tmp_path, monkeypatch):
+        import server
+
+        mappings = tmp_path / "keyword-mappings.json"
+        mappings.write_text(json.dumps({"domain_mappings": {
+            "quantum": {"primary_agent": "quantum_expert", "keywords": ["qubit"], "model": "opus"}
+        }}))
+        server.ensure_keyword_mappings()
+        for name in ("KEYWORD_MAPPINGS", "_MAPPINGS_SIGNATURE", "MAPPINGS_GENERATION", "routing_snapshot",
+                     "KEYWORD_TO_EXPERT_MAPPING", "EXPERT_TO_MODEL_MAPPING", "EXPERT_TO_PRIORITY_MAPPING",
+                     "SPECIALIZATION_DESCRIPTIONS"):
+            monkeypatch.setattr(server, name, getattr(server, name))
+        monkeypatch.setattr(server, "KEYWORD_MAPPINGS", str(mappings))
+        monkeypatch.setattr(server, "ROUTING_SNAPSHOT", str(tmp_path / "routing.snapshot"))
+
+        before = server.resource_catalog.get("orchestrator://agents")
+        assert server.reload_keyword_mappings_if_changed()
+        assert not server.reload_keyword_mappings_if_changed()
+
+        assert server.KEYWORD_TO_EXPERT_MAPPING["qubit"] == "experts/quantum_expert.md"
+        assert "database" in server.KEYWORD_TO_EXPERT_MAPPING  # hardcoded baseline kept
+        after = server.resource_catalog.get("orchestrator://agents")
+        assert after.version == before.version + 1
+        assert "quantum_expert" in after.text
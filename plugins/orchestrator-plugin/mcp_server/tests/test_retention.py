@@ -0,0 +1,210 @@
+"""
+Tests for session retention policies and the incremental garbage collector.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from test_session_store import make_record, open_store
+
+from retention import RetentionPolicy, SessionGarbageCollector, load_retention_policies
+from server import OrchestratorEngine
+from session_store import SqliteSessionStore
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path):
+    s = open_store(request.param, tmp_path)
+    yield s
+    s.close()
+
+
+def fill(store, status, count, start, step=timedelta(minutes=1), prefix=None):
+    store.put_many(
+        make_record(f"{prefix or status[0]}{i:04d}", start + i * step, status=status)
+        for i in range(count)
+    )
+
+
+def remaining(store, status):
+    return [s["session_id"] for s in store.list_summaries(10_000, status=status)][::-1]
+
+
+class TestLoadRetentionPolicies:
+
+    def test_overrides_merge_with_defaults(self):
+        policies = load_retention_policies('{"cancelled": {"max_age_days": 7, "max_bytes": null}}')
+        assert policies["cancelled"].max_age_days == 7
+        assert policies["cancelled"].max_bytes is None
+        assert policies["cancelled"].max_count == 2000
+        assert policies["failed"].max_age_days == 365
+
+    def test_unfinished_statuses_have_age_limits(self):
+        policies = load_retention_policies('{"pending": {"max_age_days": 1}}')
+        assert policies["pending"].max_age_days == 1
+        assert policies["in_progress"].max_age_days == 30
+
+    @pytest.mark.parametrize("raw", ['{"running": {}}', '{"failed": {"max_rows": 1}}'])
+    def test_rejects_unknown_keys(self, raw):
+        with pytest.raises(ValueError):
+            load_retention_policies(raw)
+
+    @pytest.mark.parametrize("raw", ["{not json", '{"running": {}}', '{"pending": 3}', "[]"])
+    def test_server_falls_back_to_defaults(self, raw, caplog):
+        import server
+
+        with caplog.at_level("WARNING", logger="orchestrator-mcp"):
+            policies = server.load_retention(raw)
+        assert policies == load_retention_policies(None)
+        assert "ORCHESTRATOR_RETENTION" in caplog.text
+
+
+class TestGarbageCollector:
+
+    def test_policies_are_per_status(self, store):
+        now = datetime.now()
+        fill(store, "completed", 30, now - timedelta(days=1))
+        fill(store, "cancelled", 10, now - timedelta(days=40), step=timedelta(days=3), prefix="x")
+        fill(store, "failed", 5, now - timedelta(days=400))
+        fill(store, "pending", 5, now - timedelta(days=400))
+
+        gc = SessionGarbageCollector(store, {
+            "completed": RetentionPolicy(max_count=20),
+            "cancelled": RetentionPolicy(max_age_days=30),
+            "failed": RetentionPolicy(),
+        }, page_size=7)
+        gc.collect()
+
+        assert remaining(store, "completed") == [f"c{i:04d}" for i in range(10, 30)]
+        # Started 40, 37, 34, 31, 28, ... days ago
+        assert remaining(store, "cancelled") == [f"x{i:04d}" for i in range(4, 10)]
+        assert len(remaining(store, "failed")) == 5
+        assert len(remaining(store, "pending")) == 5
+        assert gc.deleted_total == 14
+
+    def test_abandoned_pending_sessions_are_collected(self, store):
+        now = datetime.now()
+        fill(store, "pending", 3, now - timedelta(days=10), prefix="old")
+        fill(store, "pending", 2, now - timedelta(hours=1), prefix="new")
+        fill(store, "in_progress", 2, now - timedelta(days=10))
+
+        gc = SessionGarbageCollector(store, load_retention_policies(None))
+        gc.collect()
+
+        assert remaining(store, "pending") == ["new0000", "new0001"]
+        assert len(remaining(store, "in_progress")) == 2
+
+    def test_byte_limit(self, store):
+        fill(store, "completed", 10, datetime.now())
+        size = store.oldest("completed", 1)[0][0]["size"]
+
+        gc = SessionGarbageCollector(store, {"completed": RetentionPolicy(max_bytes=size * 4)})
+        gc.collect()
+
+        assert remaining(store, "completed") == [f"c{i:04d}" for i in range(6, 10)]
+
+    def test_protected_sessions_survive(self, store):
+        fill(store, "completed", 5, datetime.now())
+        gc = SessionGarbageCollector(
+            store, {"completed": RetentionPolicy(max_count=0)},
+            is_protected=lambda session_id: session_id == "c0002",
+            on_deleted=lambda ids: deleted.extend(ids),
+        )
+        deleted = []
+        gc.collect()
+
+        assert remaining(store, "completed") == ["c0002"]
+        assert sorted(deleted) == ["c0000", "c0001", "c0003", "c0004"]
+
+    def test_work_is_split_into_slices(self, store):
+        fill(store, "completed", 50, datetime.now())
+        gc = SessionGarbageCollector(store, {"completed": RetentionPolicy(max_count=10)}, page_size=5)
+        gc.start_cycle()
+
+        slices = 0
+        while gc.step(0):
+            slices += 1
+        assert slices > 5
+        assert gc.cycles == 1
+        assert store.count() == 10
+
+
+class TestCompaction:
+
+    def test_jsonl_log_is_rewritten_with_live_records(self, tmp_path):
+        store = open_store("json", tmp_path)
+        store.COMPACT_MIN_DEAD_BYTES = 0
+        fill(store, "completed", 40, datetime.now())
+        for _ in range(3):  # superseded versions
+            fill(store, "completed", 40, datetime.now())
+        store.delete_many([f"c{i:04d}" for i in range(30)])
+        size_before = os.path.getsize(tmp_path / "sessions.jsonl")
+
+        other = open_store("json", tmp_path)  # another process sharing the log
+        while store.compact_step(0):
+            pass
+
+        assert os.path.getsize(tmp_path / "sessions.jsonl") < size_before / 10
+        assert remaining(store, "completed") == [f"c{i:04d}" for i in range(30, 40)]
+        assert remaining(other, "completed") == [f"c{i:04d}" for i in range(30, 40)]
+        store.close()
+        other.close()
+
+        reopened = open_store("json", tmp_path)
+        assert reopened.get("c0035")["session_id"] == "c0035"
+        assert reopened.count() == 10
+        reopened.close()
+
+    def test_jsonl_writes_during_compaction_are_kept(self, tmp_path):
+        store = open_store("json", tmp_path)
+        store.COMPACT_MIN_DEAD_BYTES = 0
+        fill(store, "completed", 20, datetime(2026, 1, 1))
+        store.delete_many([f"c{i:04d}" for i in range(10)])
+
+        assert store.compact_step(0)  # copied one record, more to go
+        store.put(make_record("c0015", datetime(2026, 1, 1), status="failed"))
+        store.delete_many(["c0019"])
+        store.put(make_record("zz", datetime(2026, 2, 1)))
+        while store.compact_step(0):
+            pass
+        store.close()
+
+        reopened = open_store("json", tmp_path)
+        assert reopened.get("c0015")["status"] == "failed"
+        assert reopened.get("c0019") is None
+        assert reopened.get("zz") is not None
+        assert reopened.count() == 10
+        reopened.close()
+
+    def test_sqlite_releases_free_pages_incrementally(self, tmp_path):
+        store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+        store.VACUUM_PAGES = 4
+        fill(store, "completed", 300, datetime.now())
+        store.delete_many([f"c{i:04d}" for i in range(300)])
+        assert store._conn.execute("PRAGMA freelist_count").fetchone()[0] > 0
+
+        assert store.compact_step(0)
+        while store.compact_step(0):
+            pass
+        assert store._conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        store.close()
+
+
+class TestEngineRetention:
+
+    def test_collected_sessions_leave_cache_and_search_index(self, tmp_path):
+        engine = OrchestratorEngine(store=SqliteSessionStore(str(tmp_path / "s.db")))
+        plans = [engine.generate_execution_plan("Aggiungi autenticazione JWT") for _ in range(3)]
+        for plan in plans:
+            engine.cancel_session(engine.get_session(plan.session_id))
+        engine.flush()
+        engine.get_search_index()
+
+        engine.gc.policies = {"cancelled": RetentionPolicy(max_count=1)}
+        engine.gc.collect()
+
+        assert [h["session_id"] for h in engine.search_sessions("jwt")[0]] == [plans[-1].session_id]
+        assert plans[0].session_id not in engine.sessions
+        assert engine.get_session(plans[0].session_id) is None
+        engine.close()
@@ -0,0 +1,141 @@
+"""
+Tests for the precompiled routing snapshot.
+"""
+
+import json
+import os
+
+import pytest
+
+from routing_snapshot import RoutingSnapshot, apply_agent_registry, validate_routing_tables
+
+
+def empty_tables():
+    return {"keywords": {}, "models": {}, "priorities": {}, "specializations": {}}
+
+
+@pytest.fixture
+def sources(tmp_path):
+    mappings = tmp_path / "keyword-mappings.json"
+    registry = tmp_path / "agent-registry.json"
+    mappings.write_text(json.dumps({"domain_mappings": {"db": {"keywords": ["sql"]}}}))
+    registry.write_text(json.dumps({"experts": []}))
+    return mappings, registry
+
+
+class Compiler:
+    """Compiles the keywords of keyword-mappings.json, counting the calls"""
+
+    def __init__(self, mappings):
+        self.mappings = mappings
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        tables = empty_tables()
+        for domain in json.loads(self.mappings.read_text())["domain_mappings"].values():
+            for keyword in domain["keywords"]:
+                tables["keywords"][keyword] = "experts/database_expert.md"
+        return tables
+
+
+class TestSnapshot:
+
+    def test_compiled_once_then_loaded(self, tmp_path, sources):
+        compile_tables = Compiler(sources[0])
+        tables = RoutingSnapshot(str(tmp_path / "routing.snapshot"), sources).load(compile_tables)
+        assert tables["keywords"] == {"sql": "experts/database_expert.md"}
+
+        snapshot = RoutingSnapshot(str(tmp_path / "routing.snapshot"), sources)
+        assert snapshot.load(compile_tables) == tables
+        assert snapshot.last_origin == "snapshot"
+        assert compile_tables.calls == 1
+
+    def test_rebuilt_only_when_content_changes(self, tmp_path, sources):
+        mappings, registry = sources
+        compile_tables = Compiler(mappings)
+        snapshot = RoutingSnapshot(str(tmp_path / "routing.snapshot"), sources)
+        snapshot.load(compile_tables)
+
+        # Same bytes, new mtime: the snapshot is reused
+        st = os.stat(registry)
+        os.utime(registry, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        snapshot.load(compile_tables)
+        assert (snapshot.last_origin, compile_tables.calls) == ("rehashed", 1)
+        snapshot.load(compile_tables)
+        assert snapshot.last_origin == "snapshot"
+
+        mappings.write_text(json.dumps({"domain_mappings": {"db": {"keywords": ["sql", "query"]}}}))
+        tables = snapshot.load(compile_tables)
+        assert (snapshot.last_origin, compile_tables.calls) == ("compiled", 2)
+        assert set(tables["keywords"]) == {"sql", "query"}
+
+    def test_baseline_change_invalidates(self, tmp_path, sources):
+        compile_tables = Compiler(sources[0])
+        RoutingSnapshot(str(tmp_path / "routing.snapshot"), sources, "v1").load(compile_tables)
+        snapshot = RoutingSnapshot(str(tmp_path / "routing.snapshot"), sources, "v2")
+        snapshot.load(compile_tables)
+        assert (snapshot.last_origin, compile_tables.calls) == ("compiled", 2)
+
+    def test_corrupt_snapshot_is_recompiled(self, tmp_path, sources):
+        path = tmp_path / "routing.snapshot"
+        path.write_bytes(b"not marshal data")
+        compile_tables = Compiler(sources[0])
+        snapshot = RoutingSnapshot(str(path), sources)
+        assert snapshot.load(compile_tables)["keywords"]
+        assert snapshot.last_origin == "compiled"
+        assert RoutingSnapshot(str(path), sources).read() is not None
+
+
+class TestCompileHelpers:
+
+    def test_registry_fills_gaps_only(self):
+        tables = empty_tables()
+        tables["models"]["core/coder.md"] = "sonnet"
+        registry = {
+            "core": [{"file": "core/coder.md", "defaultModel": "haiku", "specialization": "Coding"}],
+            "experts": [{"file": "experts/L2/new-expert.md", "defaultModel": "opus"}, {"name": "no file"}],
+        }
+        assert apply_agent_registry(tables, registry) == 2
+        assert tables["models"] == {"core/coder.md": "sonnet", "experts/L2/new-expert.md": "opus"}
+        assert tables["specializations"] == {"core/coder.md": "Coding"}
+
+    def test_invalid_entries_are_dropped(self):
+        tables = {
+            "keywords": {"sql": "experts/database_expert.md", "bad": "experts/../secret.md", "": "core/coder.md"},
+            "models": {"core/coder.md": "sonnet", "core/reviewer.md": "gpt"},
+            "priorities": {"core/coder.md": "ALTA", "core/reviewer.md": "URGENT"},
+            "specializations": {"core/coder.md": "Coding", "coder.txt": "?"},
+        }
+        problems = validate_routing_tables(tables, {"haiku", "sonnet", "opus"}, {"ALTA", "MEDIA"})
+        assert len(problems) == 5
+        assert tables == {
+            "keywords": {"sql": "experts/database_expert.md"},
+            "models": {"core/coder.md": "sonnet"},
+            "priorities": {"core/coder.md": "ALTA"},
+            "specializations": {"core/coder.md": "Coding"},
+        }
+
+
+def test_server_loads_registry_edits(tmp_path, monkeypatch):
+    import server
+
+    registry = tmp_path / "agent-registry.json"
+    registry.write_text(json.dumps({"experts": [
+        {"file": "experts/database_expert.md", "specialization": "ignored, already known"},
+        {"file": "experts/L2/quantum.md", "specialization": "Qubits", "defaultModel": "opus"},
+    ]}))
+    server.ensure_keyword_mappings()
+    for name in ("AGENTS_REGISTRY", "_MAPPINGS_SIGNATURE", "MAPPINGS_GENERATION", "routing_snapshot",
+                 "KEYWORD_TO_EXPERT_MAPPING", "EXPERT_TO_MODEL_MAPPING", "EXPERT_TO_PRIORITY_MAPPING",
+                 "SPECIALIZATION_DESCRIPTIONS"):
+        monkeypatch.setattr(server, name, getattr(server, name))
+    monkeypatch.setattr(server, "AGENTS_REGISTRY", str(registry))
+    monkeypatch.setattr(server, "ROUTING_SNAPSHOT", str(tmp_path / "routing.snapshot"))
+
+    assert server.reload_keyword_mappings_if_changed()
+    assert server.routing_snapshot.last_origin == "compiled"
+    assert server.SPECIALIZATION_DESCRIPTIONS["experts/L2/quantum.md"] == "Qubits"
+    assert server.EXPERT_TO_MODEL_MAPPING["experts/L2/quantum.md"] == "opus"
+    assert server.SPECIALIZATION_DESCRIPTIONS["experts/database_expert.md"].startswith("SQLite")
+    assert not server.reload_keyword_mappings_if_changed()
@@ -0,0 +1,170 @@
+"""
+Tests for the BM25 session search index and the orchestrator_search path.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from search_index import SessionSearchIndex, tokenize
+from server import OrchestratorEngine, TaskDocumentation
+from session_store import JsonlSessionStore, SqliteSessionStore
+
+
+def make_record(session_id, request, status="completed", domains=(), started_at=None,
+                experts=(), docs=()):
+    return {
+        "session_id": session_id,
+        "user_request": request,
+        "status": status,
+        "started_at": (started_at or datetime(2026, 1, 1)).isoformat(),
+        "domains": list(domains),
+        "plan": {"tasks": [{"agent_expert_file": e} for e in experts]},
+        "task_docs": [
+            {"what_done": d, "what_not_to_do": "", "files_changed": []} for d in docs
+        ],
+    }
+
+
+@pytest.fixture
+def index():
+    idx = SessionSearchIndex()
+    idx.update(make_record("jwt", "Aggiungi autenticazione JWT con refresh token",
+                           domains=["Security"],
+                           experts=["experts/security_unified_expert.md"]))
+    idx.update(make_record("gui", "Implementa una GUI PyQt5", domains=["GUI"],
+                           started_at=datetime(2026, 2, 1)))
+    idx.update(make_record("db", "Ottimizza le query PostgreSQL", status="failed",
+                           domains=["Database"], docs=["Aggiunto indice su token_id"]))
+    return idx
+
+
+class TestTokenize:
+
+    def test_splits_paths_and_lowercases(self):
+        assert tokenize("experts/security_unified_expert.md JWT") == [
+            "experts", "security", "unified", "expert", "md", "jwt"
+        ]
+
+    def test_expert_paths_are_indexed_by_name(self):
+        idx = SessionSearchIndex()
+        idx.update(make_record("a", "Nuova API", experts=["experts/L2/api-endpoint-builder.md",
+                                                        "core/documenter.md"]))
+        assert [h["session_id"] for h in idx.search("endpoint builder")[0]] == ["a"]
+        for boilerplate in ("experts", "core", "md", "documenter"):
+            assert idx.search(boilerplate)[0] == []
+
+    def test_keeps_accented_words(self):
+        assert tokenize("Cosa è stato modificato: già") == ["cosa", "stato", "modificato", "già"]
+
+
+class TestSessionSearchIndex:
+
+    def test_ranks_best_match_first(self, index):
+        hits, _ = index.search("jwt refresh")
+        assert [h["session_id"] for h in hits] == ["jwt"]
+
+        hits, _ = index.search("refresh token")
+        assert [h["session_id"] for h in hits][0] == "jwt"
+        assert {h["session_id"] for h in hits} == {"jwt", "db"}
+
+    def test_indexes_experts_and_task_docs(self, index):
+        assert [h["session_id"] for h in index.search("security")[0]] == ["jwt"]
+        assert [h["session_id"] for h in index.search("indice")[0]] == ["db"]
+
+    def test_filters(self, index):
+        assert index.search("token", status="failed")[0][0]["session_id"] == "db"
+        assert index.search("token", domain="Security")[0][0]["session_id"] == "jwt"
+        assert index.search("gui", since="2026-02-01")[0][0]["session_id"] == "gui"
+        assert index.search("gui", until="2026-01-31")[0] == []
+
+    def test_update_replaces_postings(self, index):
+        index.update(make_record("jwt", "Rifattorizza il modulo pagamenti"))
+        assert index.search("jwt")[0] == []
+        assert index.search("pagamenti")[0][0]["session_id"] == "jwt"
+
+        index.remove("jwt")
+        assert len(index) == 2
+        assert index.search("pagamenti")[0] == []
+
+    def test_cursor_pagination_visits_every_hit_once(self):
+        idx = SessionSearchIndex()
+        for i in range(25):
+            idx.update(make_record(f"s{i:02d}", "deploy docker " + "docker " * (i % 5)))
+
+        seen, cursor = [], None
+        while True:
+            hits, cursor = idx.search("docker", limit=10, cursor=cursor)
+            seen.extend(h["session_id"] for h in hits)
+            if cursor is None:
+                break
+
+        assert sorted(seen) == [f"s{i:02d}" for i in range(25)]
+        assert len(seen) == 25
+
+    def test_cursor_of_other_query_is_rejected(self, index):
+        idx = SessionSearchIndex()
+        for i in range(3):
+            idx.update(make_record(f"s{i}", "docker"))
+        _, cursor = idx.search("docker", limit=1)
+        with pytest.raises(ValueError):
+            idx.search("kubernetes", cursor=cursor)
+
+    def test_query_latency_over_100k_sessions(self):
+        idx = SessionSearchIndex()
+        words = ["gui", "database", "api", "docker", "trading", "mobile", "security", "test"]
+        for i in range(100_000):
+            idx.update(make_record(
+                f"s{i:06d}",
+                f"Implementa {words[i % 8]} {words[(i // 8) % 8]} richiesta {i}",
+                started_at=datetime(2026, 1, 1) + timedelta(seconds=i),
+            ))
+        idx.update(make_record("needle", "jwt refresh token rotation"))
+
+        t0 = time.perf_counter()
+        hits, _ = idx.search("jwt refresh")
+        elapsed = time.perf_counter() - t0
+
+        assert hits[0]["session_id"] == "needle"
+        assert elapsed < 0.05
+
+
+class TestEngineSearch:
+
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    def test_sees_writes_and_deletes_of_other_processes(self, backend, tmp_path):
+        def open_engine():
+            if backend == "sqlite":
+                return OrchestratorEngine(store=SqliteSessionStore(str(tmp_path / "s.db")))
+            return OrchestratorEngine(store=JsonlSessionStore(
+                str(tmp_path / "sessions.jsonl"), str(tmp_path / "sessions.idx")))
+
+        engine, other = open_engine(), open_engine()
+        assert engine.search_sessions("kubernetes")[0] == []
+
+        plan = other.generate_execution_plan("Deploy su Kubernetes")
+        other.flush()
+        assert engine.search_sessions("kubernetes")[0][0]["session_id"] == plan.session_id
+
+        other.store.delete_many([plan.session_id])
+        assert engine.search_sessions("kubernetes")[0] == []
+        other.close()
+        engine.close()
+
+    def test_search_finds_task_docs_written_after_build(self, tmp_path):
+        engine = OrchestratorEngine(store=SqliteSessionStore(str(tmp_path / "s.db")))
+        plan = engine.generate_execution_plan("Aggiungi autenticazione JWT")
+        engine.flush()
+        assert engine.search_sessions("jwt")[0][0]["session_id"] == plan.session_id
+
+        session = engine.get_session(plan.session_id)
+        session.task_docs.append(TaskDocumentation(
+            task_id="T1", what_done="Rotazione refresh token",
+            what_not_to_do="", files_changed=["auth/tokens.py"], status="success"
+        ))
+        engine._save_sessions(session)
+        engine.flush()
+
+        assert engine.search_sessions("rotazione")[0][0]["session_id"] == plan.session_id
+        engine.close()
@@ -0,0 +1,87 @@
+"""
+Tests for the bounded LRU session cache and engine fault-in.
+"""
+
+from server import OrchestratorEngine
+from session_store import LRUSessionCache, SqliteSessionStore
+
+
+def make_cache(max_count=3, max_bytes=1000):
+    return LRUSessionCache(max_count=max_count, max_bytes=max_bytes, sizeof=lambda o: o["size"])
+
+
+class TestLRUSessionCache:
+
+    def test_evicts_least_recently_used_by_count(self):
+        cache = make_cache(max_count=2)
+        cache["a"] = {"size": 1}
+        cache["b"] = {"size": 1}
+        cache.get("a")
+        cache["c"] = {"size": 1}
+
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache
+        assert cache.evictions == 1
+
+    def test_evicts_by_bytes(self):
+        cache = make_cache(max_count=10, max_bytes=100)
+        cache["a"] = {"size": 60}
+        cache["b"] = {"size": 60}
+
+        assert list(cache.values()) == [{"size": 60}]
+        assert cache.total_bytes == 60
+
+    def test_touch_refreshes_size(self):
+        cache = make_cache(max_count=10, max_bytes=100)
+        obj = {"size": 10}
+        cache["a"] = obj
+        cache["b"] = {"size": 10}
+        obj["size"] = 95
+        cache.touch("a")
+
+        assert "b" not in cache
+        assert cache.total_bytes == 95
+
+    def test_pinned_entries_are_not_evicted(self):
+        cache = make_cache(max_count=2)
+        cache.pin("a", {"size": 1})
+        cache.pin("a", {"size": 1})
+        cache["b"] = {"size": 1}
+        cache["c"] = {"size": 1}
+        assert "a" in cache and "b" not in cache
+
+        cache.unpin("a")
+        cache["d"] = {"size": 1}
+        assert "a" in cache and cache.is_pinned("a")
+        cache.unpin("a")
+        cache["e"] = {"size": 1}
+        assert "a" not in cache and list(cache.values()) == [{"size": 1}] * 2
+
+    def test_hit_and_miss_counters(self):
+        cache = make_cache()
+        cache["a"] = {"size": 1}
+        cache.get("a")
+        cache.get("missing")
+
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+class TestEngineSessionCache:
+
+    def test_memory_stays_bounded_and_sessions_fault_back_in(self, tmp_path):
+        engine = OrchestratorEngine(store=SqliteSessionStore(str(tmp_path / "s.db")))
+        engine.sessions.max_count = 5
+        engine.writer.window = 10.0  # keep writes queued until flush()
+
+        plans = [engine.generate_execution_plan(f"Crea una GUI numero {i}") for i in range(20)]
+
+        assert len(engine.sessions) == 5
+        # Evicted while still queued: served from the writer
+        assert engine.get_session(plans[0].session_id).plan.tasks[0].id == "T1"
+
+        engine.flush()
+        # Evicted and written: faulted back in from the store
+        restored = engine.get_session(plans[1].session_id)
+        assert restored.user_request == "Crea una GUI numero 1"
+        assert len(engine.sessions) == 5
+        engine.close()
@@ -0,0 +1,70 @@
+"""
+Tests for ULID-style session IDs.
+"""
+
+import threading
+from datetime import datetime
+
+from session_ids import (
+    ID_LENGTH,
+    SessionIdGenerator,
+    encode_time,
+    id_from_sort_key,
+    is_sortable_id,
+    session_sort_key,
+)
+
+
+class TestSessionIds:
+
+    def test_ids_are_short_and_sortable(self):
+        generate = SessionIdGenerator()
+        ids = [generate() for _ in range(10_000)]
+
+        assert all(len(i) == ID_LENGTH and is_sortable_id(i) for i in ids)
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+
+    def test_monotonic_across_threads(self):
+        generate = SessionIdGenerator()
+        ids = []
+        lock = threading.Lock()
+
+        def worker():
+            local = [generate() for _ in range(2000)]
+            with lock:
+                ids.extend(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(set(ids)) == 16_000
+
+    def test_same_millisecond_increments_random_part(self, monkeypatch):
+        generate = SessionIdGenerator()
+        monkeypatch.setattr("session_ids.time.time", lambda: 1_700_000_000.0)
+        first, second = generate(), generate()
+
+        assert first[:10] == second[:10] == encode_time(1_700_000_000_000)
+        assert second > first
+
+    def test_clock_going_backwards_keeps_order(self, monkeypatch):
+        generate = SessionIdGenerator()
+        monkeypatch.setattr("session_ids.time.time", lambda: 1_700_000_000.5)
+        first = generate()
+        monkeypatch.setattr("session_ids.time.time", lambda: 1_700_000_000.0)
+        assert generate() > first
+
+    def test_legacy_ids_get_time_prefixed_key(self):
+        started_at = datetime(2026, 2, 21, 1, 18, 11)
+        key = session_sort_key("f45e6d09", started_at.isoformat())
+
+        assert key[:10] == encode_time(int(started_at.timestamp() * 1000))
+        assert id_from_sort_key(key) == "f45e6d09"
+
+        new_id = SessionIdGenerator()()
+        assert session_sort_key(new_id, started_at.isoformat()) == new_id
+        assert id_from_sort_key(new_id) == new_id
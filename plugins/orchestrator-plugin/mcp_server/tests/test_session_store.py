@@ -0,0 +1,415 @@
+"""
+Tests for the session persistence backends and their use by the engine.
+"""
+
+import json
+import multiprocessing
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from server import OrchestratorEngine, TaskStatus, session_from_record, session_to_record
+from session_ids import encode_time, new_session_id
+from session_store import JsonlSessionStore, SqliteSessionStore, create_session_store
+
+
+def make_record(session_id, started_at, status="pending", domains=("GUI",)):
+    return {
+        "session_id": session_id,
+        "user_request": f"request {session_id}",
+        "status": status,
+        "started_at": started_at.isoformat(),
+        "completed_at": None,
+        "tasks_count": 1,
+        "domains": list(domains),
+        "plan": {
+            "session_id": session_id,
+            "tasks": [{
+                "id": "T1",
+                "agent_expert_file": "core/coder.md",
+                "model": "sonnet",
+                "priority": "MEDIA",
+            }],
+            "complexity": "bassa",
+            "domains": list(domains),
+        },
+        "results": [],
+        "task_docs": [],
+    }
+
+
+def open_store(backend, directory):
+    if backend == "json":
+        return JsonlSessionStore(
+            str(directory / "sessions.jsonl"),
+            str(directory / "sessions.idx"),
+            legacy_path=str(directory / "sessions.json"),
+        )
+    return SqliteSessionStore(str(directory / "sessions.db"))
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def store(backend, tmp_path):
+    s = open_store(backend, tmp_path)
+    yield s
+    s.close()
+
+
+class TestSessionStores:
+    """Behaviour shared by every backend."""
+
+    def test_list_is_newest_first_and_limited(self, store):
+        base = datetime(2026, 1, 1)
+        store.put_many(make_record(f"s{i}", base + timedelta(minutes=i)) for i in range(5))
+
+        listed = store.list_summaries(3)
+
+        assert [s["session_id"] for s in listed] == ["s4", "s3", "s2"]
+
+    def test_new_ids_interleave_with_legacy_ids_by_time(self, store):
+        now = datetime.now()
+
+        def id_at(moment):
+            return encode_time(int(moment.timestamp() * 1000)) + "000000"
+
+        store.put(make_record(id_at(now - timedelta(hours=2)), now - timedelta(hours=2)))
+        store.put(make_record("ffffffff", now - timedelta(hours=1)))
+        newest = id_at(now)
+        store.put(make_record(newest, now))
+
+        listed = [s["session_id"] for s in store.list_summaries(2)]
+
+        assert listed == [newest, "ffffffff"]
+
+    def test_filter_by_status_and_domain(self, store):
+        base = datetime(2026, 1, 1)
+        store.put(make_record("a", base, status="completed", domains=["GUI"]))
+        store.put(make_record("b", base + timedelta(minutes=1), status="pending", domains=["GUI"]))
+        store.put(make_record("c", base + timedelta(minutes=2), status="completed", domains=["API"]))
+
+        assert [s["session_id"] for s in store.list_summaries(10, status="completed")] == ["c", "a"]
+        assert [s["session_id"] for s in store.list_summaries(10, domain="GUI")] == ["b", "a"]
+        assert [
+            s["session_id"] for s in store.list_summaries(10, status="completed", domain="GUI")
+        ] == ["a"]
+
+    def test_put_replaces_existing_session(self, store):
+        started = datetime(2026, 1, 1)
+        store.put(make_record("a", started))
+        store.put(make_record("a", started, status="cancelled"))
+
+        assert store.count() == 1
+        assert store.list_summaries(1)[0]["status"] == "cancelled"
+
+    def test_get_returns_full_record(self, store):
+        record = make_record("a", datetime(2026, 1, 1))
+        store.put(record)
+        assert store.get("a") == record
+        assert store.get("missing") is None
+
+
+class TestJsonlSessionStore:
+    """Append-only log and offset index."""
+
+    def test_restart_replays_only_log_tail(self, tmp_path):
+        store = open_store("json", tmp_path)
+        store.put(make_record("a", datetime(2026, 1, 1)))
+        store.close()  # writes the index snapshot
+
+        # Simulate a crash: appended after the snapshot, no close()
+        store = open_store("json", tmp_path)
+        store.put(make_record("b", datetime(2026, 1, 2)))
+        store._reader.close()
+
+        snapshot = json.loads((tmp_path / "sessions.idx").read_text())
+        assert list(snapshot["entries"]) == ["a"]
+
+        store = open_store("json", tmp_path)
+        assert store.count() == 2
+        assert store.get("b")["session_id"] == "b"
+        store.close()
+
+    def test_torn_tail_is_ignored_and_overwritten(self, tmp_path):
+        store = open_store("json", tmp_path)
+        store.put(make_record("a", datetime(2026, 1, 1)))
+        store._reader.close()
+        with open(tmp_path / "sessions.jsonl", "ab") as f:
+            f.write(b'{"session_id": "torn"')
+
+        store = open_store("json", tmp_path)
+        assert store.count() == 1
+        store.put(make_record("b", datetime(2026, 1, 2)))
+        store.close()
+
+        lines = (tmp_path / "sessions.jsonl").read_bytes().splitlines()
+        assert [json.loads(line)["session_id"] for line in lines] == ["a", "b"]
+
+    def test_deletions_mark_keys_dead_instead_of_rebuilding(self, tmp_path):
+        store = open_store("json", tmp_path)
+        store.DEAD_KEYS_SLACK = 4
+        base = datetime(2026, 1, 1)
+        store.put_many(make_record(f"s{i:02d}", base + timedelta(minutes=i)) for i in range(10))
+        order = store._order
+
+        store.delete_many(["s01", "s02", "s03"])
+        assert store._order is order  # no rebuild
+        store.put(make_record("s02", base + timedelta(minutes=2), status="failed"))
+        assert [s["session_id"] for s in store.list_summaries(3)] == ["s09", "s08", "s07"]
+        assert [e["session_id"] for e in store.oldest("pending", 3)[0]] == ["s00", "s04", "s05"]
+        assert [e["session_id"] for e in store.oldest("failed", 3)[0]] == ["s02"]
+
+        store.delete_many(["s04", "s05", "s06", "s07"])  # dead keys now outnumber live ones
+        assert store._dead_keys == set()
+        assert len(store._order) == store.count() == 4
+        live = sum(entry[1] for entry in store._index.values())
+        assert store._live_bytes == live
+        store.close()
+
+    def test_migrates_legacy_sessions_json(self, tmp_path):
+        (tmp_path / "sessions.json").write_text(json.dumps([{
+            "session_id": "f45e6d09",
+            "user_request": "legacy",
+            "status": "pending",
+            "started_at": "2026-02-21T01:18:11.732939",
+            "completed_at": None,
+            "tasks_count": 5,
+        }]))
+
+        store = open_store("json", tmp_path)
+        record = store.get("f45e6d09")
+        store.close()
+
+        assert record["tasks_count"] == 5
+        assert session_from_record(record).plan is None
+
+
+def _write_from_process(backend, directory, worker, count):
+    store = open_store(backend, directory)
+    base = datetime(2026, 1, 1)
+    for i in range(count):
+        store.put(make_record(f"w{worker}-{i}", base + timedelta(seconds=i, microseconds=worker)))
+    store.close()
+
+
+class TestMultiProcess:
+    """Several server processes sharing one data directory."""
+
+    def test_concurrent_writers_produce_merged_view(self, backend, tmp_path):
+        reader = open_store(backend, tmp_path)
+        workers = [
+            multiprocessing.Process(target=_write_from_process, args=(backend, tmp_path, w, 25))
+            for w in range(4)
+        ]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+
+        # An already open store picks up the other processes' writes
+        assert reader.count() == 100
+        assert reader.get("w3-24")["session_id"] == "w3-24"
+        assert reader.list_summaries(1)[0]["session_id"] == "w3-24"
+        reader.close()
+
+    def test_change_cursor_moves_on_other_processes_writes(self, backend, tmp_path):
+        reader = open_store(backend, tmp_path)
+        writer = open_store(backend, tmp_path)
+        before = reader.change_cursor()
+        assert reader.change_cursor() == before
+
+        writer.put(make_record("a", datetime(2026, 1, 1)))
+        after_put = reader.change_cursor()
+        writer.delete_many(["a"])
+        assert len({before, after_put, reader.change_cursor()}) == 3
+        reader.close()
+        writer.close()
+
+    def test_change_feed_reports_other_processes(self, backend, tmp_path):
+        reader = open_store(backend, tmp_path)
+        writer = open_store(backend, tmp_path)
+        writer.put(make_record("old", datetime(2026, 1, 1)))
+        records, deleted, cursor = reader.changes(None)
+        assert records is None  # no cursor yet: reload everything
+
+        writer.put_many([make_record("a", datetime(2026, 1, 2)), make_record("b", datetime(2026, 1, 3))])
+        writer.put(make_record("a", datetime(2026, 1, 2), status="cancelled"))
+        writer.delete_many(["old", "b"])
+        records, deleted, cursor = reader.changes(cursor)
+        assert [(r["session_id"], r["status"]) for r in records] == [("a", "cancelled")]
+        assert sorted(deleted) == ["b", "old"]
+        assert reader.changes(cursor)[:2] == ([], [])
+        writer.close()
+        reader.close()
+
+    def test_rewritten_log_is_reindexed(self, tmp_path):
+        reader = open_store("json", tmp_path)
+        reader.put(make_record("old", datetime(2026, 1, 1)))
+
+        other = tmp_path / "rewrite.jsonl"
+        other.write_bytes(JsonlSessionStore._encode(make_record("new", datetime(2026, 1, 2))))
+        other.replace(tmp_path / "sessions.jsonl")
+
+        assert reader.get("old") is None
+        assert reader.get("new")["session_id"] == "new"
+        reader.close()
+
+
+class TestSqliteSessionStore:
+    """SQLite specific guarantees."""
+
+    def test_wal_mode_enabled(self, tmp_path):
+        store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+        mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        store.close()
+        assert mode == "wal"
+
+    @pytest.mark.parametrize("sql, params, index", [
+        ("SELECT * FROM sessions ORDER BY sort_key DESC LIMIT 5", (), "idx_sessions_sort_key"),
+        ("SELECT * FROM sessions WHERE status = ? ORDER BY sort_key DESC LIMIT 5",
+         ("pending",), "idx_sessions_status_sort_key"),
+        ("SELECT * FROM session_domains WHERE domain = ? ORDER BY sort_key DESC LIMIT 5",
+         ("GUI",), "PRIMARY KEY"),
+    ])
+    def test_listing_uses_index(self, tmp_path, sql, params, index):
+        store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+        plan = " ".join(
+            row[3] for row in store._conn.execute("EXPLAIN QUERY PLAN " + sql, params)
+        )
+        store.close()
+        assert index in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_reader_behind_a_pruned_change_feed_reloads(self, tmp_path):
+        store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+        store.CHANGE_FEED_ROWS = 2
+        _, _, cursor = store.changes(None)
+        for i in range(4):
+            store.put(make_record(f"s{i}", datetime(2026, 1, 1 + i)))
+        assert store.changes(cursor)[0] is None
+        assert store._conn.execute("SELECT COUNT(*) FROM session_changes").fetchone()[0] == 2
+        store.close()
+
+    def test_migrates_version_1_schema(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        store = SqliteSessionStore(path)
+        store.put(make_record("a", datetime(2026, 1, 1)))
+        store._conn.executescript("DROP TABLE session_changes; PRAGMA user_version = 1;")
+        store.close()
+
+        store = SqliteSessionStore(path)
+        _, _, cursor = store.changes(None)
+        store.put(make_record("b", datetime(2026, 1, 2)))
+        records = store.changes(cursor)[0]
+        store.close()
+        assert [r["session_id"] for r in records] == ["b"]
+
+    def test_task_status_follows_reports(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        store = SqliteSessionStore(path)
+        record = make_record("a", datetime(2026, 1, 1))
+        store.put(record)
+        record["results"] = [{"task_id": "T1", "status": "completed"}]
+        store.put(record)
+        status = "SELECT status FROM tasks WHERE session_id = 'a' AND task_id = 'T1'"
+        assert store._conn.execute(status).fetchone()[0] == "completed"
+
+        # Version 2 databases, which always stored 'pending', are backfilled
+        store._conn.executescript("UPDATE tasks SET status = 'pending'; PRAGMA user_version = 2;")
+        store.close()
+        store = SqliteSessionStore(path)
+        assert store._conn.execute(status).fetchone()[0] == "completed"
+        store.close()
+
+    def test_switching_backend_imports_jsonl_sessions(self, tmp_path):
+        jsonl = open_store("json", tmp_path)
+        jsonl.put_many([make_record("a", datetime(2026, 1, 1)), make_record("b", datetime(2026, 1, 2))])
+        jsonl.close()
+
+        def open_sqlite():
+            return create_session_store(
+                "sqlite", str(tmp_path / "sessions.jsonl"), str(tmp_path / "sessions.idx"),
+                str(tmp_path / "sessions.db"), legacy_path=str(tmp_path / "sessions.json")
+            )
+
+        store = open_sqlite()
+        assert isinstance(store, SqliteSessionStore)
+        assert [s["session_id"] for s in store.list_summaries(10)] == ["b", "a"]
+        store.delete_many(["a"])
+        store.close()
+
+        # Only a new database is filled
+        store = open_sqlite()
+        assert store.count() == 1
+        store.close()
+
+    def test_migrates_started_at_ordered_schema(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE sessions (
+                session_id TEXT PRIMARY KEY, user_request TEXT NOT NULL,
+                status TEXT NOT NULL, started_at TEXT NOT NULL, completed_at TEXT,
+                tasks_count INTEGER NOT NULL DEFAULT 0, complexity TEXT,
+                domains TEXT NOT NULL DEFAULT '[]', payload TEXT NOT NULL);
+            CREATE INDEX idx_sessions_started_at ON sessions (started_at);
+            CREATE TABLE session_domains (
+                domain TEXT NOT NULL, started_at TEXT NOT NULL, session_id TEXT NOT NULL,
+                PRIMARY KEY (domain, started_at, session_id)) WITHOUT ROWID;
+        """)
+        for i, session_id in enumerate(["f45e6d09", "0a1b2c3d"]):
+            record = make_record(session_id, datetime(2026, 1, 1 + i))
+            conn.execute(
+                "INSERT INTO sessions VALUES (?, ?, ?, ?, NULL, 1, NULL, ?, ?)",
+                (session_id, record["user_request"], record["status"], record["started_at"],
+                 json.dumps(record["domains"]), json.dumps(record)),
+            )
+        conn.commit()
+        conn.close()
+
+        store = SqliteSessionStore(path)
+        store.put(make_record(new_session_id(), datetime.now()))
+        listed = [s["session_id"] for s in store.list_summaries(10, domain="GUI")]
+        store.close()
+
+        assert listed[1:] == ["0a1b2c3d", "f45e6d09"]
+
+
+class TestEngineRestore:
+    """Engine restarts against every backend."""
+
+    def test_sessions_survive_new_engine(self, backend, tmp_path):
+        engine = OrchestratorEngine(store=open_store(backend, tmp_path))
+        plan = engine.generate_execution_plan("Crea una GUI PyQt5 con database SQLite")
+        engine.cancel_session(engine.get_session(plan.session_id))
+        engine.close()
+
+        restarted = OrchestratorEngine(store=open_store(backend, tmp_path))
+        listed = restarted.list_sessions(5, status=TaskStatus.CANCELLED.value)
+        assert [s["session_id"] for s in listed] == [plan.session_id]
+        assert "GUI" in listed[0]["domains"]
+
+        # Nothing is hydrated until first access
+        assert len(restarted.sessions) == 0
+        session = restarted.get_session(plan.session_id)
+        restarted.close()
+
+        assert session.status == TaskStatus.CANCELLED
+        assert [t.id for t in session.plan.tasks] == [t.id for t in plan.tasks]
+        assert session.plan.tasks[-1].dependencies == plan.tasks[-1].dependencies
+
+    def test_session_to_record_includes_plan(self):
+        engine = OrchestratorEngine(store=SqliteSessionStore(":memory:"))
+        plan = engine.generate_execution_plan("Aggiungi autenticazione JWT")
+        session = engine.get_session(plan.session_id)
+        record = session_to_record(session)
+        engine.close()
+
+        assert record["plan"]["tasks"][0]["id"] == "T1"
+        assert record["tasks_count"] == len(plan.tasks)
+        assert session_from_record(json.loads(json.dumps(record))) == session
@@ -0,0 +1,208 @@
+"""
+Tests for task result ingestion (orchestrator_report) and its event listeners.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from metric_tracker import MetricTracker
+
+from server import OrchestratorEngine, TaskDocumentation, TaskStatus, handle_call_tool
+from session_store import SqliteSessionStore
+from task_events import TASK_COMPLETED, CircuitBreakerFeed, TaskEvent
+
+
+@pytest.fixture
+def engine(tmp_path):
+    e = OrchestratorEngine(store=SqliteSessionStore(str(tmp_path / "sessions.db")))
+    yield e
+    e.close()
+
+
+def new_session(engine, request="Crea una GUI PyQt5 con database SQLite"):
+    plan = engine.generate_execution_plan(request)
+    return engine.get_session(plan.session_id)
+
+
+def run_all(engine, session, fail=()):
+    for task in session.plan.tasks:
+        engine.report_task(session, task.id, "start")
+        engine.report_task(session, task.id, "fail" if task.id in fail else "complete")
+
+
+class TestReportTask:
+
+    def test_status_advances_with_tasks(self, engine):
+        session = new_session(engine)
+        first, last = session.plan.tasks[0], session.plan.tasks[-1]
+        assert session.status == TaskStatus.PENDING
+
+        engine.report_task(session, first.id, "start")
+        assert session.status == TaskStatus.IN_PROGRESS
+        assert engine.get_progress(session)["in_progress"] == 1
+
+        run_all(engine, session)
+        assert session.status == TaskStatus.COMPLETED
+        assert session.completed_at is not None
+        assert engine.get_progress(session)["completed"] == len(session.plan.tasks)
+        assert session.results[-1]["task_id"] == last.id
+
+    def test_any_failure_fails_session_and_retry_reopens_it(self, engine):
+        session = new_session(engine)
+        failing = session.plan.tasks[0].id
+        run_all(engine, session, fail={failing})
+        assert session.status == TaskStatus.FAILED
+
+        engine.report_task(session, failing, "start")
+        assert session.status == TaskStatus.IN_PROGRESS
+        assert session.completed_at is None
+        engine.report_task(session, failing, "complete")
+        assert session.status == TaskStatus.COMPLETED
+
+    def test_invalid_reports_are_rejected(self, engine):
+        session = new_session(engine)
+        task_id = session.plan.tasks[0].id
+
+        with pytest.raises(ValueError):
+            engine.report_task(session, "T99", "start")
+        with pytest.raises(ValueError):
+            engine.report_task(session, task_id, "explode")
+
+        engine.report_task(session, task_id, "complete")
+        with pytest.raises(ValueError):
+            engine.report_task(session, task_id, "complete")
+
+        engine.cancel_session(session)
+        with pytest.raises(ValueError):
+            engine.report_task(session, task_id, "start")
+
+    def test_results_and_docs_are_persisted(self, tmp_path):
+        db = str(tmp_path / "sessions.db")
+        engine = OrchestratorEngine(store=SqliteSessionStore(db))
+        session = new_session(engine)
+        task_id = session.plan.tasks[0].id
+        engine.report_task(session, task_id, "start")
+        engine.report_task(
+            session, task_id, "complete", result="done", tokens_used=1200,
+            doc=TaskDocumentation(task_id, "Added login form", "No global state", ["gui.py"], "success")
+        )
+        engine.close()
+
+        restarted = OrchestratorEngine(store=SqliteSessionStore(db))
+        restored = restarted.get_session(session.session_id)
+        restarted.close()
+
+        assert restored.results[0]["result"] == "done"
+        assert restored.results[0]["tokens_used"] == 1200
+        assert restored.task_docs[0].files_changed == ["gui.py"]
+
+    def test_cancel_marks_running_tasks(self, engine):
+        session = new_session(engine)
+        engine.report_task(session, session.plan.tasks[0].id, "start")
+        engine.cancel_session(session)
+        assert session.results[0]["status"] == TaskStatus.CANCELLED.value
+
+    def test_concurrent_reports_from_worker_threads(self, engine):
+        request = "GUI PyQt5, database SQLite, API REST, security JWT, test pytest"
+        session = new_session(engine, request)
+        tasks = session.plan.tasks
+
+        def report(task):
+            engine.report_task(session, task.id, "start")
+            engine.report_task(session, task.id, "complete", tokens_used=10)
+
+        with ThreadPoolExecutor(max_workers=len(tasks)) as pool:
+            list(pool.map(report, tasks))
+
+        assert len(session.results) == len(tasks)
+        assert engine.get_progress(session)["completed"] == len(tasks)
+        assert session.status == TaskStatus.COMPLETED
+
+    def test_concurrent_faults_share_one_session_object(self, engine):
+        session_id = new_session(engine).session_id
+        engine.flush()
+        engine.sessions.pop(session_id)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            loaded = list(pool.map(engine.get_session, [session_id] * 8))
+        assert all(s is loaded[0] for s in loaded)
+
+
+class TestEventListeners:
+
+    def test_estimator_learns_durations_for_new_plans(self, engine):
+        session = new_session(engine, "Aggiungi autenticazione JWT")
+        task = session.plan.tasks[0]
+        for seconds in (600, 600):
+            engine.events.publish(TaskEvent(
+                session.session_id, task.id, TASK_COMPLETED, task.agent_expert_file,
+                task.model, "2026-01-01T00:00:00", duration_seconds=seconds
+            ))
+
+        plan = engine.generate_execution_plan("Aggiungi autenticazione JWT")
+        assert plan.tasks[0].estimated_time == 10.0
+
+    def test_circuit_breaker_feed_batches_saves(self, tmp_path):
+        tracker = MetricTracker(tmp_path / "circuit-breaker.json")
+        saves = []
+        original_save = tracker.save
+        tracker.save = lambda backup=True: (saves.append(tracker._batch_depth), original_save(backup))
+
+        feed = CircuitBreakerFeed(tracker, window=0.05)
+        engine = OrchestratorEngine(store=SqliteSessionStore(":memory:"))
+        engine.events.subscribe(feed)
+        session = new_session(engine)
+        run_all(engine, session, fail={session.plan.tasks[0].id})
+        feed.flush()
+        feed.close()
+        engine.close()
+
+        data = json.loads((tmp_path / "circuit-breaker.json").read_text())
+        documenter = data["agents"]["core/documenter.md"]["metrics"]
+        assert documenter["tasks_successful"] == 1
+        assert data["metrics"]["failed"] == 1
+        # One real write per drained batch, not one per event
+        assert saves.count(0) == feed.batches
+        assert feed.batches < 2 * len(session.plan.tasks)
+
+    def test_tracker_snapshot_waits_for_the_batch(self, tmp_path):
+        tracker = MetricTracker(tmp_path / "circuit-breaker.json")
+        tracker.register_agent("coder", "core/coder.md")
+        with ThreadPoolExecutor(1) as pool:
+            with tracker.batch():
+                tracker.record_task_start("core/coder.md", "T1")
+                pending = pool.submit(tracker.snapshot_agents)
+                tracker.record_task_complete("core/coder.md", "2026-01-01T00:00:00")
+                assert not pending.done()
+            snapshot = pending.result(5)
+
+        metrics = snapshot["core/coder.md"]["metrics"]
+        assert (metrics["tasks_total"], metrics["tasks_successful"]) == (1, 1)
+        metrics["tasks_total"] = 99  # a copy
+        assert tracker.get_agent_metrics("core/coder.md")["metrics"]["tasks_total"] == 1
+
+
+class TestReportTool:
+
+    async def test_report_tool_round_trip(self):
+        from server import engine
+        plan = engine.generate_execution_plan("Ottimizza query PostgreSQL")
+        task_id = plan.tasks[0].id
+
+        out = await handle_call_tool("orchestrator_report", {
+            "session_id": plan.session_id, "task_id": task_id, "event": "start"
+        })
+        assert "in_progress" in out[0].text
+
+        out = await handle_call_tool("orchestrator_report", {
+            "session_id": plan.session_id, "task_id": task_id, "event": "complete",
+            "what_done": "Added index", "files_changed": ["db.sql"]
+        })
+        assert "Documentation: recorded" in out[0].text
+        assert engine.get_session(plan.session_id).task_docs[0].status == "success"
+
+        out = await handle_call_tool("orchestrator_report", {
+            "session_id": plan.session_id, "task_id": "T99", "event": "start"
+        })
+        assert out[0].text.startswith("❌")
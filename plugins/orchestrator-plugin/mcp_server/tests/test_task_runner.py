@@ -0,0 +1,280 @@
+"""
+Tests for the opt-in execution engine (orchestrator_execute with run=true).
+"""
+
+import os
+import shlex
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+from server import OrchestratorEngine, TaskStatus
+from session_store import SqliteSessionStore
+from task_runner import PopenSpawner, TaskRunner, parse_command_template, render_command
+
+# Stub agent: prints its arguments, sleeps, exits with the code in FAIL_<task>
+STUB = (
+    "import os, signal, sys, time; "
+    "os.environ.get('STUB_IGNORE_TERM') and signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+    "print(' | '.join(sys.argv[1:]), flush=True); "
+    "time.sleep(float(os.environ.get('STUB_SLEEP', '0'))); "
+    "sys.exit(int(os.environ.get('FAIL_' + sys.argv[1], '0')))"
+)
+TEMPLATE = f"{shlex.quote(sys.executable)} -c {shlex.quote(STUB)} {{task_id}} {{model}} {{description}}"
+REQUEST = "security audit JWT API REST database"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    e = OrchestratorEngine(store=SqliteSessionStore(str(tmp_path / "sessions.db")))
+    yield e
+    e.close()
+
+
+class CountingSpawner(PopenSpawner):
+    """Records how many spawned processes were alive at each spawn"""
+
+    def __init__(self):
+        self.procs = []
+        self.max_alive = 0
+
+    def spawn(self, command, **kwargs):
+        proc = super().spawn(command, **kwargs)
+        self.procs.append(proc)
+        self.max_alive = max(self.max_alive, sum(p.poll() is None for p in self.procs))
+        return proc
+
+
+def make_runner(engine, tmp_path, spawner=None, **env):
+    environ = dict(os.environ, **env)
+    return TaskRunner(engine, TEMPLATE, str(tmp_path / "runs"), spawner=spawner, env=environ)
+
+
+def wait_until_running(run, count):
+    """Until ``count`` task processes have started and written their first line"""
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        logs = [os.path.join(run.log_dir, f"{task_id}.log") for task_id in list(run.processes)]
+        if len(logs) >= count and all(os.path.getsize(log) for log in logs):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"{count} tasks did not start")
+
+
+class TestCommandTemplate:
+
+    def test_values_stay_single_arguments(self):
+        args = parse_command_template('agent -p "{description}" --model {model}')
+        command = render_command(args, {"description": "fix it; rm -rf {x} $HOME", "model": "haiku"})
+        assert command == ["agent", "-p", "fix it; rm -rf {x} $HOME", "--model", "haiku"]
+
+    def test_unknown_placeholders_are_rejected(self):
+        with pytest.raises(ValueError, match="placeholder"):
+            parse_command_template("agent {prompt}")
+        with pytest.raises(ValueError):
+            parse_command_template("   ")
+
+
+class TestTaskRunner:
+
+    def test_runs_every_task_and_records_results(self, engine, tmp_path):
+        runner = make_runner(engine, tmp_path)
+        plan = engine.generate_execution_plan(REQUEST)
+        try:
+            run = runner.start(engine.get_session(plan.session_id), parallel=4, model_override="opus")
+            runner.wait(plan.session_id, timeout=30)
+        finally:
+            runner.close()
+
+        session = engine.get_session(plan.session_id)
+        assert session.status == TaskStatus.COMPLETED
+        assert engine.get_progress(session)["completed"] == len(plan.tasks)
+        for task in plan.tasks:
+            with open(f"{run.log_dir}/{task.id}.log") as log:
+                assert log.read().strip() == f"{task.id} | opus | {task.description}"
+
+        # RULE #5: the documenter starts after every other task finished
+        results = {r["task_id"]: r for r in session.results}
+        documenter = results[plan.tasks[-1].id]
+        assert all(
+            datetime.fromisoformat(documenter["started_at"]) >= datetime.fromisoformat(r["completed_at"])
+            for task_id, r in results.items() if task_id != documenter["task_id"]
+        )
+
+    def test_parallelism_is_bounded(self, engine, tmp_path):
+        spawner = CountingSpawner()
+        runner = make_runner(engine, tmp_path, spawner, STUB_SLEEP="0.3")
+        plan = engine.generate_execution_plan(REQUEST)
+        try:
+            runner.start(engine.get_session(plan.session_id), parallel=2)
+            runner.wait(plan.session_id, timeout=30)
+        finally:
+            runner.close()
+        assert len(spawner.procs) == len(plan.tasks)
+        assert spawner.max_alive == 2
+
+    def test_running_session_is_not_evicted(self, engine, tmp_path):
+        runner = make_runner(engine, tmp_path, STUB_SLEEP="0.2")
+        engine.sessions.max_count = 2
+        plan = engine.generate_execution_plan(REQUEST)
+        session = engine.get_session(plan.session_id)
+        try:
+            run = runner.start(session, parallel=2)
+            wait_until_running(run, 1)
+            # Newer sessions push the running one out of an unpinned cache
+            for i in range(5):
+                engine.generate_execution_plan(f"Crea una GUI numero {i}")
+            engine.flush()
+            assert engine.get_session(plan.session_id) is session
+            runner.wait(plan.session_id, timeout=30)
+        finally:
+            runner.close()
+
+        assert engine.get_session(plan.session_id) is session
+        assert session.status == TaskStatus.COMPLETED
+        assert not engine.sessions.is_pinned(plan.session_id)
+        engine.flush()
+        assert engine.store.get(plan.session_id)["status"] == TaskStatus.COMPLETED.value
+
+    def test_exit_codes_fail_tasks(self, engine, tmp_path):
+        runner = make_runner(engine, tmp_path, FAIL_T1="3")
+        plan = engine.generate_execution_plan(REQUEST)
+        try:
+            runner.start(engine.get_session(plan.session_id), parallel=4)
+            runner.wait(plan.session_id, timeout=30)
+        finally:
+            runner.close()
+
+        session = engine.get_session(plan.session_id)
+        results = {r["task_id"]: r for r in session.results}
+        assert results["T1"]["status"] == TaskStatus.FAILED.value
+        assert results["T1"]["error"].startswith("Exit code 3")
+        # The documenter still consolidates what was done
+        assert results[plan.tasks[-1].id]["status"] == TaskStatus.COMPLETED.value
+        assert session.status == TaskStatus.FAILED
+
+    def test_one_run_per_session(self, engine, tmp_path):
+        runner = make_runner(engine, tmp_path, STUB_SLEEP="0.2")
+        session = engine.get_session(engine.generate_execution_plan(REQUEST).session_id)
+        try:
+            runner.start(session, parallel=1)
+            with pytest.raises(ValueError, match="already running"):
+                runner.start(session, parallel=1)
+        finally:
+            runner.close()
+
+
+class TestCancel:
+
+    def start_slow_run(self, engine, tmp_path, **env):
+        runner = make_runner(engine, tmp_path, STUB_SLEEP="30", **env)
+        session = engine.get_session(engine.generate_execution_plan(REQUEST).session_id)
+        run = runner.start(session, parallel=2)
+        wait_until_running(run, 2)
+        return runner, session, run
+
+    def test_cancel_stops_processes_and_drops_queued_tasks(self, engine, tmp_path):
+        runner, session, run = self.start_slow_run(engine, tmp_path)
+        running = [run.processes[task_id] for task_id in ("T1", "T2")]
+        try:
+            engine.cancel_session(session)
+            stopped = runner.cancel(session.session_id, grace=5)
+            assert (stopped["terminated"], stopped["killed"]) == (2, 0)
+            assert stopped["dropped"] == ["T3", "T4"]
+            assert all(proc.poll() is not None for proc in running)
+            assert stopped["quiescence_ms"] < 5000
+            assert runner.last_quiescence_ms == stopped["quiescence_ms"]
+
+            # The documenter (T4) is told to finalize the partial results
+            assert stopped["documenter"] == "T4"
+            wait_until_running(run, 3)
+            with open(os.path.join(run.log_dir, "T4.log")) as log:
+                assert "[PARTIAL] Session cancelled" in log.read()
+            runner.wait(session.session_id, timeout=5)
+            assert "T3" not in run.processes
+            statuses = {r["task_id"]: r["status"] for r in engine.get_session(session.session_id).results}
+            assert statuses == {"T1": TaskStatus.CANCELLED.value, "T2": TaskStatus.CANCELLED.value}
+        finally:
+            runner.close()
+
+    def test_processes_ignoring_sigterm_are_killed_after_the_grace_period(self, engine, tmp_path):
+        runner, session, run = self.start_slow_run(engine, tmp_path, STUB_IGNORE_TERM="1")
+        try:
+            engine.cancel_session(session)
+            stopped = runner.cancel(session.session_id, grace=0.2)
+            assert (stopped["terminated"], stopped["killed"]) == (0, 2)
+            assert stopped["quiescence_ms"] >= 200
+        finally:
+            runner.close()
+
+    def test_cancel_of_an_unknown_run(self, engine, tmp_path):
+        runner = make_runner(engine, tmp_path)
+        assert runner.cancel("20260101-000000-abcdef") is None
+
+
+class TestExecuteTool:
+
+    async def test_run_needs_a_configured_command(self, monkeypatch):
+        import server
+
+        monkeypatch.setattr(server, "EXEC_COMMAND", "")
+        monkeypatch.setattr(server, "_task_runner", None)
+        result = await server.handle_call_tool("orchestrator_execute", {"request": REQUEST, "run": True})
+        assert "ORCHESTRATOR_EXEC_COMMAND" in result[0].text
+
+    async def test_run_launches_the_plan(self, monkeypatch):
+        import server
+
+        monkeypatch.setattr(server, "EXEC_COMMAND", TEMPLATE)
+        monkeypatch.setattr(server, "_task_runner", None)
+        try:
+            content, data = await server.handle_call_tool(
+                "orchestrator_execute", {"request": REQUEST, "run": True, "output": "json"}
+            )
+            assert data["execution"]["log_dir"].endswith(data["session_id"])
+            server.get_task_runner().wait(data["session_id"], timeout=30)
+            status = await server.handle_call_tool(
+                "orchestrator_status", {"session_id": data["session_id"], "output": "json"}
+            )
+            assert status[1]["status"] == TaskStatus.COMPLETED.value
+
+            text = await server.handle_call_tool("orchestrator_execute", {"request": REQUEST, "run": True})
+            assert "EXECUTING ON THE SERVER" in text[0].text
+            assert "NEXT STEP" not in text[0].text
+        finally:
+            server.get_task_runner().close()
+
+    async def test_cancel_reports_what_was_stopped(self, monkeypatch):
+        import server
+
+        monkeypatch.setattr(server, "EXEC_COMMAND", TEMPLATE)
+        monkeypatch.setattr(server, "_task_runner", None)
+        monkeypatch.setenv("STUB_SLEEP", "30")
+        try:
+            _, data = await server.handle_call_tool(
+                "orchestrator_execute", {"request": REQUEST, "run": True, "parallel": 2, "output": "json"}
+            )
+            wait_until_running(server.get_task_runner().get_run(data["session_id"]), 2)
+            _, cancelled = await server.handle_call_tool(
+                "orchestrator_cancel", {"session_id": data["session_id"], "output": "json"}
+            )
+            assert cancelled["terminated"] == 2 and cancelled["dropped"] == ["T3", "T4"]
+            assert cancelled["documenter"] == "T4" and cancelled["documenter_launched"]
+            assert cancelled["quiescence_ms"] > 0
+        finally:
+            server.get_task_runner().close()
+
+    async def test_cancel_without_the_engine_asks_for_the_documenter(self, monkeypatch):
+        import server
+
+        monkeypatch.setattr(server, "_task_runner", None)
+        plan = server.engine.generate_execution_plan(REQUEST)
+        session = server.engine.get_session(plan.session_id)
+        server.engine.report_task(session, "T1", "start")
+        server.engine.report_task(session, "T1", "complete")
+        text = await server.handle_call_tool("orchestrator_cancel", {"session_id": plan.session_id})
+        assert text[0].text.startswith(f"✅ Session {plan.session_id} cancelled successfully")
+        assert "Launch T4 (core/documenter.md) to finalize partial results of: T1" in text[0].text
+        assert "Quiescent in" in text[0].text
@@ -0,0 +1,76 @@
+"""
+Tests for the runtime telemetry (orchestrator_metrics, orchestrator://metrics).
+"""
+
+import asyncio
+import json
+import time
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from telemetry import LoopLagMonitor, hit_rate, process_stats
+
+
+class TestTelemetry:
+
+    async def test_loop_lag_shows_a_blocked_loop(self):
+        monitor = LoopLagMonitor(interval=0.01)
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.05)
+        assert monitor.running
+        time.sleep(0.1)  # blocks the loop
+        await asyncio.sleep(0.03)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        snapshot = monitor.snapshot()
+        assert not snapshot["running"]
+        assert snapshot["samples"] >= 3
+        assert snapshot["max_ms"] >= 80
+
+    def test_process_stats(self):
+        stats = process_stats()
+        assert stats["rss_bytes"] > 1024 * 1024
+        assert stats["threads"] >= 1
+        assert len(stats["gc"]["collections"]) == 3
+
+    def test_hit_rate(self):
+        assert hit_rate(0, 0) is None
+        assert hit_rate(3, 1) == 0.75
+
+
+class TestMetricsTool:
+
+    async def test_counters_follow_tool_calls(self):
+        import server
+
+        before = server.tool_timing.histogram("orchestrator_agents").count
+        await server.handle_call_tool("orchestrator_agents", {})
+        await server.handle_call_tool("orchestrator_agents", {})
+        _, metrics = await server.handle_call_tool("orchestrator_metrics", {"output": "json"})
+
+        assert metrics["tools"]["orchestrator_agents"]["count"] == before + 2
+        assert metrics["caches"]["responses"]["hits"] >= 1
+        assert 0 < metrics["caches"]["responses"]["hit_rate"] <= 1
+        assert metrics["store"]["backend"] == server.SESSION_BACKEND
+        assert metrics["admission"]["max_inflight"] == server.ADMISSION_MAX_INFLIGHT
+        assert set(metrics["single_flight"]) == {"executions", "coalesced", "inflight"}
+        assert metrics["process_manager"]["available"] == server.PROCESS_MANAGER_AVAILABLE
+        assert metrics["process"]["rss_bytes"] > 0
+
+        text = await server.handle_call_tool("orchestrator_metrics", {})
+        assert "| orchestrator_agents |" in text[0].text
+        assert "Event loop lag" in text[0].text
+
+    async def test_resource_returns_current_figures(self):
+        import server
+
+        async with create_connected_server_and_client_session(server.server) as client:
+            first = json.loads((await client.read_resource("orchestrator://metrics")).contents[0].text)
+            await client.call_tool("orchestrator_status", {})
+            second = json.loads((await client.read_resource("orchestrator://metrics")).contents[0].text)
+
+        def calls(metrics):
+            return metrics["tools"].get("orchestrator_status", {}).get("count", 0)
+
+        assert calls(second) == calls(first) + 1
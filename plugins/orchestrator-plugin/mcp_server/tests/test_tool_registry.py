@@ -0,0 +1,434 @@
+"""
+Tests for the tool handler registry and its middleware pipeline.
+"""
+
+import asyncio
+import contextvars
+import json
+import threading
+import time
+
+import pytest
+
+from tool_registry import (
+    AdmissionMiddleware,
+    LatencyHistogram,
+    ResponseCacheMiddleware,
+    SingleFlightMiddleware,
+    TimingMiddleware,
+    ToolError,
+    ToolHandler,
+    ToolRegistry,
+    compact_text,
+    output_mode,
+)
+
+
+class EchoTool(ToolHandler):
+    name = "echo"
+    description = "Echo the text argument"
+    pure = True
+
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, arguments):
+        self.calls += 1
+        if arguments.get("fail"):
+            raise ToolError("Error: asked to fail")
+        if arguments.get("crash"):
+            raise RuntimeError("boom")
+        return arguments.get("text", "")
+
+
+class SlowTool(ToolHandler):
+    name = "slow"
+
+    async def run(self, arguments):
+        await asyncio.sleep(0.01)
+        return "done"
+
+
+REQUEST_ID = contextvars.ContextVar("request_id", default=None)
+
+
+class BlockingTool(ToolHandler):
+    name = "blocking"
+    blocking = True
+
+    def run(self, arguments):
+        time.sleep(arguments.get("sleep", 0))
+        return f"{threading.current_thread().name} {REQUEST_ID.get()}"
+
+
+class PlanTool(ToolHandler):
+    name = "plan"
+    blocking = True
+
+    def run(self, arguments):
+        if output_mode(arguments) == "full":
+            return "BANNER\nplan p1 with 2 tasks"
+        return {"id": "p1", "domains": ["GUI", "Database"], "tasks": [
+            {"id": "T1", "model": "sonnet"}, {"id": "T2", "model": "haiku"}
+        ]}
+
+
+@pytest.fixture
+def pipeline():
+    timing, cache = TimingMiddleware(), ResponseCacheMiddleware()
+    registry = ToolRegistry(middleware=[timing, cache])
+    echo, slow = registry.register(EchoTool()), registry.register(SlowTool())
+    return registry, timing, cache, echo, slow
+
+
+class TestToolRegistry:
+
+    async def test_lists_tools_in_registration_order(self, pipeline):
+        registry = pipeline[0]
+        assert [t.name for t in registry.list_tools()] == ["echo", "slow"]
+        with pytest.raises(ValueError):
+            registry.register(EchoTool())
+
+    async def test_uniform_errors(self, pipeline):
+        registry, timing = pipeline[0], pipeline[1]
+
+        assert (await registry.call("echo", {"fail": True}))[0].text == "❌ Error: asked to fail"
+        assert (await registry.call("echo", {"crash": True}))[0].text == "❌ Error executing echo: boom"
+        assert (await registry.call("nope", {}))[0].text == "❌ Unknown tool: nope"
+        assert timing.histograms["echo"].errors == 2
+
+    async def test_pure_tool_responses_are_cached(self, pipeline):
+        registry, _, cache, echo, _ = pipeline
+
+        for arguments in ({"text": "a", "x": 1}, {"x": 1, "text": "a"}, {"text": "b"}):
+            await registry.call("echo", arguments)
+
+        assert echo.calls == 2
+        assert (cache.hits, cache.misses) == (1, 2)
+        cache.invalidate("echo")
+        await registry.call("echo", {"text": "b"})
+        assert echo.calls == 3
+
+    async def test_latency_is_recorded_per_tool(self, pipeline):
+        registry, timing = pipeline[0], pipeline[1]
+        await registry.call("slow", {})
+        await registry.call("echo", {"text": "x"})
+
+        snapshot = timing.histograms["slow"].snapshot()
+        assert snapshot["count"] == 1
+        assert snapshot["max_ms"] >= 10
+        assert timing.histograms["echo"].count == 1
+
+    async def test_blocking_tools_run_off_the_event_loop(self, pipeline):
+        registry, timing = pipeline[0], pipeline[1]
+        registry.register(BlockingTool())
+        REQUEST_ID.set("req-1")
+
+        slow = asyncio.ensure_future(registry.call("blocking", {"sleep": 0.3}))
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await registry.call("echo", {"text": "still responsive"})
+        assert time.perf_counter() - start < 0.1
+        assert not slow.done()
+
+        thread_name, request_id = (await slow)[0].text.split()
+        assert thread_name != threading.current_thread().name
+        assert request_id == "req-1"
+        assert timing.histograms["blocking"].max_ms >= 300
+
+
+class LookupTool(ToolHandler):
+    name = "lookup"
+    read_only = True
+
+    def __init__(self, delay=0.05):
+        self.runs = 0
+        self.version = 0
+        self.delay = delay
+
+    def state_version(self):
+        return self.version
+
+    async def run(self, arguments):
+        self.runs += 1
+        await asyncio.sleep(self.delay)
+        if arguments.get("fail"):
+            raise ToolError("Error: lookup failed")
+        return f"{arguments.get('key')}@{self.version}"
+
+
+class WriteTool(LookupTool):
+    name = "write"
+    read_only = False
+
+
+def single_flight_registry(*tools):
+    single_flight = SingleFlightMiddleware()
+    registry = ToolRegistry(middleware=[single_flight])
+    for tool in tools:
+        registry.register(tool)
+    return registry, single_flight
+
+
+class TestSingleFlight:
+
+    async def test_identical_concurrent_calls_share_one_run(self):
+        lookup = LookupTool()
+        registry, single_flight = single_flight_registry(lookup)
+
+        results = await asyncio.gather(
+            *[registry.call("lookup", {"key": "a"}) for _ in range(5)],
+            registry.call("lookup", {"key": "b"}),
+        )
+
+        assert [r[0].text for r in results] == ["a@0"] * 5 + ["b@0"]
+        assert lookup.runs == 2
+        assert (single_flight.executions, single_flight.coalesced) == (2, 4)
+        assert single_flight.inflight == 0
+        # Later calls run again
+        await registry.call("lookup", {"key": "a"})
+        assert lookup.runs == 3
+
+    async def test_errors_are_shared_and_side_effects_excluded(self):
+        lookup, write = LookupTool(), WriteTool()
+        registry, _ = single_flight_registry(lookup, write)
+
+        failed = await asyncio.gather(*[registry.call("lookup", {"fail": True}) for _ in range(3)])
+        writes = await asyncio.gather(*[registry.call("write", {"key": "a"}) for _ in range(3)])
+
+        assert {r[0].text for r in failed} == {"❌ Error: lookup failed"}
+        assert lookup.runs == 1
+        # Writes are never coalesced: each call runs and gets its own result
+        assert write.runs == 3
+        assert [r[0].text for r in writes] == ["a@0"] * 3
+
+    async def test_calls_after_a_state_change_run_again(self):
+        lookup = LookupTool()
+        registry, _ = single_flight_registry(lookup)
+
+        first = asyncio.ensure_future(registry.call("lookup", {"key": "a"}))
+        await asyncio.sleep(0.01)
+        lookup.version = 1  # a write landed while the first call was running
+        second = await registry.call("lookup", {"key": "a"})
+
+        assert lookup.runs == 2
+        assert second[0].text == "a@1"
+        await first
+
+    async def test_a_cancelled_caller_does_not_cancel_the_others(self):
+        lookup = LookupTool()
+        registry, _ = single_flight_registry(lookup)
+
+        leader = asyncio.ensure_future(registry.call("lookup", {"key": "a"}))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(registry.call("lookup", {"key": "a"}))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert (await follower)[0].text == "a@0"
+        assert lookup.runs == 1
+
+
+class HoldTool(ToolHandler):
+    name = "hold"
+
+    def __init__(self, name="hold"):
+        self.name = name
+        self.active = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+
+    async def run(self, arguments):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.wait_for(self.release.wait(), arguments.get("hold", 5))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.active -= 1
+        return "done"
+
+
+def admission_registry(*tools, **options):
+    admission = AdmissionMiddleware(**options)
+    registry = ToolRegistry(middleware=[admission])
+    for tool in tools:
+        registry.register(tool)
+    return registry, admission
+
+
+class TestAdmission:
+
+    async def test_global_cap_queues_the_rest(self):
+        hold = HoldTool()
+        registry, admission = admission_registry(hold, max_inflight=2)
+
+        calls = [asyncio.ensure_future(registry.call("hold", {})) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        assert (admission.inflight, admission.queued) == (2, 3)
+        hold.release.set()
+        results = await asyncio.gather(*calls)
+
+        assert [r[0].text for r in results] == ["done"] * 5
+        assert hold.peak == 2
+        assert admission.snapshot()["max_queued"] == 3
+        assert (admission.inflight, admission.queued, admission.admitted) == (0, 0, 5)
+
+    async def test_full_queue_answers_busy_at_once(self):
+        hold = HoldTool()
+        registry, admission = admission_registry(hold, max_inflight=1, max_queue=1)
+
+        running = asyncio.ensure_future(registry.call("hold", {}))
+        queued = asyncio.ensure_future(registry.call("hold", {}))
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        busy = await registry.call("hold", {})
+        assert time.perf_counter() - start < 0.05
+
+        assert busy[0].text.startswith("❌ Server busy: 1 calls running, 1 queued - retry after ")
+        assert busy[0].text.endswith(" ms")
+        assert admission.rejected == 1
+        hold.release.set()
+        await asyncio.gather(running, queued)
+
+    async def test_queue_timeout(self):
+        hold = HoldTool()
+        registry, admission = admission_registry(hold, max_inflight=1, queue_timeout=0.02)
+
+        running = asyncio.ensure_future(registry.call("hold", {}))
+        await asyncio.sleep(0.01)
+        late = await registry.call("hold", {})
+
+        assert "no slot within 0.02s" in late[0].text
+        assert (admission.timed_out, admission.queued) == (1, 0)
+        hold.release.set()
+        await running
+
+    async def test_per_tool_caps_do_not_block_other_tools(self):
+        capped, other = HoldTool("capped"), HoldTool("other")
+        registry, admission = admission_registry(capped, other, tool_limits={"capped": 1})
+
+        calls = [asyncio.ensure_future(registry.call("capped", {})) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        other.release.set()
+        assert (await registry.call("other", {}))[0].text == "done"
+
+        assert admission.snapshot()["tool_inflight"] == {"capped": 1}
+        capped.release.set()
+        await asyncio.gather(*calls)
+        assert capped.peak == 1
+
+    async def test_cancelled_waiters_leave_the_queue(self):
+        hold = HoldTool()
+        registry, admission = admission_registry(hold, max_inflight=1)
+
+        running = asyncio.ensure_future(registry.call("hold", {}))
+        waiting = asyncio.ensure_future(registry.call("hold", {}))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.sleep(0)
+        assert admission.queued == 0
+
+        hold.release.set()
+        await running
+        assert (await registry.call("hold", {}))[0].text == "done"
+        assert admission.inflight == 0
+
+
+class TestOutputModes:
+
+    async def test_modes(self):
+        registry = ToolRegistry()
+        registry.register(PlanTool())
+
+        full = await registry.call("plan", {})
+        compact = await registry.call("plan", {"output": "compact"})
+        content, structured = await registry.call("plan", {"output": "json"})
+
+        assert full[0].text.startswith("BANNER")
+        assert compact[0].text == (
+            "id: p1\ndomains: GUI,Database\ntasks[2]: id|model\nT1|sonnet\nT2|haiku"
+        )
+        assert structured["tasks"][1] == {"id": "T2", "model": "haiku"}
+        assert json.loads(content[0].text) == structured
+
+    async def test_unknown_mode_and_schema(self):
+        registry = ToolRegistry()
+        registry.register(PlanTool())
+        out = await registry.call("plan", {"output": "xml"})
+        assert out[0].text.startswith("❌ Error: 'output' must be one of")
+        schema = registry.list_tools()[0].inputSchema
+        assert schema["properties"]["output"]["enum"] == ["full", "compact", "json"]
+        assert "output" not in PlanTool.input_schema["properties"]  # class schema untouched
+
+    def test_compact_text_flattens_nested_data(self):
+        assert compact_text({"progress": {"done": 1, "total": 2}, "cost": 0.5, "cursor": None}) == (
+            "progress.done: 1\nprogress.total: 2\ncost: 0.5\ncursor: -"
+        )
+
+
+class TestLatencyHistogram:
+
+    def test_quantiles_use_bucket_bounds(self):
+        histogram = LatencyHistogram(buckets=(1, 10, 100))
+        for ms in [0.5] * 50 + [5] * 45 + [50] * 4 + [500]:
+            histogram.record(ms)
+
+        assert histogram.quantile(0.5) == 1
+        assert histogram.quantile(0.95) == 10
+        assert histogram.quantile(1.0) == 500
+        assert histogram.snapshot()["buckets"] == {"1": 50, "10": 45, "100": 4, "+Inf": 1}
+
+
+class TestServerTools:
+
+    async def test_every_tool_is_registered(self):
+        from server import handle_list_tools
+        names = [t.name for t in await handle_list_tools()]
+        assert names[:3] == ["orchestrator_analyze", "orchestrator_execute", "orchestrator_status"]
+        assert {"orchestrator_search", "orchestrator_report", "orchestrator_agents"} <= set(names)
+
+    async def test_agents_listing_is_cached(self):
+        from server import handle_call_tool, tool_cache
+        hits = tool_cache.hits
+        first = await handle_call_tool("orchestrator_agents", {"filter": "gui"})
+        second = await handle_call_tool("orchestrator_agents", {"filter": "gui"})
+        assert first[0].text == second[0].text
+        assert tool_cache.hits == hits + 1
+
+    async def test_compact_and_json_drop_the_banners(self):
+        from server import handle_call_tool
+        request = {"request": "GUI PyQt5 con database SQLite"}
+        full = (await handle_call_tool("orchestrator_execute", request))[0].text
+        compact = (await handle_call_tool("orchestrator_execute", {**request, "output": "compact"}))[0].text
+        content, plan = await handle_call_tool("orchestrator_execute", {**request, "output": "json"})
+
+        assert "MANDATORY FINAL STEP" in full
+        assert "MANDATORY FINAL STEP" not in compact and "╔" not in compact
+        assert len(compact) * 2 < len(full)
+        assert plan["final_task"] == plan["tasks"][-1]["id"]
+        assert plan["tasks"][-1]["expert"] == "core/documenter.md"
+        assert {"GUI", "Database"} <= set(plan["domains"])
+
+    async def test_json_output_reaches_clients_as_structured_content(self):
+        from mcp.shared.memory import create_connected_server_and_client_session
+
+        import server
+
+        async with create_connected_server_and_client_session(server.server) as client:
+            analyzed = await client.call_tool(
+                "orchestrator_analyze", {"request": "database SQLite", "output": "json"}
+            )
+            status = await client.call_tool(
+                "orchestrator_status",
+                {"session_id": analyzed.structuredContent["session_id"], "output": "compact"}
+            )
+        assert analyzed.structuredContent["total_tasks"] == len(analyzed.structuredContent["tasks"])
+        assert status.structuredContent is None
+        assert f"session_id: {analyzed.structuredContent['session_id']}" in status.content[0].text
+
+    async def test_missing_argument_message(self):
+        from server import handle_call_tool
+        out = await handle_call_tool("orchestrator_analyze", {})
+        assert out[0].text == "❌ Error: 'request' parameter is required"
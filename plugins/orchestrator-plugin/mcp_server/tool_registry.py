@@ -0,0 +1,538 @@
+"""
+TOOL REGISTRY
+=============
+
+Registry of MCP tool handler objects behind a middleware pipeline.
+
+Every registered tool gets, without any code of its own:
+- uniform error handling (ToolError -> "❌ ..." text, crashes logged)
+- per-tool latency histograms and call/error counters
+- admission control: a global in-flight cap, per-tool caps
+  (``ToolHandler.max_concurrency``) and a bounded wait queue answering
+  "busy, retry after N ms" when full
+- response caching for pure tools (``ToolHandler.pure``)
+- single-flight coalescing of identical concurrent calls of read-only
+  tools (``ToolHandler.read_only``)
+- execution on a worker thread for blocking tools (``ToolHandler.blocking``)
+- an ``output`` argument selecting full text, compact text or structured
+  JSON content (see OUTPUT_MODES)
+
+Author: LeoDg
+Version: 1.0.0
+"""
+
+import asyncio
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+from mcp.types import TextContent, Tool
+
+logger = logging.getLogger("orchestrator-mcp")
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Response formats: the full human-oriented text, the plan data only as
+# terse text, or the plan data as MCP structured content
+OUTPUT_MODES = ("full", "compact", "json")
+OUTPUT_PROPERTY = {
+    "type": "string",
+    "description": "Response format: full text, compact text (data only) or json (structured content)",
+    "enum": list(OUTPUT_MODES),
+    "default": "full"
+}
+
+
+class ToolError(Exception):
+    """Expected failure of a tool call; the message is shown to the client as is."""
+
+
+class ServerBusyError(ToolError):
+    """Call refused by admission control; the client should retry later."""
+
+    def __init__(self, message: str, retry_after_ms: int) -> None:
+        super().__init__(f"{message} - retry after {retry_after_ms} ms")
+        self.retry_after_ms = retry_after_ms
+
+
+class ToolHandler:
+    """
+    Base class of MCP tools.
+
+    Subclasses set ``name``, ``description`` and ``input_schema`` and
+    implement ``run``, returning the response text. ``pure`` tools depend
+    only on their arguments (responses are cached); ``read_only`` tools
+    change no state, so identical concurrent calls may share one run (as
+    long as ``state_version`` is unchanged);
+    ``max_concurrency`` bounds simultaneous calls (None = unlimited).
+
+    ``blocking`` tools do CPU-heavy work or disk I/O: they implement ``run``
+    as a plain method, which the registry calls on a worker thread so the
+    event loop keeps serving other calls.
+
+    Every tool accepts ``output`` (see OUTPUT_MODES). Outside ``full`` mode
+    ``run`` may return its data as a dict instead of text; the registry
+    renders it with ``render_compact`` or sends it as structured content.
+    """
+
+    name: str = ""
+    description: str = ""
+    input_schema: Dict[str, Any] = {"type": "object", "properties": {}}
+    pure: bool = False
+    read_only: bool = False
+    max_concurrency: Optional[int] = None
+    blocking: bool = False
+
+    async def run(self, arguments: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+        raise NotImplementedError
+
+    def state_version(self) -> Hashable:
+        """Version of the state a read-only tool reads (None = not tracked)"""
+        return None
+
+    def render_compact(self, data: Dict[str, Any]) -> str:
+        return compact_text(data)
+
+    def as_tool(self) -> Tool:
+        schema = dict(self.input_schema)
+        schema["properties"] = {**schema.get("properties", {}), "output": OUTPUT_PROPERTY}
+        return Tool(name=self.name, description=self.description, inputSchema=schema)
+
+
+# Pipeline result: text, or structured data in json mode
+Response = Union[str, Dict[str, Any]]
+# Middleware: async (handler, arguments, call_next) -> response
+Next = Callable[[ToolHandler, Dict[str, Any]], Awaitable[Response]]
+Middleware = Callable[[ToolHandler, Dict[str, Any], Next], Awaitable[Response]]
+
+
+def canonical_arguments(arguments: Dict[str, Any]) -> str:
+    """Stable key for a set of arguments (key order and whitespace independent)"""
+    return json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def output_mode(arguments: Dict[str, Any]) -> str:
+    mode = arguments.get("output") or "full"
+    if mode not in OUTPUT_MODES:
+        raise ToolError(f"Error: 'output' must be one of {', '.join(OUTPUT_MODES)}")
+    return mode
+
+
+def _compact_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:g}"
+    if isinstance(value, (list, tuple)):
+        return ",".join(_compact_value(v) for v in value) or "-"
+    if value is None or value == "":
+        return "-"
+    return str(value)
+
+
+def compact_text(data: Dict[str, Any], prefix: str = "") -> str:
+    """
+    Terse rendering of tool data: one ``key: value`` line per field, and
+    lists of records as a column header followed by one ``|`` row each.
+    """
+    lines = []
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            lines.append(compact_text(value, f"{name}."))
+        elif isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+            lines.append(f"{name}[{len(value)}]: {'|'.join(value[0])}")
+            lines.extend("|".join(_compact_value(v) for v in row.values()) for row in value)
+        else:
+            lines.append(f"{name}: {_compact_value(value)}")
+    return "\n".join(line for line in lines if line)
+
+
+def render_response(handler: ToolHandler, result: Union[str, Dict[str, Any]], mode: str) -> Response:
+    """Apply the output mode to what a handler returned"""
+    if isinstance(result, str):
+        return result
+    if mode == "json":
+        return result
+    if mode == "compact":
+        return handler.render_compact(result)
+    # A handler that ignores the mode still answers in full mode
+    return json.dumps(result, indent=2, default=str)
+
+
+# =============================================================================
+# MIDDLEWARE
+# =============================================================================
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording is O(log buckets) and lock-protected."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last bucket: +Inf
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float, error: bool = False) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            if error:
+                self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """Bucket upper bound below which ``q`` of the calls fall"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for bound, count in zip(self.buckets, self.counts):
+                seen += count
+                if seen >= rank:
+                    return float(bound)
+            return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {
+                "count": self.count,
+                "errors": self.errors,
+                "total_ms": round(self.total_ms, 3),
+                "max_ms": round(self.max_ms, 3),
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+            }
+        snapshot["p50_ms"] = self.quantile(0.5)
+        snapshot["p99_ms"] = self.quantile(0.99)
+        return snapshot
+
+
+class TimingMiddleware:
+    """Per-tool latency histograms; calls that end in an error are counted as errors."""
+
+    def __init__(self) -> None:
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    async def __call__(self, handler: ToolHandler, arguments: Dict[str, Any], call_next: Next) -> Response:
+        start = time.perf_counter()
+        error = True
+        try:
+            response = await call_next(handler, arguments)
+            error = False
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            self.histogram(handler.name).record(elapsed_ms, error)
+            logger.debug("Tool %s %s in %.2f ms", handler.name, "failed" if error else "finished", elapsed_ms)
+
+
+class SingleFlightMiddleware:
+    """
+    Identical concurrent calls (same tool, same canonical arguments) of
+    read-only or pure tools share one execution and its result or error.
+    A call arriving after the tool's ``state_version`` changed starts a
+    new execution, so it never gets a result computed before a write.
+
+    The shared call runs as its own task: a caller that gives up (client
+    cancellation) does not cancel it for the callers still waiting.
+    """
+
+    def __init__(self) -> None:
+        self.executions = 0
+        self.coalesced = 0
+        self._inflight: Dict[tuple, "asyncio.Future[Response]"] = {}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def __call__(self, handler: ToolHandler, arguments: Dict[str, Any], call_next: Next) -> Response:
+        if not (handler.read_only or handler.pure):
+            return await call_next(handler, arguments)
+        key = (handler.name, canonical_arguments(arguments), handler.state_version())
+        shared = self._inflight.get(key)
+        if shared is None or shared.done():
+            self.executions += 1
+            shared = asyncio.ensure_future(call_next(handler, arguments))
+            self._inflight[key] = shared
+            shared.add_done_callback(functools.partial(self._finished, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(shared)
+
+    def _finished(self, key: tuple, shared: "asyncio.Future[Response]") -> None:
+        if self._inflight.get(key) is shared:
+            del self._inflight[key]
+        if not shared.cancelled():
+            shared.exception()  # retrieved even if every caller gave up
+
+
+class AdmissionMiddleware:
+    """
+    Admission control and backpressure.
+
+    A call runs when fewer than ``max_inflight`` calls run in total and its
+    tool is below its cap (``tool_limits`` override, else the handler's
+    ``max_concurrency``). Otherwise it waits in a FIFO queue of at most
+    ``max_queue`` calls for up to ``queue_timeout`` seconds. A call that
+    finds the queue full, or waits too long, fails fast with
+    ServerBusyError and a retry hint derived from recent service times.
+
+    State lives in plain counters and per-call futures, so one instance
+    works across event loops.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 32,
+        max_queue: int = 256,
+        queue_timeout: float = 10.0,
+        tool_limits: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.tool_limits = dict(tool_limits or {})
+        self.inflight = 0
+        self.max_queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.service_ms = 0.0  # moving average of admitted calls
+        self._tool_inflight: Dict[str, int] = {}
+        self._waiters: "deque[tuple]" = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def limit(self, handler: ToolHandler) -> Optional[int]:
+        return self.tool_limits.get(handler.name, handler.max_concurrency)
+
+    def retry_after_ms(self) -> int:
+        """Rough time for the queue ahead to drain"""
+        estimate = max(self.service_ms, 1.0) * (1 + self.queued) / self.max_inflight
+        return int(min(max(estimate, 10.0), 30000.0))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "inflight": self.inflight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "service_ms": round(self.service_ms, 3),
+            "max_inflight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "tool_inflight": {k: v for k, v in self._tool_inflight.items() if v},
+        }
+
+    def _can_run(self, name: str, limit: Optional[int]) -> bool:
+        return self.inflight < self.max_inflight and (
+            limit is None or self._tool_inflight.get(name, 0) < limit
+        )
+
+    def _start(self, name: str) -> None:
+        self.inflight += 1
+        self._tool_inflight[name] = self._tool_inflight.get(name, 0) + 1
+        self.admitted += 1
+
+    def _finish(self, name: str) -> None:
+        self.inflight -= 1
+        self._tool_inflight[name] -= 1
+        # Wake queued calls in order; a capped tool does not block the others
+        for entry in list(self._waiters):
+            waiter_name, limit, waiter = entry
+            if waiter.done():
+                self._waiters.remove(entry)
+            elif self._can_run(waiter_name, limit):
+                self._waiters.remove(entry)
+                self._start(waiter_name)
+                waiter.set_result(True)
+            if self.inflight >= self.max_inflight:
+                break
+
+    def _expire(self, entry: tuple) -> None:
+        if not entry[2].done():
+            self._waiters.remove(entry)
+            entry[2].set_result(False)
+
+    async def _wait(self, name: str, limit: Optional[int]) -> None:
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise ServerBusyError(
+                f"Server busy: {self.inflight} calls running, {self.queued} queued",
+                self.retry_after_ms()
+            )
+        loop = asyncio.get_running_loop()
+        entry = (name, limit, loop.create_future())
+        self._waiters.append(entry)
+        self.max_queued = max(self.max_queued, self.queued)
+        timer = loop.call_later(self.queue_timeout, self._expire, entry)
+        try:
+            admitted = await entry[2]
+        except asyncio.CancelledError:
+            waiter = entry[2]
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self._finish(name)  # admitted just as the caller gave up
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+            raise
+        finally:
+            timer.cancel()
+        if not admitted:
+            self.timed_out += 1
+            raise ServerBusyError(
+                f"Server busy: no slot within {self.queue_timeout:g}s", self.retry_after_ms()
+            )
+
+    async def __call__(self, handler: ToolHandler, arguments: Dict[str, Any], call_next: Next) -> Response:
+        limit = self.limit(handler)
+        # Queued calls are all blocked by a cap this call would hit too, or
+        # by another tool's cap: running now overtakes nobody who could run
+        if self._can_run(handler.name, limit):
+            self._start(handler.name)
+        else:
+            await self._wait(handler.name, limit)
+        start = time.perf_counter()
+        try:
+            return await call_next(handler, arguments)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            self.service_ms += 0.1 * (elapsed_ms - self.service_ms)
+            self._finish(handler.name)
+
+
+class ResponseCacheMiddleware:
+    """
+    LRU cache of responses of pure tools, keyed by tool name and canonical
+    arguments (so each output mode is cached separately).
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, Response]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget cached responses of one tool (or of all tools)"""
+        if name is None:
+            self._entries.clear()
+        else:
+            for key in [k for k in self._entries if k[0] == name]:
+                del self._entries[key]
+
+    async def __call__(self, handler: ToolHandler, arguments: Dict[str, Any], call_next: Next) -> Response:
+        if not handler.pure:
+            return await call_next(handler, arguments)
+        key = (handler.name, canonical_arguments(arguments))
+        response = self._entries.get(key)
+        if response is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+        self.misses += 1
+        response = await call_next(handler, arguments)
+        self._entries[key] = response
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return response
+
+
+# =============================================================================
+# REGISTRY
+# =============================================================================
+
+class ToolRegistry:
+    """
+    Ordered collection of tool handlers sharing one middleware pipeline.
+
+    Middleware run outermost first; errors are handled around the whole
+    pipeline so every tool answers failures the same way. Blocking tools
+    run on ``executor`` (None = the event loop's default executor) with
+    the caller's context variables, so request-scoped state stays visible.
+    """
+
+    def __init__(
+        self,
+        middleware: Optional[List[Middleware]] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.handlers: Dict[str, ToolHandler] = {}
+        self.middleware: List[Middleware] = list(middleware or [])
+        self.executor = executor
+
+    def register(self, handler: ToolHandler) -> ToolHandler:
+        if handler.name in self.handlers:
+            raise ValueError(f"Tool '{handler.name}' already registered")
+        self.handlers[handler.name] = handler
+        return handler
+
+    def list_tools(self) -> List[Tool]:
+        return [handler.as_tool() for handler in self.handlers.values()]
+
+    async def call(
+        self, name: str, arguments: Optional[Dict[str, Any]]
+    ) -> Union[List[TextContent], Tuple[List[TextContent], Dict[str, Any]]]:
+        """
+        Run a tool. Text responses come back as content; json mode answers
+        with (content, structured content), the content holding the same
+        data serialized for clients without structured content support.
+        """
+        handler = self.handlers.get(name)
+        if handler is None:
+            return [TextContent(type="text", text=f"❌ Unknown tool: {name}")]
+        try:
+            response = await self._dispatch(0, handler, arguments or {})
+        except ToolError as e:
+            response = f"❌ {e}"
+        except Exception as e:
+            logger.exception("Error executing tool %s", name)
+            response = f"❌ Error executing {name}: {str(e)}"
+        if isinstance(response, dict):
+            text = json.dumps(response, separators=(",", ":"), ensure_ascii=False)
+            return [TextContent(type="text", text=text)], response
+        return [TextContent(type="text", text=response)]
+
+    @staticmethod
+    def _run_blocking(handler: ToolHandler, arguments: Dict[str, Any], mode: str) -> Response:
+        return render_response(handler, handler.run(arguments), mode)
+
+    async def _dispatch(self, position: int, handler: ToolHandler, arguments: Dict[str, Any]) -> Response:
+        if position == len(self.middleware):
+            mode = output_mode(arguments)
+            if handler.blocking:
+                # Rendering happens on the worker too
+                context = contextvars.copy_context()
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.executor,
+                    functools.partial(context.run, self._run_blocking, handler, arguments, mode)
+                )
+            return render_response(handler, await handler.run(arguments), mode)
+
+        async def call_next(next_handler: ToolHandler, next_arguments: Dict[str, Any]) -> Response:
+            return await self._dispatch(position + 1, next_handler, next_arguments)
+
+        return await self.middleware[position](handler, arguments, call_next)